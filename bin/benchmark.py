@@ -0,0 +1,38 @@
+import argparse
+import json
+import sys
+
+from systemssolver.benchmark.harness import run_benchmarks, measure_startup
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the solver methods on generated LP families.')
+    parser.add_argument('--scale', choices=['small', 'medium', 'large'], default='small')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', help='Baseline JSON file to compare against, or to write with --update')
+    parser.add_argument('--update', action='store_true', help='Overwrite the baseline with this run')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results, regressions = run_benchmarks(
+        scale=args.scale, repeat=args.repeat, baseline_path=args.baseline, update_baseline=args.update,
+        tolerance=args.tolerance)
+    startup = measure_startup()
+
+    if args.json:
+        print(json.dumps({
+            'results': [result.to_dict() for result in results], 'regressions': regressions, 'startup': startup
+        }, indent=2))
+    else:
+        print('startup: import={:.4f}s cold solve={:.4f}s'.format(
+            startup['import_seconds'], startup['cold_solve_seconds']))
+        for result in results:
+            print(result)
+        for regression in regressions:
+            print('REGRESSION ' + regression)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
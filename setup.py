@@ -18,6 +18,8 @@ setup(
     entry_points={
         'console_scripts': [
             'run-solver-app=bin.app:main',
+            'run-solver-benchmark=bin.benchmark:main',
+            'systemssolver=systemssolver.cli:main',
         ]
     },
     install_requires=[
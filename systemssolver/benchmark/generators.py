@@ -0,0 +1,171 @@
+"""
+Reproducible LP families used by the benchmark harness. Every generator is a pure function of its size
+arguments and seed, so two runs with the same arguments build the same model.
+"""
+import random
+from typing import List, Tuple
+
+from systemssolver.modeling.equation import Expression, Constraint, EqualitySigns
+from systemssolver.modeling.objective import Objective, ObjectiveGoal
+from systemssolver.modeling.variables import Term, Variable, VariableType
+from systemssolver.problem import Problem
+
+
+def _expression(pairs: List[Tuple[float, Variable]]) -> Expression:
+    return Expression(terms=[Term(coef=coef, var=var) for coef, var in pairs])
+
+
+def _constant(val) -> Expression:
+    return Expression(terms=[Term(coef=val)])
+
+
+def _variables(count: int, prefix='x', vtype=VariableType.REAL) -> List[Variable]:
+    return [Variable(name='{}{}'.format(prefix, i), vtype=vtype) for i in range(count)]
+
+
+def random_sparse(rows: int, cols: int, density=0.1, seed=0) -> Problem:
+    """ max c.x s.t. A x <= b with non-negative A and b, feasible at the origin and bounded. """
+    rng = random.Random(seed)
+    variables = _variables(cols)
+    problem = Problem()
+    problem.add_objective(Objective(
+        expression=_expression([(rng.randint(1, 20), var) for var in variables]), goal=ObjectiveGoal.MAXIMIZE))
+
+    entries = [dict() for _ in range(rows)]
+    for col in range(cols):
+        # Every column gets at least one positive entry so the model stays bounded.
+        entries[rng.randrange(rows)][col] = rng.randint(1, 9)
+    for row in entries:
+        for col in range(cols):
+            if col not in row and rng.random() < density:
+                row[col] = rng.randint(1, 9)
+
+    for row in entries:
+        problem.add_constraint(Constraint(
+            left=_expression([(coef, variables[col]) for col, coef in sorted(row.items())]),
+            right=_constant(rng.randint(10 * cols, 50 * cols)),
+            sign=EqualitySigns.LE))
+    return problem
+
+
+def transportation(sources: int, sinks: int, seed=0) -> Problem:
+    """ min cost shipping with supply rows (<=) and demand rows (>=), total supply covers demand. """
+    rng = random.Random(seed)
+    demands = [rng.randint(5, 30) for _ in range(sinks)]
+    supplies = [rng.randint(5, 30) for _ in range(sources)]
+    shortfall = sum(demands) - sum(supplies)
+    if shortfall > 0:
+        supplies[-1] += shortfall
+
+    routes = [[Variable(name='x{}_{}'.format(i, j)) for j in range(sinks)] for i in range(sources)]
+    problem = Problem()
+    problem.add_objective(Objective(
+        expression=_expression([(rng.randint(1, 15), var) for row in routes for var in row]),
+        goal=ObjectiveGoal.MINIMIZE))
+
+    for i, supply in enumerate(supplies):
+        problem.add_constraint(Constraint(
+            left=_expression([(1, var) for var in routes[i]]), right=_constant(supply), sign=EqualitySigns.LE))
+    for j, demand in enumerate(demands):
+        problem.add_constraint(Constraint(
+            left=_expression([(1, routes[i][j]) for i in range(sources)]), right=_constant(demand),
+            sign=EqualitySigns.GE))
+    return problem
+
+
+def assignment(size: int, seed=0) -> Problem:
+    """ min cost perfect assignment of size workers to size tasks. """
+    rng = random.Random(seed)
+    pairs = [[Variable(name='x{}_{}'.format(i, j)) for j in range(size)] for i in range(size)]
+    problem = Problem()
+    problem.add_objective(Objective(
+        expression=_expression([(rng.randint(1, 50), var) for row in pairs for var in row]),
+        goal=ObjectiveGoal.MINIMIZE))
+
+    for i in range(size):
+        problem.add_constraint(Constraint(
+            left=_expression([(1, var) for var in pairs[i]]), right=_constant(1), sign=EqualitySigns.EQUAL))
+    for j in range(size):
+        problem.add_constraint(Constraint(
+            left=_expression([(1, pairs[i][j]) for i in range(size)]), right=_constant(1),
+            sign=EqualitySigns.EQUAL))
+    return problem
+
+
+def block_diagonal(blocks: int, rows: int, cols: int, linking: int, seed=0) -> Problem:
+    """
+    Multi-site planning: max c.x with blocks independent sites of rows x cols each, tied together by linking rows
+    that share capacity across all sites. Non-negative rows keep it feasible at the origin and bounded.
+    """
+    rng = random.Random(seed)
+    sites = [[Variable(name='x{}_{}'.format(site, j)) for j in range(cols)] for site in range(blocks)]
+    problem = Problem()
+    problem.add_objective(Objective(
+        expression=_expression([(rng.randint(1, 20), var) for site in sites for var in site]),
+        goal=ObjectiveGoal.MAXIMIZE))
+
+    for site in sites:
+        for row in range(rows):
+            # The first row of every site covers all its columns, so each site is bounded on its own.
+            pairs = [(rng.randint(1, 9), var) for var in site if row == 0 or rng.random() < 0.5]
+            problem.add_constraint(Constraint(
+                left=_expression(pairs), right=_constant(rng.randint(10 * cols, 30 * cols)), sign=EqualitySigns.LE))
+    for _ in range(linking):
+        pairs = [(rng.randint(1, 5), var) for site in sites for var in site if rng.random() < 0.3]
+        problem.add_constraint(Constraint(
+            left=_expression(pairs), right=_constant(rng.randint(10 * cols, 20 * cols) * blocks // 2),
+            sign=EqualitySigns.LE))
+    return problem
+
+
+def klee_minty(dimension: int) -> Problem:
+    """ The Klee-Minty cube, on which Dantzig's rule visits all 2^n vertices. """
+    variables = _variables(dimension)
+    problem = Problem()
+    problem.add_objective(Objective(
+        expression=_expression([(2 ** (dimension - j - 1), var) for j, var in enumerate(variables)]),
+        goal=ObjectiveGoal.MAXIMIZE))
+
+    for i in range(dimension):
+        pairs = [(2 ** (i - j + 1), variables[j]) for j in range(i)]
+        pairs.append((1, variables[i]))
+        problem.add_constraint(Constraint(
+            left=_expression(pairs), right=_constant(5 ** (i + 1)), sign=EqualitySigns.LE))
+    return problem
+
+
+def degenerate(rows: int, cols: int, seed=0) -> Problem:
+    """ Half of the rows pass through the origin, so the starting vertex is highly degenerate. """
+    rng = random.Random(seed)
+    variables = _variables(cols)
+    problem = Problem()
+    problem.add_objective(Objective(
+        expression=_expression([(rng.randint(1, 10), var) for var in variables]), goal=ObjectiveGoal.MAXIMIZE))
+
+    for row in range(rows):
+        if row % 2 == 0:
+            # x_a - x_b <= 0 style rows, all tight at the origin.
+            a, b = rng.sample(range(cols), 2)
+            pairs = [(1, variables[a]), (-1, variables[b])]
+            rhs = 0
+        else:
+            pairs = [(rng.randint(1, 5), var) for var in variables]
+            rhs = rng.randint(10 * cols, 20 * cols)
+        problem.add_constraint(Constraint(left=_expression(pairs), right=_constant(rhs), sign=EqualitySigns.LE))
+    return problem
+
+
+def knapsack(items: int, seed=0) -> Problem:
+    """ 0-1 knapsack, modeled with integer variables bounded by one. """
+    rng = random.Random(seed)
+    variables = _variables(items, vtype=VariableType.INTEGER)
+    weights = [rng.randint(5, 40) for _ in range(items)]
+    problem = Problem()
+    problem.add_objective(Objective(
+        expression=_expression([(rng.randint(5, 60), var) for var in variables]), goal=ObjectiveGoal.MAXIMIZE))
+    problem.add_constraint(Constraint(
+        left=_expression(list(zip(weights, variables))), right=_constant(sum(weights) // 2),
+        sign=EqualitySigns.LE))
+    for var in variables:
+        problem.add_constraint(Constraint(left=_expression([(1, var)]), right=_constant(1), sign=EqualitySigns.LE))
+    return problem
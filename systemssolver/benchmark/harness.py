@@ -0,0 +1,276 @@
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from systemssolver.benchmark import generators
+from systemssolver.methods.factory import SolverMethods
+from systemssolver.modeling.document import problem_to_dict
+from systemssolver.modeling.evaluation import CompiledEvaluator
+from systemssolver.modeling.parsing import ConstraintParser, ExpressionParser
+from systemssolver.problem import Problem
+from systemssolver.solution import Solution
+from systemssolver.tracing.hook import StatsHook
+
+# Largest constraint violation a reported point may have and still count as feasible.
+FEASIBILITY_TOLERANCE = 1e-6
+# Relative change of the objective compare() takes as a different optimum rather than rounding.
+OBJECTIVE_TOLERANCE = 1e-6
+
+
+class BenchmarkCase:
+
+    def __init__(self, name: str, build: Callable[[], Problem]):
+        self.name, self.build = name, build
+
+
+class BenchmarkResult:
+
+    def __init__(self, case: str, method: str):
+        self.case, self.method = case, method
+        self.build_time = None
+        self.parse_time = None
+        self.wall_time = None
+        self.iterations = None
+        self.peak_memory = None
+        self.objective = None
+        self.feasible = None
+        self.error = None
+
+    def to_dict(self) -> Dict:
+        return {
+            'case': self.case,
+            'method': self.method,
+            'build_time': self.build_time,
+            'parse_time': self.parse_time,
+            'wall_time': self.wall_time,
+            'iterations': self.iterations,
+            'peak_memory': self.peak_memory,
+            'objective': self.objective,
+            'feasible': self.feasible,
+            'error': self.error
+        }
+
+    def __str__(self):
+        if self.error is not None:
+            return '{:<28} {:<14} error: {}'.format(self.case, self.method, self.error)
+        return '{:<28} {:<14} build={:.4f}s parse={:.4f}s solve={:.4f}s iterations={} peak={}KiB objective={} ' \
+            'feasible={}'.format(self.case, self.method, self.build_time, self.parse_time, self.wall_time,
+                                 self.iterations, self.peak_memory // 1024, _format_objective(self.objective),
+                                 self.feasible)
+
+
+def default_cases(scale='small') -> List[BenchmarkCase]:
+    factor = {'small': 1, 'medium': 3, 'large': 8}[scale]
+    return [
+        BenchmarkCase('random_sparse_{}x{}'.format(10 * factor, 20 * factor),
+                      lambda: generators.random_sparse(10 * factor, 20 * factor, density=0.2, seed=1)),
+        BenchmarkCase('transportation_{}x{}'.format(3 * factor, 4 * factor),
+                      lambda: generators.transportation(3 * factor, 4 * factor, seed=2)),
+        BenchmarkCase('assignment_{}'.format(3 * factor), lambda: generators.assignment(3 * factor, seed=3)),
+        BenchmarkCase('klee_minty_{}'.format(3 + factor), lambda: generators.klee_minty(3 + factor)),
+        BenchmarkCase('degenerate_{}x{}'.format(8 * factor, 10 * factor),
+                      lambda: generators.degenerate(8 * factor, 10 * factor, seed=4)),
+        BenchmarkCase('knapsack_{}'.format(10 * factor), lambda: generators.knapsack(10 * factor, seed=5)),
+        BenchmarkCase('block_diagonal_{}x{}'.format(4 * factor, 5),
+                      lambda: generators.block_diagonal(4 * factor, 3, 5, 2, seed=6)),
+    ]
+
+
+class BenchmarkRunner:
+
+    def __init__(self, cases: List[BenchmarkCase], methods: List[SolverMethods] = None, repeat=3):
+        self.cases = cases
+        self.methods = methods if methods is not None else list(SolverMethods)
+        self.repeat = repeat
+
+    def run(self) -> List[BenchmarkResult]:
+        results = list()
+        for case in self.cases:
+            build_time = self._best_of(case.build)
+            problem = case.build()
+            parse_time = self._time_parse(problem)
+            for method in self.methods:
+                if not method.get_solver().can_solve(problem):
+                    continue
+                result = BenchmarkResult(case.name, method.value)
+                result.build_time, result.parse_time = build_time, parse_time
+                try:
+                    self._time_solve(case, method, result)
+                except Exception as e:
+                    logging.warning('%s failed on %s: %r', method.value, case.name, e)
+                    result.error = repr(e)
+                results.append(result)
+        return results
+
+    def _best_of(self, func: Callable) -> float:
+        best = None
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def _time_parse(self, problem: Problem) -> float:
+        encoded_objectives = [str(objective.expression) for objective in problem.objectives]
+        encoded_constraints = [str(constraint) for constraint in problem.constraints]
+
+        def parse():
+            expression_parser, constraint_parser = ExpressionParser(), ConstraintParser()
+            for encoded in encoded_objectives:
+                expression_parser.parse(encoded)
+            for encoded in encoded_constraints:
+                constraint_parser.parse(encoded)
+        return self._best_of(parse)
+
+    def _time_solve(self, case: BenchmarkCase, method: SolverMethods, result: BenchmarkResult):
+        # Each run gets a fresh model so no solve sees state left behind by a previous one.
+        best = None
+        hook = None
+        solution = None
+        for _ in range(self.repeat):
+            problem = case.build()
+            solver = method.get_solver()
+            hook = StatsHook()
+            start = time.perf_counter()
+            solution = solver.solve(problem, hook)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        result.wall_time = best
+        result.iterations = hook.last_report.counter('pivots') if hook.last_report is not None else None
+        result.objective, result.feasible = _check_solution(problem, solution)
+
+        problem = case.build()
+        solver = method.get_solver()
+        tracemalloc.start()
+        try:
+            solver.solve(problem)
+            result.peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+class Baseline:
+
+    def __init__(self, records: Dict[str, Dict] = None, environment: Dict = None):
+        self.records = records if records is not None else dict()
+        self.environment = environment if environment is not None else _environment()
+
+    @staticmethod
+    def key(result: BenchmarkResult) -> str:
+        return '{}/{}'.format(result.case, result.method)
+
+    @staticmethod
+    def from_results(results: List[BenchmarkResult]) -> 'Baseline':
+        return Baseline({Baseline.key(result): result.to_dict() for result in results if result.error is None})
+
+    @staticmethod
+    def load(path: str) -> 'Baseline':
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return Baseline(data['records'], data.get('environment'))
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump({'environment': self.environment, 'records': self.records}, f, indent=2, sort_keys=True)
+
+    def compare(self, results: List[BenchmarkResult], tolerance=0.25) -> List[str]:
+        """
+        Regressions against this baseline. Times and memory may grow by the tolerance fraction before being
+        flagged; iteration counts are deterministic and must not grow at all. An objective that moves by more than
+        OBJECTIVE_TOLERANCE, or a point that is no longer feasible, is a wrong answer and always flagged.
+        """
+        regressions = list()
+        for result in results:
+            base = self.records.get(self.key(result))
+            if base is None:
+                continue
+            if result.error is not None:
+                regressions.append('{}: now fails with {}'.format(self.key(result), result.error))
+                continue
+            for metric in ('build_time', 'parse_time', 'wall_time', 'peak_memory'):
+                old, new = base[metric], getattr(result, metric)
+                if old is not None and new is not None and new > old * (1 + tolerance):
+                    regressions.append('{}: {} {:.6g} -> {:.6g}'.format(self.key(result), metric, old, new))
+            if base['iterations'] is not None and result.iterations is not None \
+                    and result.iterations > base['iterations']:
+                regressions.append('{}: iterations {} -> {}'.format(
+                    self.key(result), base['iterations'], result.iterations))
+            old, new = base.get('objective'), result.objective
+            if old is not None and (new is None or abs(new - old) > OBJECTIVE_TOLERANCE * max(1.0, abs(old))):
+                regressions.append('{}: objective {} -> {}'.format(
+                    self.key(result), _format_objective(old), _format_objective(new)))
+            if base.get('feasible') and not result.feasible:
+                regressions.append('{}: no longer feasible'.format(self.key(result)))
+        return regressions
+
+
+def _check_solution(problem: Problem, solution: Optional[Solution]) -> (Optional[float], bool):
+    """
+    The first objective's value at the solution's point, in its own goal's orientation, and whether the point
+    satisfies every constraint: solvers report their own figures, and a wrong pivot still reports one.
+    """
+    if solution is None:
+        return None, False
+    evaluator = CompiledEvaluator(problem)
+    point = evaluator.candidate({name: float(solution.get(name, 0)) for name in evaluator.variable_names})
+    evaluation = evaluator.evaluate([point])
+    objective = evaluation.objective_values[0][0] if evaluation.objective_values else None
+    return objective, solution.feasible and evaluation.feasible(FEASIBILITY_TOLERANCE)[0]
+
+
+def _format_objective(objective: Optional[float]) -> str:
+    return '{:.10g}'.format(objective) if objective is not None else 'none'
+
+
+# Run in a fresh interpreter, so nothing is imported yet when the clock starts.
+_STARTUP_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+from systemssolver.cli import load_model
+from systemssolver.methods.factory import SolverMethods
+imported = time.perf_counter()
+SolverMethods.SIMPLEX.get_solver().solve(load_model(sys.argv[1]))
+solved = time.perf_counter()
+print(json.dumps({'import_seconds': imported - start, 'cold_solve_seconds': solved - imported}))
+'''
+
+
+def measure_startup(problem: Problem = None) -> Dict[str, float]:
+    """ Time to import the command line entry point and then to load and solve a small model, in a new process. """
+    problem = problem if problem is not None else generators.klee_minty(3)
+    package_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_root, os.environ.get('PYTHONPATH')])))
+
+    fd, path = tempfile.mkstemp(suffix='.json')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(problem_to_dict(problem), f)
+        output = subprocess.run([sys.executable, '-c', _STARTUP_SCRIPT, path], env=env, check=True,
+                                stdout=subprocess.PIPE, universal_newlines=True).stdout
+    finally:
+        os.remove(path)
+    return json.loads(output)
+
+
+def _environment() -> Dict:
+    return {'python': platform.python_version(), 'machine': platform.machine(), 'platform': platform.platform()}
+
+
+def run_benchmarks(scale='small', repeat=3, baseline_path: Optional[str] = None, update_baseline=False,
+                   tolerance=0.25) -> (List[BenchmarkResult], List[str]):
+    results = BenchmarkRunner(default_cases(scale), repeat=repeat).run()
+    regressions = list()
+    if baseline_path is not None:
+        if update_baseline:
+            Baseline.from_results(results).save(baseline_path)
+        else:
+            regressions = Baseline.load(baseline_path).compare(results, tolerance)
+    return results, regressions
@@ -0,0 +1,121 @@
+"""
+Solver-only command line: `python -m systemssolver solve model.json`. Only the modeling core is imported up front;
+the web UI, the binary formats and each solver method are imported when a command actually needs them, so short
+lived processes don't pay for Flask.
+"""
+import argparse
+import json
+import sys
+from typing import List
+
+from systemssolver.problem import Problem
+
+BINARY_MAGIC = b'SSLP'
+
+
+def load_model(path: str) -> Problem:
+    """ A problem from a JSON document, or from the binary problem format when the file starts with its magic. """
+    with open(path, 'rb') as f:
+        magic = f.read(len(BINARY_MAGIC))
+    if magic == BINARY_MAGIC:
+        from systemssolver.serialization import load_problem
+        return load_problem(path).to_problem()
+
+    from systemssolver.modeling.document import problem_from_dict
+    with open(path, 'r') as f:
+        return problem_from_dict(json.load(f))
+
+
+def solve(args) -> int:
+    from systemssolver.methods.factory import SolverMethods
+    from systemssolver.methods.limits import SolveLimits
+
+    method = SolverMethods.from_val(args.method)
+    if method is None:
+        print('Unknown method {}'.format(args.method), file=sys.stderr)
+        return 2
+    options = dict()
+    if args.time_limit is not None or args.max_iterations is not None:
+        options['limits'] = SolveLimits(time_limit=args.time_limit, max_iterations=args.max_iterations)
+    if args.exact:
+        options['exact'] = True
+    if args.pricing is not None:
+        from systemssolver.methods.pricing import PricingMode
+        options['pricing'] = PricingMode.from_val(args.pricing)
+    if args.crash is not None:
+        from systemssolver.methods.crash import CrashMode
+        options['crash'] = CrashMode.from_val(args.crash)
+    if args.precision is not None:
+        from systemssolver.methods.precision import Precision
+        options['precision'] = Precision.from_val(args.precision)
+
+    try:
+        solver = method.get_solver(**options)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    solution = solver.solve(load_model(args.model))
+    if solution is None:
+        print('The model is not suitable for the {} method'.format(method.value), file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps({
+            'vars': {name: float(val) for name, val in solution.items()},
+            'status': solution.status.value,
+            'feasible': solution.feasible
+        }))
+    else:
+        print(solution)
+        if not solution.is_optimal:
+            print('stopped: {}'.format(solution.status.value))
+    return 0
+
+
+def serve(args) -> int:
+    from systemssolver.interface.solver_gui import FlaskApp
+    FlaskApp(host=args.host, port=args.port).start()
+    return 0
+
+
+def worker(args) -> int:
+    from systemssolver.distributed import WorkerServer
+    with WorkerServer(args.host, args.port) as server:
+        print('worker listening on {}:{}'.format(*server.address), flush=True)
+        server.serve_forever()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='systemssolver', description='Solve linear programs.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    solve_parser = commands.add_parser('solve', help='Solve a model file, JSON or binary')
+    solve_parser.add_argument('model')
+    solve_parser.add_argument('--method', default='simplex')
+    solve_parser.add_argument('--time-limit', type=float, help='Seconds before returning the best point so far')
+    solve_parser.add_argument('--max-iterations', type=int)
+    solve_parser.add_argument('--exact', action='store_true', help='Verify the optimum in rational arithmetic')
+    solve_parser.add_argument('--pricing', choices=['dantzig', 'partial', 'multiple'],
+                              help='Rule choosing entering columns, for the simplex methods')
+    solve_parser.add_argument('--crash', choices=['slack', 'triangular', 'feasible'],
+                              help='Starting basis heuristic, for the simplex method')
+    solve_parser.add_argument('--precision', choices=['double', 'mixed'],
+                              help='Tableau storage, mixed pivots in float32, for the simplex methods')
+    solve_parser.add_argument('--json', action='store_true', help='Print the solution as JSON')
+    solve_parser.set_defaults(func=solve)
+
+    serve_parser = commands.add_parser('serve', help='Run the web interface')
+    serve_parser.add_argument('--host', default='0.0.0.0')
+    serve_parser.add_argument('--port', type=int, default=50000)
+    serve_parser.set_defaults(func=serve)
+
+    worker_parser = commands.add_parser('worker', help='Solve problems sent by a dispatcher over TCP')
+    worker_parser.add_argument('--host', default='0.0.0.0')
+    worker_parser.add_argument('--port', type=int, default=50100)
+    worker_parser.set_defaults(func=worker)
+    return parser
+
+
+def main(argv: List[str] = None):
+    args = build_parser().parse_args(argv)
+    sys.exit(args.func(args))
@@ -0,0 +1,373 @@
+"""
+Solving across machines: worker servers that solve problems sent over TCP, and a client-side dispatcher that spreads
+a batch of problems over them.
+
+Every message is a frame: a header with the protocol magic, a message type and the payload size, then the payload.
+Tasks and results carry a small JSON header followed by a problem or solution in the binary format of
+systemssolver.serialization. Workers send a heartbeat frame at a fixed interval, also while solving, so the
+dispatcher can tell a slow solve from a lost node.
+
+The dispatcher deals the tasks out to one queue per worker. A worker that runs out takes tasks from the back of the
+longest queue, and the task of a worker that disconnects or stops sending heartbeats is queued again for the others,
+up to max_retries times.
+
+    workers = [start_worker_process() for _ in range(3)]
+    solutions = Dispatcher([address for _, address in workers]).solve_many(problems)
+"""
+import json
+import logging
+import multiprocessing
+import socket
+import socketserver
+import struct
+import threading
+from collections import deque
+from typing import List, Dict, Optional, Tuple, Iterable, Deque
+
+from systemssolver.methods.factory import SolverMethods
+from systemssolver.methods.solvermethod import SolverMethod
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.problem import Problem
+from systemssolver.serialization import dumps_problem, loads_problem, dumps_solution, loads_solution
+from systemssolver.solution import Solution
+from systemssolver.tracing.hook import TracingHook, StatsHook
+from systemssolver.tracing.stats import SolveStats
+
+PROTOCOL_MAGIC = b'SSWP'
+
+TASK = 1
+RESULT = 2
+ERROR = 3
+HEARTBEAT = 4
+
+_FRAME_HEADER = struct.Struct('<4sBQ')
+_META_SIZE = struct.Struct('<I')
+
+HEARTBEAT_INTERVAL = 1.0
+HEARTBEAT_TIMEOUT = 5.0
+MAX_RETRIES = 2
+
+Address = Tuple[str, int]
+
+
+class ProtocolError(RuntimeError):
+    pass
+
+
+def send_frame(sock: socket.socket, kind: int, meta: Dict, body: bytes = b''):
+    encoded = json.dumps(meta).encode('utf-8')
+    payload = _META_SIZE.pack(len(encoded)) + encoded + body
+    sock.sendall(_FRAME_HEADER.pack(PROTOCOL_MAGIC, kind, len(payload)) + payload)
+
+
+def recv_frame(sock: socket.socket) -> Tuple[int, Dict, bytes]:
+    """ The next frame's type, JSON header and body. Raises ConnectionError when the peer has gone. """
+    magic, kind, size = _FRAME_HEADER.unpack(_recv_exactly(sock, _FRAME_HEADER.size))
+    if magic != PROTOCOL_MAGIC:
+        raise ProtocolError('Not a worker protocol frame')
+    payload = _recv_exactly(sock, size)
+    meta_size, = _META_SIZE.unpack_from(payload, 0)
+    meta = json.loads(payload[_META_SIZE.size:_META_SIZE.size + meta_size].decode('utf-8'))
+    return kind, meta, payload[_META_SIZE.size + meta_size:]
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    chunks, remaining = list(), size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1 << 20))
+        if not chunk:
+            raise ConnectionError('Connection closed')
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def solver_options(options: Dict) -> Dict:
+    """
+    Solver keyword arguments from the JSON options of a task; a 'limits' entry holds SolveLimits arguments and a
+    'pricing', a 'crash' and a 'precision' entry the value of a PricingMode, a CrashMode and a Precision.
+    """
+    options = dict(options)
+    if 'limits' in options:
+        from systemssolver.methods.limits import SolveLimits
+        options['limits'] = SolveLimits(**options['limits'])
+    if 'pricing' in options:
+        from systemssolver.methods.pricing import PricingMode
+        pricing = PricingMode.from_val(options['pricing'])
+        if pricing is None:
+            raise ValueError('Unknown pricing {}'.format(options['pricing']))
+        options['pricing'] = pricing
+    if 'crash' in options:
+        from systemssolver.methods.crash import CrashMode
+        crash = CrashMode.from_val(options['crash'])
+        if crash is None:
+            raise ValueError('Unknown crash {}'.format(options['crash']))
+        options['crash'] = crash
+    if 'precision' in options:
+        from systemssolver.methods.precision import Precision
+        precision = Precision.from_val(options['precision'])
+        if precision is None:
+            raise ValueError('Unknown precision {}'.format(options['precision']))
+        options['precision'] = precision
+    return options
+
+
+class _WorkerHandler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        lock = threading.Lock()
+        closed = threading.Event()
+        beat = threading.Thread(target=self._heartbeats, args=(lock, closed), daemon=True)
+        beat.start()
+        try:
+            while True:
+                try:
+                    kind, meta, body = recv_frame(self.request)
+                except (ConnectionError, OSError):
+                    return
+                if kind != TASK:
+                    continue
+                kind, reply, body = self._solve(meta, body)
+                with lock:
+                    send_frame(self.request, kind, reply, body)
+        finally:
+            closed.set()
+
+    def _heartbeats(self, lock: threading.Lock, closed: threading.Event):
+        while not closed.wait(self.server.heartbeat_interval):
+            try:
+                with lock:
+                    send_frame(self.request, HEARTBEAT, {})
+            except OSError:
+                return
+
+    @staticmethod
+    def _solve(meta: Dict, body: bytes) -> Tuple[int, Dict, bytes]:
+        try:
+            method = SolverMethods.from_val(meta['method'])
+            if method is None:
+                raise ValueError('Unknown method {}'.format(meta['method']))
+            solver = method.get_solver(**solver_options(meta.get('options', dict())))
+            hook = StatsHook() if meta.get('stats') else None
+            solution = solver.solve(loads_problem(body).to_problem(), hook)
+        except Exception as e:
+            return ERROR, {'task': meta.get('task'), 'message': str(e)}, b''
+        if solution is None:
+            return RESULT, {'task': meta['task'], 'solved': False}, b''
+        reply = {'task': meta['task'], 'solved': True}
+        if hook is not None:
+            reply['stats'] = hook.aggregate().to_dict()
+        return RESULT, reply, dumps_solution(solution)
+
+
+class WorkerServer(socketserver.ThreadingTCPServer):
+    """ Solves the tasks of every connected dispatcher, one at a time per connection. Port 0 picks a free port. """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0, heartbeat_interval=HEARTBEAT_INTERVAL):
+        super().__init__((host, port), _WorkerHandler)
+        self.heartbeat_interval = heartbeat_interval
+
+    @property
+    def address(self) -> Address:
+        return self.server_address[0], self.server_address[1]
+
+
+def _run_worker(host: str, port: int, heartbeat_interval: float, ready):
+    with WorkerServer(host, port, heartbeat_interval) as server:
+        ready.put(server.address)
+        server.serve_forever()
+
+
+def start_worker_process(host='127.0.0.1', port=0,
+                         heartbeat_interval=HEARTBEAT_INTERVAL) -> Tuple[multiprocessing.Process, Address]:
+    """ A worker server in a process of its own, standing in for a node. Returns the process and its address. """
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_run_worker, args=(host, port, heartbeat_interval, ready), daemon=True)
+    process.start()
+    return process, tuple(ready.get(timeout=30))
+
+
+class _Task:
+
+    def __init__(self, idx: int, body: bytes):
+        self.idx = idx
+        self.body = body
+        self.attempts = 0
+
+
+class Dispatcher:
+    """
+    Sends problems to the workers at addresses and collects their solutions, in the order of the problems. Each
+    worker connection runs in a thread of its own with one task in flight.
+    """
+
+    def __init__(self, addresses: List[Address], method=SolverMethods.SIMPLEX, options: Dict = None,
+                 heartbeat_timeout=HEARTBEAT_TIMEOUT, max_retries=MAX_RETRIES, connect_timeout=5.0):
+        self.addresses = list(addresses)
+        self.method = method
+        self.options = options if options is not None else dict()
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_retries = max_retries
+        self.connect_timeout = connect_timeout
+        self.retries = 0
+        self.steals = 0
+        self.errors: Dict[int, str] = dict()
+
+    def solve(self, problem: Problem, collect_stats=False) -> Optional[Solution]:
+        solution = self.solve_many([problem], collect_stats)[0]
+        if self.errors:
+            raise RuntimeError(self.errors[0])
+        return solution
+
+    def solve_many(self, problems: Iterable[Problem], collect_stats=False) -> List[Optional[Solution]]:
+        """
+        Solutions in the order of the problems, None where the method can't take a problem or its task failed. A task
+        fails when the remote solver raises, on an infeasible problem for one, or when no worker is left to run it;
+        its message is kept in errors under the task's index and the other tasks' solutions are returned all the same.
+        With collect_stats the workers collect solve stats, which come back as each solution's stats.
+        """
+        self._collect_stats = collect_stats
+        tasks = [_Task(idx, dumps_problem(problem)) for idx, problem in enumerate(problems)]
+        self._queues: List[Deque[_Task]] = [deque() for _ in self.addresses]
+        for task in tasks:
+            self._queues[task.idx % len(self.addresses)].append(task)
+        self._results: List[Optional[Solution]] = [None] * len(tasks)
+        self._finished = set()
+        self.errors = dict()
+        self._remaining = len(tasks)
+        self._dead = set()
+        self._condition = threading.Condition()
+
+        links = [threading.Thread(target=self._run_link, args=(link_idx, address), daemon=True)
+                 for link_idx, address in enumerate(self.addresses)]
+        for link in links:
+            link.start()
+        for link in links:
+            link.join()
+
+        if self._remaining:
+            logging.error("All workers were lost with {} tasks left".format(self._remaining))
+            for task in tasks:
+                if task.idx not in self._finished:
+                    self.errors[task.idx] = "No workers left"
+        for idx in sorted(self.errors):
+            logging.error("Task {} failed: {}".format(idx, self.errors[idx]))
+        return self._results
+
+    def _run_link(self, link_idx: int, address: Address):
+        try:
+            sock = socket.create_connection(address, timeout=self.connect_timeout)
+        except OSError as e:
+            logging.warning("Worker {}:{} unreachable: {}".format(address[0], address[1], e))
+            self._lose_link(link_idx, None)
+            return
+
+        with sock:
+            sock.settimeout(self.heartbeat_timeout)
+            while True:
+                task = self._next_task(link_idx)
+                if task is None:
+                    return
+                try:
+                    self._run_task(sock, task)
+                except (ConnectionError, OSError, ProtocolError) as e:
+                    logging.warning("Worker {}:{} lost: {}".format(address[0], address[1], e))
+                    self._lose_link(link_idx, task)
+                    return
+
+    def _run_task(self, sock: socket.socket, task: _Task):
+        send_frame(sock, TASK, {'task': task.idx, 'method': self.method.value, 'options': self.options,
+                                'stats': self._collect_stats}, task.body)
+        while True:
+            # Any frame, heartbeats included, proves the worker alive; the socket timeout catches silent ones.
+            kind, meta, body = recv_frame(sock)
+            if kind == HEARTBEAT or meta.get('task') != task.idx:
+                continue
+            if kind == ERROR:
+                self._finish(task, error=meta['message'])
+            else:
+                self._finish(task, solution=self._solution(meta, body) if meta['solved'] else None)
+            return
+
+    @staticmethod
+    def _solution(meta: Dict, body: bytes) -> Solution:
+        solution = loads_solution(body)
+        if 'stats' in meta:
+            solution.stats = SolveStats.from_dict(meta['stats'])
+        return solution
+
+    def _next_task(self, link_idx: int) -> Optional[_Task]:
+        """ The next task of this link's queue, else one stolen from the longest queue; None once all are done. """
+        with self._condition:
+            while True:
+                if self._queues[link_idx]:
+                    return self._queues[link_idx].popleft()
+                victim = max(range(len(self._queues)), key=lambda idx: len(self._queues[idx]))
+                if self._queues[victim]:
+                    self.steals += 1
+                    return self._queues[victim].pop()
+                if self._remaining == 0 or len(self._dead) == len(self._queues):
+                    return None
+                # Tasks in flight elsewhere may still come back if their worker is lost.
+                self._condition.wait()
+
+    def _finish(self, task: _Task, solution: Solution = None, error: str = None):
+        with self._condition:
+            if error is not None:
+                self.errors[task.idx] = error
+            self._results[task.idx] = solution
+            self._finished.add(task.idx)
+            self._remaining -= 1
+            self._condition.notify_all()
+
+    def _lose_link(self, link_idx: int, task: Optional[_Task]):
+        with self._condition:
+            self._dead.add(link_idx)
+            orphans = list(self._queues[link_idx])
+            self._queues[link_idx].clear()
+            if task is not None:
+                task.attempts += 1
+                if task.attempts > self.max_retries:
+                    self.errors[task.idx] = 'Task lost {} times'.format(task.attempts)
+                    self._finished.add(task.idx)
+                    self._remaining -= 1
+                else:
+                    self.retries += 1
+                    orphans.insert(0, task)
+
+            # With no live worker left the orphans stay counted in _remaining and solve_many reports them.
+            alive = [idx for idx in range(len(self._queues)) if idx not in self._dead]
+            for pos, orphan in enumerate(reversed(orphans)):
+                if alive:
+                    self._queues[alive[pos % len(alive)]].appendleft(orphan)
+            self._condition.notify_all()
+
+
+class DistributedSolver(SolverMethod):
+    """
+    A SolverMethod that hands each solve to a pool of workers through a Dispatcher. Options go to the remote solver
+    and must be JSON values, with limits given as a dict of SolveLimits arguments.
+
+    Only what the wire carries reaches the workers: linear models in the binary problem format, so no quadratic
+    objectives, and a tracing hook's stats, which the worker collects and sends back as one report. Traced steps and
+    lazy constraint separation stay local to the worker and are not called. Each problem is one task solved whole by
+    one worker; the subtrees of an integer search are not spread over the pool.
+    """
+
+    def __init__(self, addresses: List[Address], method=SolverMethods.SIMPLEX, **options):
+        self.method = method
+        self.dispatcher = Dispatcher(addresses, method, options)
+
+    def can_solve(self, problem: Problem) -> bool:
+        return MatrixProblem.from_problem(problem).is_linear and self.method.get_solver().can_solve(problem)
+
+    def solve(self, problem: Problem, tracing_hook: TracingHook = None) -> Optional[Solution]:
+        if not self.can_solve(problem):
+            return None
+        collects_stats = tracing_hook is not None and tracing_hook.collects_stats
+        solution = self.dispatcher.solve(problem, collects_stats)
+        if collects_stats and solution is not None and solution.stats is not None:
+            tracing_hook.report(solution.stats)
+        return solution
@@ -1,16 +1,27 @@
+import gzip
 import json
+import math
 import os
 import sys
+import zlib
+from fractions import Fraction
 from http import HTTPStatus
+from typing import Iterable, Iterator
 
 from flask import Flask, render_template, Response, request
 
 from systemssolver.methods.factory import SolverMethods
+from systemssolver.methods.limits import SolveLimits
+from systemssolver.modeling.document import problem_from_dict, problem_to_dict
 from systemssolver.modeling.equation import EqualitySigns, Constraint
 from systemssolver.modeling.objective import ObjectiveGoal, Objective
 from systemssolver.modeling.parsing import ExpressionParser
 from systemssolver.modeling.variables import Variable
 from systemssolver.problem import Problem
+from systemssolver.serialization import loads_problem
+
+# Streamed JSON objects are written this many entries per chunk.
+STREAM_CHUNK_ITEMS = 1000
 
 
 class FlaskApp:
@@ -41,6 +52,8 @@ class FlaskApp:
         self.app.add_url_rule("/api/constraint/add", "/api/constraint/add", self.add_constraint, methods=['POST'])
         self.app.add_url_rule("/api/constraint/remove", "/api/constraint/remove", self.remove_constraint,
                               methods=['POST'])
+        self.app.add_url_rule("/api/problem", "/api/problem", self.get_problem, methods=['GET'])
+        self.app.add_url_rule("/api/problem", "/api/problem/put", self.put_problem, methods=['PUT'])
         self.app.add_url_rule("/api/reset", "/api/reset", self.reset, methods=['POST'])
         self.app.add_url_rule("/api/solve", "/api/solve", self.solve, methods=['POST'])
 
@@ -58,13 +71,37 @@ class FlaskApp:
         self.problem = Problem()
         return Response("Ok", HTTPStatus.OK, content_type="text/plain")
 
-    def list_variables(self):
+    def get_problem(self):
+        return self._json_response([json.dumps(problem_to_dict(self.problem))])
+
+    def put_problem(self):
+        """
+        Replaces the whole problem. The body is either the JSON document of modeling.document, with expression strings
+        or matrix arrays, or the binary problem format sent as application/octet-stream, optionally gzip encoded.
+        """
+        body = request.get_data()
+        try:
+            if request.headers.get('Content-Encoding', '').lower() == 'gzip':
+                body = gzip.decompress(body)
+            if request.mimetype == 'application/octet-stream':
+                problem = loads_problem(body).to_problem()
+            else:
+                problem = problem_from_dict(json.loads(body))
+        except Exception:
+            return Response("Invalid problem", HTTPStatus.BAD_REQUEST, content_type="text/plain")
+
+        self.problem = problem
         return Response(json.dumps({
-            'variables': [
-                {'name': var.name, 'isInverted': var.is_inverted, 'type': str(var.var_type.value)}
-                for var in self.problem.variables
-            ]}),
-            HTTPStatus.OK, content_type="application/json;charset=utf-8")
+            'objectives': len(problem.objectives),
+            'constraints': len(problem.constraints),
+            'variables': len(problem.variables)
+        }), HTTPStatus.OK, content_type="application/json; charset=utf-8")
+
+    def list_variables(self):
+        variables = sorted(self.problem.variables, key=lambda var: var.name)
+        return self._json_response(_json_object('variables', _json_items(
+            {'name': var.name, 'isInverted': var.is_inverted, 'type': str(var.var_type.value)}
+            for var in variables), array=True))
 
     def set_variable(self):
         data = request.json
@@ -88,7 +125,13 @@ class FlaskApp:
         return Response('Created', HTTPStatus.CREATED, content_type="text/plain")
 
     def remove_objective(self):
-        pass
+        data = request.json
+        objectives = self.problem.objectives
+        idx = data.get('index')
+        if not isinstance(idx, int) or not 0 <= idx < len(objectives):
+            return Response("Unknown objective", HTTPStatus.NOT_FOUND, content_type="text/plain")
+        self.problem.remove_objective(objectives[idx])
+        return Response('Ok', HTTPStatus.OK, content_type="text/plain")
 
     def list_constraints(self):
         return Response(json.dumps({
@@ -108,12 +151,29 @@ class FlaskApp:
         return Response('Created', HTTPStatus.CREATED, content_type="text/plain")
 
     def remove_constraint(self):
-        pass
+        data = request.json
+        constraints = self.problem.constraints
+        idx = data.get('index')
+        if not isinstance(idx, int) or not 0 <= idx < len(constraints):
+            return Response("Unknown constraint", HTTPStatus.NOT_FOUND, content_type="text/plain")
+        self.problem.remove_constraint(constraints[idx])
+        return Response('Ok', HTTPStatus.OK, content_type="text/plain")
 
     def solve(self):
         data = request.json
-        solver = SolverMethods.from_val(data['method']).get_solver()
-        debug = data['debug']
+        try:
+            options = dict()
+            if any(data.get(key) is not None for key in ('time_limit', 'max_iterations', 'max_memory')):
+                options['limits'] = SolveLimits(time_limit=data.get('time_limit'),
+                                                max_iterations=data.get('max_iterations'),
+                                                max_memory=data.get('max_memory'))
+            method = SolverMethods.from_val(data['method'])
+            if method is None:
+                raise ValueError('Unknown method {}'.format(data['method']))
+            solver = method.get_solver(**options)
+            debug = data['debug']
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return Response("Invalid options", HTTPStatus.BAD_REQUEST, content_type="text/plain")
         try:
             solution = solver.solve(self.problem)
         except Exception:
@@ -122,9 +182,68 @@ class FlaskApp:
         if not solution:
             return Response("Definied system is not suitable for this method.", HTTPStatus.BAD_REQUEST,
                             content_type="text/plain")
-        return Response(json.dumps({
-            'vars': {var.name: var.val for var in solution.variables}
-        }), HTTPStatus.OK, content_type="application/json; charset=utf-8")
+        # Encoded before the response starts: once the headers are out, a value that fails would cut the body short.
+        try:
+            members = ['{}: {}'.format(json.dumps(name), _json_number(val)) for name, val in solution.items()]
+        except (TypeError, ValueError):
+            return Response("Solution values are not numbers", HTTPStatus.INTERNAL_SERVER_ERROR,
+                            content_type="text/plain")
+        header = {'status': solution.status.value, 'feasible': solution.feasible}
+        # Exact solves also list, as "p/q" strings, the values a JSON number can't hold.
+        exact = {name: '{}/{}'.format(val.numerator, val.denominator) for name, val in solution.items()
+                 if isinstance(val, Fraction) and float(val) != val}
+        if exact:
+            header['exact'] = exact
+        return self._json_response(_json_object('vars', _json_items(members), header))
+
+    def _json_response(self, chunks: Iterable[str]) -> Response:
+        """ Streams the JSON chunks to the client, gzip compressed when it accepts that. """
+        body = (chunk.encode('utf-8') for chunk in chunks)
+        headers = {'Vary': 'Accept-Encoding'}
+        if 'gzip' in request.accept_encodings:
+            body = _gzip_stream(body)
+            headers['Content-Encoding'] = 'gzip'
+        return Response(body, HTTPStatus.OK, headers=headers, content_type="application/json; charset=utf-8")
 
     def start(self):
         self.app.run(host=self.host, port=self.port, threaded=True)
+
+
+def _json_items(items: Iterable) -> Iterator[str]:
+    """ Comma separated members of a JSON container, a chunk per STREAM_CHUNK_ITEMS; strings are taken as encoded. """
+    batch = list()
+    first = True
+    for item in items:
+        batch.append(item if isinstance(item, str) else json.dumps(item))
+        if len(batch) == STREAM_CHUNK_ITEMS:
+            yield ('' if first else ', ') + ', '.join(batch)
+            batch, first = list(), False
+    if batch:
+        yield ('' if first else ', ') + ', '.join(batch)
+
+
+def _json_number(val) -> str:
+    """ A solution value as a JSON number, null when there is none or it isn't finite. """
+    if val is None:
+        return 'null'
+    val = float(val)
+    return json.dumps(val) if math.isfinite(val) else 'null'
+
+
+def _json_object(key: str, members: Iterable[str], header: dict = None, array=False) -> Iterator[str]:
+    """ {header..., key: [members]} (or {members} when not array) written out as it is produced. """
+    opening, closing = ('[', ']') if array else ('{', '}')
+    prefix = json.dumps(header)[:-1] + ', ' if header else '{'
+    yield '{}{}: {}'.format(prefix, json.dumps(key), opening)
+    yield from members
+    yield closing + '}'
+
+
+def _gzip_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    # wbits of 16 + MAX_WBITS writes the gzip header and trailer around the deflate stream.
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
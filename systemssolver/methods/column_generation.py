@@ -0,0 +1,194 @@
+"""
+Column generation: the problem handed to the solver is a restricted master holding a few of the columns, and a pricing
+function supplied by the caller proposes new ones from the master's duals. Improving columns are appended to the live
+tableau, which re-optimizes from its current basis, until the pricer has none left.
+
+A master with integer variables, or integer columns, is priced at the root relaxation only, then handed with every
+generated column to the IntegerSolver's cuts and branch and bound: price and branch, which finds an integer point
+over the root's columns but, unlike full branch and price, doesn't price again inside the tree.
+
+    def price(duals):
+        pattern = best_pattern(duals.values)
+        column = Column('p{}'.format(duals.round), 1, pattern)
+        return [column] if duals.improves(column) else []
+
+    solution = ColumnGenerationSolver(price).solve(master)
+"""
+from typing import List, Dict, Callable, Iterable, Optional
+
+from systemssolver.methods.integer import IntegerSolver
+from systemssolver.methods.limits import SolveLimits, LimitReached
+from systemssolver.methods.solvermethod import SolverMethod
+from systemssolver.methods.standard import build_tableau, maximization_costs, objective_value, standard_row_map
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.modeling.objective import ObjectiveGoal
+from systemssolver.modeling.variables import VariableType
+from systemssolver.problem import Problem
+from systemssolver.solution import Solution
+from systemssolver.tracing.hook import TracingHook
+from systemssolver.tracing.stats import SolveStats, NULL_STATS, Phase
+
+EPSILON = 1e-9
+
+
+class Column:
+    """
+    A generated variable: its cost in the objective and its coefficient in each constraint it enters, keyed by the
+    constraint's position in the master problem's constraint order.
+    """
+
+    def __init__(self, name: str, cost: float, coefs: Dict[int, float], vtype=VariableType.REAL):
+        self.name = name
+        self.cost = cost
+        self.coefs = coefs
+        self.vtype = vtype
+
+
+class MasterDuals:
+    """
+    Duals of the master's constraints at its current optimum, in the order of its constraints and in the objective's
+    own sense: how much the objective moves per unit increase of each right hand side.
+    """
+
+    def __init__(self, values: List[float], goal: ObjectiveGoal, round_idx: int):
+        self.values = values
+        self.goal = goal
+        self.round = round_idx
+
+    def reduced_cost(self, column: Column) -> float:
+        return column.cost - sum(self.values[row] * coef for row, coef in column.coefs.items())
+
+    def improves(self, column: Column, tolerance=EPSILON) -> bool:
+        reduced = self.reduced_cost(column)
+        return reduced > tolerance if self.goal == ObjectiveGoal.MAXIMIZE else reduced < -tolerance
+
+
+Pricer = Callable[[MasterDuals], Iterable[Column]]
+
+
+class ColumnGenerationSolver(SolverMethod):
+    """
+    Solves a single objective restricted master and grows it with the pricer's columns. Columns that don't improve
+    the master at its current duals are skipped, and the solve ends at the first round that adds none.
+
+    Each round's pivots and times go into a stats object of its own, reported to the tracing hook when the round
+    ends; the solution's stats hold the total. Time in the pricer counts as pricing, like the tableau's own. An
+    integer master's branch and bound, run by integer_solver, reports one more.
+    """
+
+    def __init__(self, pricer: Pricer, limits: SolveLimits = None, integer_solver: IntegerSolver = None):
+        self.pricer = pricer
+        self.limits = limits
+        self.integer_solver = integer_solver if integer_solver is not None else IntegerSolver()
+
+    def can_solve(self, problem: Problem) -> bool:
+        matrix = MatrixProblem.from_problem(problem)
+        return len(matrix.objectives) == 1 and matrix.num_constraints > 0 and \
+            EqualitySigns.NOT_EQUAL not in matrix.signs and matrix.is_linear
+
+    def solve(self, problem: Problem, tracing_hook: TracingHook = None) -> Optional[Solution]:
+        if not self.can_solve(problem):
+            return None
+
+        collects_stats = tracing_hook is not None and tracing_hook.collects_stats
+        total = SolveStats() if collects_stats else NULL_STATS
+        matrix = MatrixProblem.from_problem(problem)
+        objective = matrix.objectives[0]
+        scale = 1 if objective.goal == ObjectiveGoal.MAXIMIZE else -1
+        costs, constant = maximization_costs(objective)
+        row_map = standard_row_map(matrix)
+        tableau = build_tableau(matrix, costs, constant, total)
+        clock = self.limits.start() if self.limits is not None else None
+        generated: Dict[int, Column] = dict()
+
+        round_idx = 0
+        status = None
+        while True:
+            stats = SolveStats() if collects_stats else NULL_STATS
+            tableau.stats = stats
+            try:
+                tableau.optimize(clock=clock)
+            except LimitReached as e:
+                status = e.status
+
+            added = 0
+            if status is None:
+                duals = MasterDuals(self._duals(tableau.duals, row_map, scale), objective.goal, round_idx)
+                with stats.timer(Phase.PRICING):
+                    columns = [column for column in self.pricer(duals) if duals.improves(column)]
+                for column in columns:
+                    generated[self._add_column(tableau, column, row_map, scale)] = column
+                added = len(columns)
+                stats.increment('columns_generated', added)
+            stats.increment('pricing_rounds')
+            total.merge(stats)
+            if collects_stats:
+                tracing_hook.report(stats)
+            if status is not None or added == 0:
+                break
+            round_idx += 1
+            if clock is not None:
+                try:
+                    clock.raise_on_limit(tableau)
+                except LimitReached as e:
+                    status = e.status
+                    break
+
+        integer = VariableType.INTEGER in matrix.variable_types or \
+            any(column.vtype == VariableType.INTEGER for column in generated.values())
+        if integer and status is None:
+            stats = SolveStats() if collects_stats else NULL_STATS
+            solution = self.integer_solver.solve_matrix(_with_columns(matrix, generated.values()), stats, clock)
+            total.merge(stats)
+            if collects_stats:
+                tracing_hook.report(stats)
+        else:
+            values = tableau.values()
+            solution = tableau.to_solution(values)
+            solution.objective_values = [
+                objective_value(objective, values) + sum(column.cost * values[col] for col, column in generated.items())
+            ]
+            if status is not None:
+                # A relaxation's point is no integer solution.
+                solution.status, solution.feasible = status, tableau.is_primal_feasible() and not integer
+        if total.enabled:
+            solution.stats = total
+        return solution
+
+    @staticmethod
+    def _duals(standard_duals: List[float], row_map, scale: int) -> List[float]:
+        # A row written negated (>=) has its dual negated back; an equality's is the difference of its two rows.
+        return [scale * sum(row_scale * standard_duals[row] for row, row_scale in rows) for rows in row_map]
+
+    @staticmethod
+    def _add_column(tableau, column: Column, row_map, scale: int) -> int:
+        if any(var.name == column.name for var in tableau.variables):
+            raise ValueError('Column {} already exists'.format(column.name))
+        standard = dict()
+        for row, coef in column.coefs.items():
+            for standard_row, row_scale in row_map[row]:
+                standard[standard_row] = row_scale * coef
+        return tableau.add_column(column.name, standard, scale * column.cost)
+
+
+def _with_columns(matrix: MatrixProblem, columns: Iterable[Column]) -> MatrixProblem:
+    """ The master with the generated columns appended after its own variables. """
+    columns = list(columns)
+    extended = MatrixProblem(
+        list(matrix.variable_names) + [column.name for column in columns],
+        list(matrix.variable_types) + [column.vtype for column in columns],
+        list(matrix.inverted) + [False] * len(columns))
+    first = matrix.num_variables
+    for objective in matrix.objectives:
+        extended.add_objective(objective.goal, list(objective.indices) + list(range(first, first + len(columns))),
+                               list(objective.coefs) + [column.cost for column in columns], objective.constant)
+    for row_idx in range(matrix.num_constraints):
+        indices, coefs = matrix.rows.row(row_idx)
+        indices, coefs = list(indices), list(coefs)
+        for col, column in enumerate(columns, first):
+            if row_idx in column.coefs:
+                indices.append(col)
+                coefs.append(column.coefs[row_idx])
+        extended.add_row(indices, coefs, matrix.signs[row_idx], matrix.rhs[row_idx])
+    return extended
@@ -0,0 +1,95 @@
+"""
+Crash bases: structural variables pivoted into the starting basis in place of slacks before the simplex runs.
+
+A solve that starts from the all-slack basis spends its first pivots just moving structurals in. A crash picks them
+from the sparsity pattern instead, at one pivot each and without pricing:
+
+* triangular crash repeatedly takes the attractive column with the fewest nonzeros in the rows still held by their
+  slack, pivots it in on its largest entry there, and retires every row it touches. The structurals it picks form a
+  triangular basis, so no pivot fills in a row another one uses. The basis may be primal infeasible; the simplex
+  repairs that before it starts;
+* feasible crash picks the same way but only pivots a column in on the row its ratio test chooses, so the basis
+  stays primal feasible and needs no repair.
+
+Only columns with a positive cost are attractive: the others would be priced back out of the basis.
+"""
+from enum import Enum
+from typing import Dict, Optional
+
+# A pivot below this fraction of the column's largest entry in the active rows is too unstable to crash on.
+CRASH_PIVOT_TOLERANCE = 0.1
+EPSILON = 1e-9
+
+
+class CrashMode(Enum):
+    SLACK = 'slack'
+    TRIANGULAR = 'triangular'
+    FEASIBLE = 'feasible'
+
+    @staticmethod
+    def from_val(val):
+        for mode in CrashMode:
+            if mode.value == val.lower():
+                return mode
+        return None
+
+
+def crash_basis(tableau, mode: CrashMode) -> int:
+    """
+    Pivots the structurals mode picks into the tableau's basis, each into a row whose starting slack is still basic.
+    Returns the pivots made.
+    """
+    if mode == CrashMode.SLACK:
+        return 0
+
+    slacks = tableau.row_slacks
+    basis = tableau.basic_variables
+    active = {row_idx for row_idx, (slack, basic) in enumerate(zip(slacks, basis))
+              if slack is not None and slack == basic}
+    excluded = set(slacks) | set(basis)
+    reduced = tableau.reduced_costs
+
+    # Entries in the active rows only: a row stays active until a pivot column touches it, so they never change.
+    columns: Dict[int, Dict[int, float]] = dict()
+    for col, cost in enumerate(reduced):
+        if col in excluded or cost >= -EPSILON:
+            continue
+        entries = {row_idx: val for row_idx, val in enumerate(tableau.column(col)) if row_idx in active and val != 0}
+        if entries:
+            columns[col] = entries
+
+    pivots = 0
+    while columns and active:
+        col = min(columns, key=lambda idx: (len(columns[idx]), reduced[idx]))
+        entries = columns.pop(col)
+        row_idx = _pivot_row(tableau, col, entries, mode == CrashMode.FEASIBLE)
+        if row_idx is not None:
+            tableau.pivot(row_idx, col)
+            pivots += 1
+            active.difference_update(entries)
+            for other in list(columns):
+                remaining = {idx: val for idx, val in columns[other].items() if idx in active}
+                if remaining:
+                    columns[other] = remaining
+                else:
+                    del columns[other]
+    return pivots
+
+
+def _pivot_row(tableau, col: int, entries: Dict[int, float], feasible: bool) -> Optional[int]:
+    if not feasible:
+        # A positive pivot at least keeps the entering value non-negative when the row's right-hand side is.
+        return max(entries, key=lambda row_idx: (entries[row_idx] > 0, abs(entries[row_idx])))
+
+    # The ratio test over every row, not just the active ones: the basis only stays feasible when it picks an
+    # active row, and one with a stable pivot.
+    best_row, best_ratio = None, None
+    for row_idx, (val, rhs) in enumerate(zip(tableau.column(col), tableau.rhs)):
+        if val > EPSILON:
+            ratio = rhs / val
+            if best_row is None or ratio < best_ratio:
+                best_row, best_ratio = row_idx, ratio
+    largest = max(abs(val) for val in entries.values())
+    if best_row in entries and entries[best_row] >= CRASH_PIVOT_TOLERANCE * largest:
+        return best_row
+    return None
@@ -0,0 +1,374 @@
+"""
+Dantzig-Wolfe decomposition of block-angular models: independent blocks of rows and columns tied together by a few
+linking rows.
+
+The master problem picks a convex combination of known vertices of each block subject to the linking rows. Its duals
+price the linking rows into each block's objective, and every block that then has a vertex improving the master
+contributes that vertex as a new column. The blocks are solved in parallel worker processes, each keeping the
+tableaus of the blocks it has seen so later rounds start from the previous basis.
+"""
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Sequence, Tuple, Hashable
+
+from systemssolver.methods.limits import SolveLimits, LimitReached
+from systemssolver.methods.simplex import Tableau
+from systemssolver.methods.solvermethod import SolverMethod
+from systemssolver.methods.standard import build_tableau, standard_rows, maximization_costs, objective_value
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.modeling.variables import Variable
+from systemssolver.problem import Problem
+from systemssolver.solution import Solution
+from systemssolver.tracing.hook import TracingHook
+from systemssolver.tracing.stats import SolveStats, NULL_STATS, Phase
+
+EPSILON = 1e-9
+
+# Largest share of the rows detection may set aside as linking rows.
+MAX_LINKING_FRACTION = 0.2
+
+
+class BlockStructure:
+    """ blocks[k] is the (rows, columns) of block k. Columns in no block only appear in linking rows. """
+
+    def __init__(self, blocks: List[Tuple[List[int], List[int]]], linking_rows: List[int], free_columns: List[int]):
+        self.blocks = blocks
+        self.linking_rows = linking_rows
+        self.free_columns = free_columns
+
+    @property
+    def num_blocks(self) -> int:
+        return len(self.blocks)
+
+
+def detect_blocks(problem: Problem, max_linking_fraction=MAX_LINKING_FRACTION) -> Optional[BlockStructure]:
+    """
+    Sets aside the rows that share columns with the most other rows, and keeps the fewest of them that split the rows
+    left into the most groups sharing no column. None when no split into at least two groups is found within
+    max_linking_fraction of the rows.
+    """
+    matrix = MatrixProblem.from_problem(problem)
+    columns = matrix.columns
+    neighbours = [
+        len({other for col in matrix.rows.row(row)[0] for other in columns.row(col)[0]})
+        for row in range(matrix.num_constraints)
+    ]
+    by_reach = sorted(range(matrix.num_constraints), key=lambda row: -neighbours[row])
+    best = None
+    for count in range(int(max_linking_fraction * matrix.num_constraints) + 1):
+        structure = _components(matrix, set(by_reach[:count]))
+        if structure.num_blocks >= 2 and (best is None or structure.num_blocks > best.num_blocks):
+            best = structure
+    return best
+
+
+def blocks_from_labels(problem: Problem, labels: Sequence[Optional[Hashable]]) -> BlockStructure:
+    """ Blocks given by a label per constraint, in the problem's constraint order. None labels a linking row. """
+    matrix = MatrixProblem.from_problem(problem)
+    if len(labels) != matrix.num_constraints:
+        raise ValueError('Expected {} block labels, got {}'.format(matrix.num_constraints, len(labels)))
+
+    groups: Dict[Hashable, List[int]] = dict()
+    linking_rows = list()
+    for row, label in enumerate(labels):
+        if label is None:
+            linking_rows.append(row)
+        else:
+            groups.setdefault(label, list()).append(row)
+
+    owner: Dict[int, Hashable] = dict()
+    blocks = list()
+    for label, rows in groups.items():
+        columns = sorted({col for row in rows for col in matrix.rows.row(row)[0]})
+        for col in columns:
+            if owner.setdefault(col, label) != label:
+                raise ValueError('Variable {} is in blocks {} and {}'.format(
+                    matrix.variable_names[col], owner[col], label))
+        blocks.append((rows, columns))
+    free_columns = [col for col in range(matrix.num_variables) if col not in owner]
+    return BlockStructure(blocks, linking_rows, free_columns)
+
+
+def _components(matrix: MatrixProblem, linking: set) -> BlockStructure:
+    parent = list(range(matrix.num_variables))
+
+    def find(col: int) -> int:
+        while parent[col] != col:
+            parent[col] = parent[parent[col]]
+            col = parent[col]
+        return col
+
+    for row in range(matrix.num_constraints):
+        if row in linking:
+            continue
+        columns = matrix.rows.row(row)[0]
+        for col in columns[1:]:
+            parent[find(col)] = find(columns[0])
+
+    groups: Dict[int, Tuple[List[int], List[int]]] = dict()
+    for row in range(matrix.num_constraints):
+        columns = matrix.rows.row(row)[0]
+        if row not in linking and len(columns) > 0:
+            groups.setdefault(find(columns[0]), (list(), list()))[0].append(row)
+    for col in range(matrix.num_variables):
+        if find(col) in groups:
+            groups[find(col)][1].append(col)
+    owned = {col for _, columns in groups.values() for col in columns}
+    return BlockStructure(list(groups.values()), sorted(linking),
+                          [col for col in range(matrix.num_variables) if col not in owned])
+
+
+def block_problem(matrix: MatrixProblem, rows: List[int], columns: List[int]) -> MatrixProblem:
+    """ The rows of one block over its own columns, renumbered in the order of columns. """
+    local = {col: idx for idx, col in enumerate(columns)}
+    block = MatrixProblem([matrix.variable_names[col] for col in columns],
+                          [matrix.variable_types[col] for col in columns], [matrix.inverted[col] for col in columns])
+    for row in rows:
+        indices, coefs = matrix.rows.row(row)
+        block.add_row([local[col] for col in indices], coefs, matrix.signs[row], matrix.rhs[row])
+    return block
+
+
+class BlockPricer:
+    """
+    Solves blocks under changing objectives. Each block's tableau is built and made feasible once, then re-optimized
+    from its last basis for every new objective.
+    """
+
+    def __init__(self, blocks: List[MatrixProblem]):
+        self.blocks = blocks
+        self._tableaus: Dict[int, Tableau] = dict()
+
+    def price(self, block_idx: int, costs: Sequence[float]) -> Optional[List[float]]:
+        """ A vertex maximizing costs over the block, or None when the block is unbounded in that direction. """
+        objective = {col: cost for col, cost in enumerate(costs) if cost != 0}
+        tableau = self._tableaus.get(block_idx)
+        if tableau is None:
+            # Made feasible under a zero objective first, so an infeasible block raises here and any later
+            # RuntimeError can only be unboundedness.
+            tableau = build_tableau(self.blocks[block_idx], dict())
+            tableau.optimize()
+            self._tableaus[block_idx] = tableau
+        tableau.set_objective(objective)
+        try:
+            tableau.optimize()
+        except RuntimeError:
+            return None
+        return list(tableau.values()[:self.blocks[block_idx].num_variables])
+
+
+_worker_pricer: Optional[BlockPricer] = None
+
+
+def _init_worker(blocks: List[MatrixProblem]):
+    global _worker_pricer
+    _worker_pricer = BlockPricer(blocks)
+
+
+def _price_in_worker(block_idx: int, costs: List[float]) -> Optional[List[float]]:
+    return _worker_pricer.price(block_idx, costs)
+
+
+class DecompositionSolver(SolverMethod):
+    """
+    Solves single objective block-angular models by Dantzig-Wolfe decomposition. Blocks are detected from the
+    constraint matrix, or given as one label per constraint with None for the linking rows.
+
+    processes is the number of worker processes the blocks are spread over, by default one per core; with one
+    process the blocks are solved in the calling process. A model with a block that is unbounded on its own, which
+    would need extreme rays in the master, is handed to the general two-phase simplex instead.
+    """
+
+    def __init__(self, block_labels: Sequence[Optional[Hashable]] = None, processes: int = None,
+                 max_linking_fraction=MAX_LINKING_FRACTION, limits: SolveLimits = None):
+        self.block_labels = block_labels
+        self.processes = processes if processes is not None else os.cpu_count() or 1
+        self.max_linking_fraction = max_linking_fraction
+        self.limits = limits
+
+    def can_solve(self, problem: Problem) -> bool:
+        matrix = MatrixProblem.from_problem(problem)
+        if len(matrix.objectives) != 1 or EqualitySigns.NOT_EQUAL in matrix.signs or not matrix.is_linear:
+            return False
+        return self._structure(matrix) is not None
+
+    def solve(self, problem: Problem, tracing_hook: TracingHook = None) -> Optional[Solution]:
+        matrix = MatrixProblem.from_problem(problem)
+        if not self.can_solve(matrix):
+            return None
+
+        stats = SolveStats() if tracing_hook is not None and tracing_hook.collects_stats else NULL_STATS
+        with stats.timer(Phase.STANDARDIZATION):
+            structure = self._structure(matrix)
+            blocks = [block_problem(matrix, rows, columns) for rows, columns in structure.blocks]
+
+        if self.processes > 1 and len(blocks) > 1:
+            with ProcessPoolExecutor(min(self.processes, len(blocks)), initializer=_init_worker,
+                                     initargs=(blocks,)) as pool:
+                solution = _MasterProblem(matrix, structure, stats).solve(
+                    lambda costs: list(pool.map(_price_in_worker, range(len(costs)), costs)), self.limits)
+        else:
+            pricer = BlockPricer(blocks)
+            solution = _MasterProblem(matrix, structure, stats).solve(
+                lambda costs: [pricer.price(block_idx, block_costs) for block_idx, block_costs in enumerate(costs)],
+                self.limits)
+
+        if solution is None:
+            stats.increment('decomposition_fallbacks')
+            from systemssolver.methods.multiobjective import MultiObjectiveSolver
+            solution = MultiObjectiveSolver(limits=self.limits).solve(matrix)
+        if stats.enabled:
+            solution.stats = stats
+            tracing_hook.report(stats)
+        return solution
+
+    def _structure(self, matrix: MatrixProblem) -> Optional[BlockStructure]:
+        if self.block_labels is not None:
+            return blocks_from_labels(matrix, self.block_labels)
+        return detect_blocks(matrix, self.max_linking_fraction)
+
+
+class _MasterProblem:
+    """
+    max sum of (c_k.x_kj) l_kj over the known vertices x_kj of every block k, subject to the linking rows written
+    over those vertices and sum_j l_kj = 1 for every block. Every master row also gets an artificial column so the
+    master is feasible before the blocks have offered the vertices that satisfy the linking rows. Phase one drives
+    the artificials to zero, phase two pins them there and optimizes the real costs.
+    """
+
+    def __init__(self, matrix: MatrixProblem, structure: BlockStructure, stats: SolveStats):
+        self.matrix, self.structure, self.stats = matrix, structure, stats
+        self.costs, self.constant = maximization_costs(matrix.objectives[0])
+
+        linking = MatrixProblem(matrix.variable_names)
+        for row in structure.linking_rows:
+            indices, coefs = matrix.rows.row(row)
+            linking.add_row(indices, coefs, matrix.signs[row], matrix.rhs[row])
+        self.linking_rows, linking_rhs = standard_rows(linking)
+        num_linking = len(self.linking_rows)
+
+        # Two rows per block, sum l <= 1 and -sum l <= -1, after the linking rows.
+        rows = [dict() for _ in range(num_linking + 2 * structure.num_blocks)]
+        rhs = list(linking_rhs) + [1, -1] * structure.num_blocks
+        variables = [Variable(name='artificial{}'.format(row_idx)) for row_idx in range(len(rows))]
+        for row_idx, row in enumerate(rows):
+            row[row_idx] = -1
+
+        # Columns outside every block go into the master as they are.
+        self.free_columns = dict()
+        for col in structure.free_columns:
+            master_col = len(variables)
+            variables.append(Variable(name=matrix.variable_names[col]))
+            for row_idx, linking_row in enumerate(self.linking_rows):
+                if col in linking_row:
+                    rows[row_idx][master_col] = linking_row[col]
+            self.free_columns[master_col] = col
+
+        self.tableau = Tableau.from_rows(variables, {col: -1 for col in range(len(rhs))}, 0, rows, rhs, stats=stats)
+        self.artificials = list(range(len(rhs)))
+        self.vertices: Dict[int, Tuple[int, List[float]]] = dict()
+        self._seen = [set() for _ in range(structure.num_blocks)]
+
+    def solve(self, price_blocks, limits: Optional[SolveLimits]) -> Optional[Solution]:
+        """ price_blocks maps one cost vector per block to one vertex per block, None where unbounded. """
+        clock = limits.start() if limits is not None else None
+        phase_one = True
+        try:
+            while True:
+                self.tableau.optimize(clock=clock)
+                with self.stats.timer(Phase.PRICING):
+                    vertices = price_blocks(self._block_costs(phase_one))
+                self.stats.increment('master_rounds')
+                if any(vertex is None for vertex in vertices):
+                    return None
+                if self._add_columns(vertices, phase_one):
+                    if clock is not None:
+                        clock.raise_on_limit(self.tableau)
+                    continue
+                if not phase_one:
+                    return self._to_solution()
+                if self.tableau.objective_value < -EPSILON * max(1, len(self.artificials)):
+                    logging.error("No combination of block vertices satisfies the linking rows")
+                    raise RuntimeError("Infeasible problem")
+                self._start_phase_two()
+                phase_one = False
+        except LimitReached as e:
+            solution = self._to_solution()
+            solution.status, solution.feasible = e.status, not phase_one
+            return solution
+
+    def _start_phase_two(self):
+        self.tableau.add_row({col: 1 for col in self.artificials}, 0, name='artificials')
+        objective = {col: self.costs.get(original, 0) for col, original in self.free_columns.items()}
+        for col, (block_idx, vertex) in self.vertices.items():
+            objective[col] = self._vertex_cost(block_idx, vertex)
+        self.tableau.set_objective(objective, self.constant)
+
+    def _block_costs(self, phase_one: bool) -> List[List[float]]:
+        duals = self.tableau.duals
+        block_costs = list()
+        for _, columns in self.structure.blocks:
+            costs = [0.0 if phase_one else self.costs.get(col, 0) for col in columns]
+            for local, col in enumerate(columns):
+                for row_idx, row in enumerate(self.linking_rows):
+                    if col in row:
+                        costs[local] -= duals[row_idx] * row[col]
+            block_costs.append(costs)
+        return block_costs
+
+    def _add_columns(self, vertices: List[List[float]], phase_one: bool) -> bool:
+        duals = self.tableau.duals
+        num_linking = len(self.linking_rows)
+        added = False
+        for block_idx, vertex in enumerate(vertices):
+            key = tuple(round(val, 9) for val in vertex)
+            if key in self._seen[block_idx]:
+                continue
+            column = self._vertex_column(block_idx, vertex)
+            cost = 0 if phase_one else self._vertex_cost(block_idx, vertex)
+            convexity = duals[num_linking + 2 * block_idx] - duals[num_linking + 2 * block_idx + 1]
+            reduced = cost - sum(duals[row_idx] * coef for row_idx, coef in column.items() if row_idx < num_linking)
+            if reduced - convexity <= EPSILON * max(1, abs(cost)):
+                continue
+            col = self.tableau.add_column('l{}_{}'.format(block_idx, len(self._seen[block_idx])), column, cost)
+            self._seen[block_idx].add(key)
+            self.vertices[col] = (block_idx, vertex)
+            self.stats.increment('columns_generated')
+            added = True
+        return added
+
+    def _vertex_column(self, block_idx: int, vertex: List[float]) -> Dict[int, float]:
+        columns = self.structure.blocks[block_idx][1]
+        column = dict()
+        for row_idx, row in enumerate(self.linking_rows):
+            activity = sum(row[col] * val for col, val in zip(columns, vertex) if col in row)
+            if activity != 0:
+                column[row_idx] = activity
+        num_linking = len(self.linking_rows)
+        column[num_linking + 2 * block_idx] = 1
+        column[num_linking + 2 * block_idx + 1] = -1
+        return column
+
+    def _vertex_cost(self, block_idx: int, vertex: List[float]) -> float:
+        columns = self.structure.blocks[block_idx][1]
+        return sum(self.costs.get(col, 0) * val for col, val in zip(columns, vertex))
+
+    def _to_solution(self) -> Solution:
+        with self.stats.timer(Phase.EXTRACTION):
+            weights = self.tableau.values()
+            values = [0.0] * self.matrix.num_variables
+            for col, original in self.free_columns.items():
+                values[original] = weights[col]
+            for col, (block_idx, vertex) in self.vertices.items():
+                if weights[col] != 0:
+                    for original, val in zip(self.structure.blocks[block_idx][1], vertex):
+                        values[original] += weights[col] * val
+
+            z = sum(self.costs.get(col, 0) * val for col, val in enumerate(values)) + self.constant
+            solution = Solution(
+                self.matrix.variable_names + ['z'],
+                [-val if inverted else val for val, inverted in zip(values, self.matrix.inverted)] + [z])
+            solution.objective_values = [objective_value(objective, values) for objective in self.matrix.objectives]
+            return solution
@@ -1,11 +1,18 @@
 from enum import Enum
+from importlib import import_module
+from inspect import signature
 
-from systemssolver.methods.simplex import SimplexSolver
 from systemssolver.methods.solvermethod import SolverMethod
 
 
 class SolverMethods(Enum):
     SIMPLEX = 'simplex'
+    MULTI_OBJECTIVE = 'multiobjective'
+    LINEAR_SYSTEM = 'linear'
+    NETWORK = 'network'
+    DECOMPOSITION = 'decomposition'
+    INTEGER = 'integer'
+    QUADRATIC = 'quadratic'
 
     @staticmethod
     def from_val(val):
@@ -14,7 +21,22 @@ class SolverMethods(Enum):
                 return method
         return None
 
-    def get_solver(self) -> SolverMethod:
-        return {
-            SolverMethods.SIMPLEX: SimplexSolver
-        }[self]()
+    def get_solver(self, **options) -> SolverMethod:
+        # Solver modules are only imported once asked for, so picking one method doesn't pay for the others.
+        module_name, class_name = _SOLVER_CLASSES[self]
+        solver_class = getattr(import_module(module_name), class_name)
+        unsupported = sorted(set(options) - set(signature(solver_class).parameters))
+        if unsupported:
+            raise ValueError('The {} method takes no {} option'.format(self.value, ', '.join(unsupported)))
+        return solver_class(**options)
+
+
+_SOLVER_CLASSES = {
+    SolverMethods.SIMPLEX: ('systemssolver.methods.simplex', 'SimplexSolver'),
+    SolverMethods.MULTI_OBJECTIVE: ('systemssolver.methods.multiobjective', 'MultiObjectiveSolver'),
+    SolverMethods.LINEAR_SYSTEM: ('systemssolver.methods.linear', 'LinearSystemSolver'),
+    SolverMethods.NETWORK: ('systemssolver.methods.network', 'NetworkSimplexSolver'),
+    SolverMethods.DECOMPOSITION: ('systemssolver.methods.decomposition', 'DecompositionSolver'),
+    SolverMethods.INTEGER: ('systemssolver.methods.integer', 'IntegerSolver'),
+    SolverMethods.QUADRATIC: ('systemssolver.methods.quadratic', 'ActiveSetQPSolver'),
+}
@@ -0,0 +1,512 @@
+"""
+Integer models: the LP relaxation is tightened by cutting planes and probed by cheap primal heuristics before a
+depth-first branch and bound closes the gap.
+
+The cuts and heuristics form a pluggable stage run on the root relaxation. Cut generators return rows over the
+tableau's columns, which are added to the live tableau and re-optimized by the dual simplex; heuristics return
+points over the model's variables, which are checked against the model's own rows before they become the incumbent.
+
+    stage = CutAndHeuristicStage(cuts=[KnapsackCoverCuts()], heuristics=[RoundingHeuristic()])
+    solution = IntegerSolver(stage).solve(problem, StatsHook())
+
+With stats collected the stage counts the cuts each generator added (cuts_<name>), the cut rounds, the points each
+heuristic found (<name>_solutions) and how far the cuts moved the relaxation's bound (bound_improvement), and
+keeps the seconds spent cutting and in heuristics in the cut_seconds and heuristic_seconds counters.
+"""
+import logging
+import math
+import time
+from typing import List, Dict, Tuple, Optional, Sequence
+
+from systemssolver.methods.limits import SolveLimits, LimitClock, LimitReached
+from systemssolver.methods.simplex import Tableau
+from systemssolver.methods.solvermethod import SolverMethod
+from systemssolver.methods.standard import build_tableau, standard_rows, maximization_costs, objective_value
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.modeling.variables import VariableType
+from systemssolver.problem import Problem
+from systemssolver.solution import Solution, SolveStatus
+from systemssolver.tracing.hook import TracingHook
+from systemssolver.tracing.stats import SolveStats, NULL_STATS, Phase
+
+INTEGRALITY_TOLERANCE = 1e-6
+MAX_CUT_ROUNDS = 10
+MAX_NODES = 10000
+
+# A row `coefs.x <= rhs` over the tableau's columns.
+Cut = Tuple[Dict[int, float], float]
+
+
+class IntegerRelaxation:
+    """
+    The LP relaxation of an integer model as the stages see it: the live tableau, whose first columns are the
+    model's variables, and the model's own rows and bounds to check candidate points against.
+    """
+
+    def __init__(self, matrix: MatrixProblem, tableau: Tableau, stats: SolveStats = NULL_STATS,
+                 clock: LimitClock = None):
+        self.matrix = matrix
+        self.tableau = tableau
+        self.stats = stats
+        self.clock = clock
+        self.integer_cols = [col for col, vtype in enumerate(matrix.variable_types) if vtype == VariableType.INTEGER]
+        self.rows, self.rhs = standard_rows(matrix)
+        self.costs, self.constant = maximization_costs(matrix.objectives[0])
+        self.upper = self._upper_bounds()
+
+    def point(self, tableau: Tableau = None) -> List[float]:
+        """ Values of the model's variables at the basis of tableau, the live one by default. """
+        tableau = tableau if tableau is not None else self.tableau
+        return list(tableau.values()[:self.matrix.num_variables])
+
+    def fractional(self, point: Sequence[float]) -> List[int]:
+        return [col for col in self.integer_cols if _fractionality(point[col]) > INTEGRALITY_TOLERANCE]
+
+    def is_feasible(self, point: Sequence[float]) -> bool:
+        if any(val < -INTEGRALITY_TOLERANCE for val in point) or self.fractional(point):
+            return False
+        return all(sum(coef * point[col] for col, coef in row.items()) <= rhs + INTEGRALITY_TOLERANCE * (1 + abs(rhs))
+                   for row, rhs in zip(self.rows, self.rhs))
+
+    def snapped(self, point: Sequence[float]) -> List[float]:
+        """ point with its integer variables, integral within tolerance, set to the exact integers. """
+        integer = set(self.integer_cols)
+        return [round(val) if col in integer else val for col, val in enumerate(point)]
+
+    def objective(self, point: Sequence[float]) -> float:
+        """ Objective at point as a maximization, the orientation of the tableau's objective value. """
+        return sum(coef * point[col] for col, coef in self.costs.items()) + self.constant
+
+    def _upper_bounds(self) -> Dict[int, float]:
+        # Rows on a single variable with a positive coefficient bound it; integer bounds round down.
+        integer = set(self.integer_cols)
+        upper = dict()
+        for row, rhs in zip(self.rows, self.rhs):
+            if len(row) == 1:
+                (col, coef), = row.items()
+                if coef > 0:
+                    bound = rhs / coef
+                    if col in integer:
+                        bound = math.floor(bound + INTEGRALITY_TOLERANCE)
+                    upper[col] = min(upper.get(col, bound), bound)
+        return upper
+
+
+class CutGenerator:
+    name = 'cuts'
+
+    def generate(self, relaxation: IntegerRelaxation) -> List[Cut]:
+        """ Rows cutting off the relaxation's current optimum without excluding any integer feasible point. """
+        return list()
+
+
+class GomoryCuts(CutGenerator):
+    """
+    Gomory mixed-integer cuts read off the final tableau, one per row whose basic integer variable is fractional,
+    the most fractional rows first. Slacks count as continuous. Cuts whose coefficients span more than
+    max_dynamism are dropped as numerically unsafe.
+    """
+    name = 'gomory'
+
+    def __init__(self, max_cuts=20, max_dynamism=1e6):
+        self.max_cuts = max_cuts
+        self.max_dynamism = max_dynamism
+
+    def generate(self, relaxation: IntegerRelaxation) -> List[Cut]:
+        tableau = relaxation.tableau
+        values = tableau.values()
+        integer = set(relaxation.integer_cols)
+        rows = [
+            (row_idx, basic) for row_idx, basic in enumerate(tableau.basic_variables)
+            if basic in integer and _fractionality(values[basic]) > INTEGRALITY_TOLERANCE
+        ]
+        rows.sort(key=lambda item: abs(values[item[1]] % 1 - 0.5))
+
+        cuts = list()
+        for row_idx, basic in rows[:self.max_cuts]:
+            cut = self._cut(tableau.row(row_idx), basic, values[basic] % 1, integer)
+            if cut is not None:
+                cuts.append(cut)
+        return cuts
+
+    def _cut(self, row: List, basic: int, f0: float, integer: set) -> Optional[Cut]:
+        # sum_int min(f_j / f0, (1 - f_j) / (1 - f0)) x_j + sum_cont max(a_j / f0, -a_j / (1 - f0)) x_j >= 1,
+        # written as a <= row.
+        coefs = dict()
+        for col, val in enumerate(row[:-1]):
+            if col == basic or abs(val) <= 1e-12:
+                continue
+            if col in integer:
+                frac = val % 1
+                coef = min(frac / f0, (1 - frac) / (1 - f0))
+            else:
+                coef = max(val / f0, -val / (1 - f0))
+            if coef > 1e-12:
+                coefs[col] = -coef
+        if not coefs:
+            return None
+        magnitudes = [abs(coef) for coef in coefs.values()]
+        if max(magnitudes) > self.max_dynamism * min(magnitudes):
+            return None
+        return coefs, -1
+
+
+class KnapsackCoverCuts(CutGenerator):
+    """
+    Extended cover inequalities for the model's knapsack rows, those with positive coefficients on binary variables
+    only. A cover is grown greedily from the variables closest to one; the cut keeps at most |C| - 1 of the cover
+    and of every variable at least as heavy as its heaviest item.
+    """
+    name = 'cover'
+
+    def generate(self, relaxation: IntegerRelaxation) -> List[Cut]:
+        binary = {col for col in relaxation.integer_cols if relaxation.upper.get(col) == 1}
+        point = relaxation.point()
+        cuts, seen = list(), set()
+        for row, rhs in zip(relaxation.rows, relaxation.rhs):
+            if len(row) < 2 or rhs <= 0 or any(col not in binary or coef <= 0 for col, coef in row.items()):
+                continue
+            cover = self._cover(row, rhs, point)
+            if cover is None:
+                continue
+            heaviest = max(row[col] for col in cover)
+            extended = frozenset(cover) | {col for col, coef in row.items() if coef >= heaviest}
+            if extended in seen:
+                continue
+            if sum(point[col] for col in extended) > len(cover) - 1 + INTEGRALITY_TOLERANCE:
+                seen.add(extended)
+                cuts.append(({col: 1 for col in sorted(extended)}, len(cover) - 1))
+        return cuts
+
+    @staticmethod
+    def _cover(row: Dict[int, float], rhs: float, point: Sequence[float]) -> Optional[List[int]]:
+        cover, weight = list(), 0
+        for col in sorted(row, key=lambda col: (1 - point[col], -row[col])):
+            cover.append(col)
+            weight += row[col]
+            if weight > rhs + INTEGRALITY_TOLERANCE:
+                return cover
+        return None
+
+
+class PrimalHeuristic:
+    name = 'heuristic'
+
+    def find(self, relaxation: IntegerRelaxation) -> Optional[List[float]]:
+        """ A point over the model's variables that may be integer feasible; the stage checks it. """
+        return None
+
+
+class RoundingHeuristic(PrimalHeuristic):
+    """
+    Rounds every fractional variable in a direction no row can object to: down when no row has a negative
+    coefficient on it, up when none has a positive one, to the nearest integer otherwise.
+    """
+    name = 'rounding'
+
+    def find(self, relaxation: IntegerRelaxation) -> Optional[List[float]]:
+        down_locked, up_locked = set(), set()
+        for row in relaxation.rows:
+            for col, coef in row.items():
+                (up_locked if coef > 0 else down_locked).add(col)
+
+        point = relaxation.point()
+        for col in relaxation.fractional(point):
+            if col not in down_locked:
+                point[col] = math.floor(point[col])
+            elif col not in up_locked:
+                point[col] = math.ceil(point[col])
+            else:
+                point[col] = round(point[col])
+        return point
+
+
+class DivingHeuristic(PrimalHeuristic):
+    """
+    Fractional diving: on a copy of the tableau, bounds the least fractional variable to its nearest integer and
+    re-optimizes, until the point is integral or the relaxation becomes infeasible.
+    """
+    name = 'diving'
+
+    def __init__(self, max_depth: int = None):
+        self.max_depth = max_depth
+
+    def find(self, relaxation: IntegerRelaxation) -> Optional[List[float]]:
+        tableau = relaxation.tableau.copy()
+        depth = self.max_depth if self.max_depth is not None else len(relaxation.integer_cols)
+        for _ in range(depth + 1):
+            point = relaxation.point(tableau)
+            fractional = relaxation.fractional(point)
+            if not fractional:
+                return point
+            col = min(fractional, key=lambda col: _fractionality(point[col]))
+            _add_bound(tableau, col, round(point[col]), point[col] % 1 < 0.5)
+            if not _reoptimize(tableau, relaxation.clock):
+                return None
+        return None
+
+
+class FeasibilityPump(PrimalHeuristic):
+    """
+    Alternates between rounding the relaxation's point and moving the point to the relaxation's nearest one, in
+    L1 distance over the integer variables, to that rounding. A rounding seen before is perturbed by flipping the
+    variables furthest from it.
+    """
+    name = 'pump'
+
+    def __init__(self, max_iterations=20, flips=0.1):
+        self.max_iterations = max_iterations
+        self.flips = flips
+
+    def find(self, relaxation: IntegerRelaxation) -> Optional[List[float]]:
+        point = relaxation.point()
+        seen = set()
+        for _ in range(self.max_iterations):
+            rounded = {col: round(point[col]) for col in relaxation.integer_cols}
+            candidate = [rounded.get(col, val) for col, val in enumerate(point)]
+            if relaxation.is_feasible(candidate):
+                return candidate
+
+            key = tuple(rounded.values())
+            if key in seen:
+                self._perturb(relaxation, point, rounded)
+            seen.add(tuple(rounded.values()))
+
+            tableau = self._distance_tableau(relaxation, rounded)
+            if not _reoptimize(tableau, relaxation.clock):
+                return None
+            point = relaxation.point(tableau)
+        return None
+
+    def _perturb(self, relaxation: IntegerRelaxation, point: List[float], rounded: Dict[int, int]):
+        count = max(1, int(self.flips * len(rounded)))
+        for col in sorted(rounded, key=lambda col: -abs(point[col] - rounded[col]))[:count]:
+            step = 1 if point[col] >= rounded[col] else -1
+            upper = relaxation.upper.get(col)
+            if rounded[col] + step >= 0 and (upper is None or rounded[col] + step <= upper):
+                rounded[col] += step
+
+    @staticmethod
+    def _distance_tableau(relaxation: IntegerRelaxation, rounded: Dict[int, int]) -> Tableau:
+        # Variables rounded to a bound are pulled towards it directly; the others through d >= |x - target|.
+        tableau = relaxation.tableau.copy()
+        costs = dict()
+        for col, target in rounded.items():
+            upper = relaxation.upper.get(col)
+            if target <= 0:
+                costs[col] = -1
+            elif upper is not None and target >= upper:
+                costs[col] = 1
+            else:
+                distance = tableau.add_variable('d{}'.format(col))
+                tableau.add_row({col: 1, distance: -1}, target, name='pump')
+                tableau.add_row({col: -1, distance: -1}, -target, name='pump')
+                costs[distance] = -1
+        tableau.set_objective(costs)
+        return tableau
+
+
+class CutAndHeuristicStage:
+    """
+    Runs rounds of the cut generators on the relaxation's live tableau, stopping when a round adds no cuts, the point
+    is integral or the bound stops moving, then every heuristic from the tightened relaxation. Returns the best
+    integer feasible point found, if any.
+    """
+
+    def __init__(self, cuts: List[CutGenerator] = None, heuristics: List[PrimalHeuristic] = None,
+                 max_rounds=MAX_CUT_ROUNDS):
+        self.cuts = cuts if cuts is not None else [GomoryCuts(), KnapsackCoverCuts()]
+        self.heuristics = heuristics if heuristics is not None else \
+            [RoundingHeuristic(), DivingHeuristic(), FeasibilityPump()]
+        self.max_rounds = max_rounds
+
+    def run(self, relaxation: IntegerRelaxation) -> Optional[List[float]]:
+        stats, tableau = relaxation.stats, relaxation.tableau
+        start = time.perf_counter()
+        initial_bound = tableau.objective_value
+        for _ in range(self.max_rounds):
+            if not relaxation.fractional(relaxation.point()):
+                break
+            cuts = list()
+            for generator in self.cuts:
+                generated = generator.generate(relaxation)
+                stats.increment('cuts_{}'.format(generator.name), len(generated))
+                cuts.extend(generated)
+            if not cuts:
+                break
+
+            bound = tableau.objective_value
+            for coefs, rhs in cuts:
+                tableau.add_row(coefs, rhs, name='cut')
+            stats.increment('cut_rounds')
+            stats.increment('cuts_added', len(cuts))
+            try:
+                stats.increment('cut_pivots', tableau.optimize(clock=relaxation.clock, quiet=True))
+            except LimitReached:
+                raise
+            except RuntimeError:
+                # The cuts hold for every integer point, so there is none; branch and bound finds the same.
+                stats.increment('cut_seconds', time.perf_counter() - start)
+                return None
+            if bound - tableau.objective_value <= INTEGRALITY_TOLERANCE * (1 + abs(bound)):
+                break
+        stats.increment('bound_improvement', initial_bound - tableau.objective_value)
+        stats.increment('cut_seconds', time.perf_counter() - start)
+
+        start = time.perf_counter()
+        incumbent = None
+        for heuristic in self.heuristics:
+            point = heuristic.find(relaxation)
+            if point is None or not relaxation.is_feasible(point):
+                continue
+            stats.increment('{}_solutions'.format(heuristic.name))
+            point = relaxation.snapped(point)
+            if incumbent is None or relaxation.objective(point) > relaxation.objective(incumbent):
+                incumbent = point
+        stats.increment('heuristic_seconds', time.perf_counter() - start)
+        return incumbent
+
+
+class IntegerSolver(SolverMethod):
+    """
+    Single objective models with integer variables. The root relaxation goes through the cut and heuristic stage,
+    then a depth-first branch and bound splits on the most fractional variable, re-optimizing a copy of the parent's
+    tableau with the dual simplex and pruning nodes whose bound can't beat the incumbent.
+
+    A solve stopped by its limits, or after max_nodes nodes, returns the incumbent with the best open bound.
+    """
+
+    def __init__(self, stage: CutAndHeuristicStage = None, max_nodes=MAX_NODES, limits: SolveLimits = None):
+        self.stage = stage if stage is not None else CutAndHeuristicStage()
+        self.max_nodes = max_nodes
+        self.limits = limits
+
+    def can_solve(self, problem: Problem) -> bool:
+        matrix = MatrixProblem.from_problem(problem)
+        return len(matrix.objectives) == 1 and matrix.num_constraints > 0 and \
+            EqualitySigns.NOT_EQUAL not in matrix.signs and VariableType.INTEGER in matrix.variable_types and \
+            matrix.is_linear
+
+    def solve(self, problem: Problem, tracing_hook: TracingHook = None) -> Optional[Solution]:
+        if not self.can_solve(problem):
+            return None
+
+        stats = SolveStats() if tracing_hook is not None and tracing_hook.collects_stats else NULL_STATS
+        clock = self.limits.start() if self.limits is not None else None
+        solution = self.solve_matrix(MatrixProblem.from_problem(problem), stats, clock)
+        if stats.enabled:
+            solution.stats = stats
+            tracing_hook.report(stats)
+        return solution
+
+    def solve_matrix(self, matrix: MatrixProblem, stats: SolveStats = NULL_STATS,
+                     clock: LimitClock = None) -> Solution:
+        """ The solve itself, for callers that built the matrix and started the clock, like column generation. """
+        costs, constant = maximization_costs(matrix.objectives[0])
+        tableau = build_tableau(matrix, costs, constant, stats)
+        relaxation = IntegerRelaxation(matrix, tableau, stats, clock)
+
+        incumbent, bound, status = None, None, None
+        try:
+            stats.increment('root_pivots', tableau.optimize(clock=clock))
+            bound = tableau.objective_value
+            incumbent = self.stage.run(relaxation)
+            bound = tableau.objective_value
+            incumbent, bound = self._branch(relaxation, incumbent)
+        except _Stopped as e:
+            status, incumbent, bound = e.status, e.incumbent, e.bound
+        except LimitReached as e:
+            status = e.status
+
+        if incumbent is None and status is None:
+            logging.error("No integer point satisfies the constraints")
+            raise RuntimeError("Infeasible problem")
+        if status is not None:
+            stats.increment('limit_stops')
+
+        with stats.timer(Phase.EXTRACTION):
+            point = incumbent if incumbent is not None else relaxation.point()
+            solution = Solution(matrix.variable_names + ['z'],
+                                [-val if inverted else val for val, inverted in zip(point, matrix.inverted)] +
+                                [relaxation.objective(point)])
+            solution.objective_values = [objective_value(matrix.objectives[0], point)]
+            if status is not None:
+                solution.status, solution.feasible, solution.bound = status, incumbent is not None, bound
+        return solution
+
+    def _branch(self, relaxation: IntegerRelaxation, incumbent: Optional[List[float]]) -> Tuple[List[float], float]:
+        stats, clock = relaxation.stats, relaxation.clock
+        best = relaxation.objective(incumbent) if incumbent is not None else None
+        # Open nodes with the bound of their parent, the best any point in them can reach.
+        stack: List[Tuple[Tableau, float]] = [(relaxation.tableau, relaxation.tableau.objective_value)]
+        nodes = 0
+        while stack:
+            tableau, parent_bound = stack[-1]
+            status = clock.check(tableau) if clock is not None else None
+            if status is None and nodes >= self.max_nodes:
+                status = SolveStatus.ITERATION_LIMIT
+            if status is not None:
+                raise _Stopped(status, incumbent, max(bound for _, bound in stack))
+            stack.pop()
+            nodes += 1
+            stats.increment('nodes')
+
+            try:
+                stats.increment('node_pivots', tableau.optimize(clock=clock, quiet=True))
+            except LimitReached as e:
+                stack.append((tableau, parent_bound))
+                raise _Stopped(e.status, incumbent, max(bound for _, bound in stack))
+            except RuntimeError:
+                stats.increment('nodes_infeasible')
+                continue
+
+            value = tableau.objective_value
+            if best is not None and value <= best + INTEGRALITY_TOLERANCE * (1 + abs(best)):
+                stats.increment('nodes_pruned')
+                continue
+            point = relaxation.point(tableau)
+            fractional = relaxation.fractional(point)
+            if not fractional:
+                incumbent = relaxation.snapped(point)
+                best = relaxation.objective(incumbent)
+                stats.increment('incumbents')
+                continue
+
+            col = max(fractional, key=lambda col: _fractionality(point[col]))
+            down = tableau.copy()
+            _add_bound(down, col, math.floor(point[col]), True)
+            _add_bound(tableau, col, math.ceil(point[col]), False)
+            # The side the point leans to is explored first.
+            children = [(tableau, value), (down, value)] if point[col] % 1 < 0.5 else [(down, value), (tableau, value)]
+            stack.extend(children)
+        return incumbent, best
+
+
+class _Stopped(Exception):
+
+    def __init__(self, status: SolveStatus, incumbent: Optional[List[float]], bound: float):
+        super().__init__(status.value)
+        self.status, self.incumbent, self.bound = status, incumbent, bound
+
+
+def _fractionality(val) -> float:
+    return abs(val - round(val))
+
+
+def _add_bound(tableau: Tableau, col: int, val: int, upper: bool):
+    if upper:
+        tableau.add_row({col: 1}, val, name='bound')
+    else:
+        tableau.add_row({col: -1}, -val, name='bound')
+
+
+def _reoptimize(tableau: Tableau, clock: LimitClock) -> bool:
+    """ Re-optimizes after bounds or rows were added; False when that made the relaxation infeasible. """
+    try:
+        tableau.optimize(clock=clock, quiet=True)
+    except LimitReached:
+        raise
+    except RuntimeError:
+        return False
+    return True
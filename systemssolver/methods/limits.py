@@ -0,0 +1,81 @@
+"""
+Bounds on a single solve: wall-clock time, iterations, tableau memory and cooperative cancellation from another
+thread. Solvers check them once per pivot and, when one is hit, return the best point found so far tagged with the
+SolveStatus saying why they stopped.
+"""
+import logging
+import threading
+import time
+from typing import Optional
+
+from systemssolver.solution import SolveStatus
+
+
+class CancellationToken:
+    """ Shared between the thread running a solve and any thread that may want to stop it. """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class LimitReached(RuntimeError):
+
+    def __init__(self, status: SolveStatus):
+        super().__init__("Solve stopped: {}".format(status.value))
+        self.status = status
+
+
+class SolveLimits:
+    """
+    time_limit is in seconds from the start of the solve, max_memory in bytes of tableau storage. Any limit left as
+    None is not checked. One SolveLimits can be shared by many solves, each call to start() gets its own clock.
+    """
+
+    def __init__(self, time_limit: float = None, max_iterations: int = None, max_memory: int = None,
+                 cancel_token: CancellationToken = None):
+        self.time_limit = time_limit
+        self.max_iterations = max_iterations
+        self.max_memory = max_memory
+        self.cancel_token = cancel_token
+
+    def start(self) -> 'LimitClock':
+        return LimitClock(self)
+
+
+class LimitClock:
+
+    def __init__(self, limits: SolveLimits):
+        self._limits = limits
+        self._deadline = time.perf_counter() + limits.time_limit if limits.time_limit is not None else None
+        self.iterations = 0
+
+    def tick(self, tableau=None) -> Optional[SolveStatus]:
+        """ Counts one iteration, then returns the status of the first limit hit, if any. """
+        self.iterations += 1
+        return self.check(tableau)
+
+    def check(self, tableau=None) -> Optional[SolveStatus]:
+        limits = self._limits
+        if limits.cancel_token is not None and limits.cancel_token.cancelled:
+            return SolveStatus.CANCELLED
+        if limits.max_iterations is not None and self.iterations >= limits.max_iterations:
+            return SolveStatus.ITERATION_LIMIT
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            return SolveStatus.TIME_LIMIT
+        if limits.max_memory is not None and tableau is not None and tableau.memory_size() > limits.max_memory:
+            return SolveStatus.MEMORY_LIMIT
+        return None
+
+    def raise_on_limit(self, tableau=None):
+        status = self.tick(tableau)
+        if status is not None:
+            logging.warning("Solve stopped after {} iterations: {}".format(self.iterations, status.value))
+            raise LimitReached(status)
+
@@ -0,0 +1,330 @@
+"""
+Direct solver for systems of equalities with no objective. Square systems are factored by LU, with a sparse
+Markowitz-ordered elimination when the matrix is sparse enough; singular, over- and under-determined systems fall
+back to a Householder QR with column pivoting, which gives the least-squares solution when there are more equations
+than unknowns and the minimum-norm one when there are fewer.
+
+Factorizations are cached on the coefficients, so solving the same system for many right hand sides pays for the
+factorization once.
+"""
+import logging
+import math
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from typing import List, Dict, Optional, Sequence, Tuple
+
+from systemssolver.methods.solvermethod import SolverMethod
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.problem import Problem
+from systemssolver.solution import Solution
+from systemssolver.tracing.hook import TracingHook
+from systemssolver.tracing.stats import SolveStats, NULL_STATS
+
+TOLERANCE = 1e-12
+
+# Below this density square systems use the sparse LU, above it the dense one.
+SPARSE_DENSITY = 0.1
+
+CACHED_FACTORIZATIONS = 8
+
+
+class SingularMatrix(RuntimeError):
+    pass
+
+
+class Factorization(ABC):
+
+    @abstractmethod
+    def solve(self, rhs: Sequence[float]) -> List[float]:
+        pass
+
+
+class DenseLU(Factorization):
+    """ PA = LU with partial pivoting, L unit lower triangular, both stored in one square list of rows. """
+
+    def __init__(self, matrix: List[List[float]], tolerance=TOLERANCE):
+        size = len(matrix)
+        lu = [list(row) for row in matrix]
+        perm = list(range(size))
+        threshold = tolerance * max((abs(val) for row in lu for val in row), default=0)
+        for k in range(size):
+            pivot_idx = max(range(k, size), key=lambda idx: abs(lu[idx][k]))
+            if abs(lu[pivot_idx][k]) <= threshold:
+                raise SingularMatrix()
+            lu[k], lu[pivot_idx] = lu[pivot_idx], lu[k]
+            perm[k], perm[pivot_idx] = perm[pivot_idx], perm[k]
+
+            pivot_row = lu[k]
+            for row in lu[k + 1:]:
+                multiplier = row[k] / pivot_row[k]
+                row[k] = multiplier
+                if multiplier != 0:
+                    for col in range(k + 1, size):
+                        row[col] -= multiplier * pivot_row[col]
+        self._lu, self._perm = lu, perm
+
+    def solve(self, rhs: Sequence[float]) -> List[float]:
+        lu, size = self._lu, len(self._lu)
+        vals = [rhs[idx] for idx in self._perm]
+        for i in range(size):
+            vals[i] -= sum(lu[i][j] * vals[j] for j in range(i))
+        for i in reversed(range(size)):
+            vals[i] = (vals[i] - sum(lu[i][j] * vals[j] for j in range(i + 1, size))) / lu[i][i]
+        return vals
+
+
+class SparseLU(Factorization):
+    """
+    Gaussian elimination on dict rows. Each step pivots on the column with the fewest entries left, and within it on
+    the shortest row whose entry is within a factor of 10 of the column's largest, to keep fill-in down.
+    """
+
+    def __init__(self, rows: List[Dict[int, float]], size: int, tolerance=TOLERANCE):
+        rows = [dict(row) for row in rows]
+        threshold = tolerance * max((abs(val) for row in rows for val in row.values()), default=0)
+        col_rows = [set() for _ in range(size)]
+        for row_idx, row in enumerate(rows):
+            for col in row:
+                col_rows[col].add(row_idx)
+
+        active_cols = set(range(size))
+        self._steps: List[Tuple[int, int, Dict[int, float], List[Tuple[int, float]]]] = list()
+        for _ in range(size):
+            col = min(active_cols, key=lambda idx: (len(col_rows[idx]), idx))
+            candidates = col_rows[col]
+            largest = max((abs(rows[row_idx][col]) for row_idx in candidates), default=0)
+            if largest <= threshold:
+                raise SingularMatrix()
+            pivot_idx = min((row_idx for row_idx in candidates if abs(rows[row_idx][col]) >= 0.1 * largest),
+                            key=lambda row_idx: (len(rows[row_idx]), row_idx))
+            upper = rows[pivot_idx]
+
+            eliminations = list()
+            for row_idx in list(candidates):
+                if row_idx == pivot_idx:
+                    continue
+                target = rows[row_idx]
+                multiplier = target[col] / upper[col]
+                for upper_col, upper_val in upper.items():
+                    val = target.get(upper_col, 0) - multiplier * upper_val
+                    if upper_col == col or abs(val) <= threshold:
+                        target.pop(upper_col, None)
+                        col_rows[upper_col].discard(row_idx)
+                    else:
+                        target[upper_col] = val
+                        col_rows[upper_col].add(row_idx)
+                eliminations.append((row_idx, multiplier))
+
+            for upper_col in upper:
+                col_rows[upper_col].discard(pivot_idx)
+            active_cols.remove(col)
+            self._steps.append((pivot_idx, col, upper, eliminations))
+        self._size = size
+
+    def solve(self, rhs: Sequence[float]) -> List[float]:
+        vals = list(rhs)
+        for pivot_idx, _, _, eliminations in self._steps:
+            for row_idx, multiplier in eliminations:
+                vals[row_idx] -= multiplier * vals[pivot_idx]
+        solution = [0.0] * self._size
+        for pivot_idx, col, upper, _ in reversed(self._steps):
+            total = vals[pivot_idx] - sum(val * solution[other] for other, val in upper.items() if other != col)
+            solution[col] = total / upper[col]
+        return solution
+
+
+class QRFactorization(Factorization):
+    """
+    Householder QR with column pivoting, which finds the numerical rank. With at least as many equations as unknowns
+    A is factored and solve returns the least-squares solution; with fewer, A transposed is factored and solve
+    returns the minimum-norm solution. Unknowns beyond the rank are left at zero.
+    """
+
+    def __init__(self, matrix: List[List[float]], num_cols: int, tolerance=TOLERANCE):
+        self._num_rows, self._num_cols = len(matrix), num_cols
+        self._transposed = self._num_rows < num_cols
+        if self._transposed:
+            matrix = [[matrix[row][col] for row in range(self._num_rows)] for col in range(num_cols)]
+        self._r, self._reflectors, self._perm, self.rank = _householder_qr(matrix, tolerance)
+
+    def solve(self, rhs: Sequence[float]) -> List[float]:
+        r, rank = self._r, self.rank
+        if not self._transposed:
+            vals = list(rhs)
+            for start, vector, beta in self._reflectors:
+                _reflect(vals, start, vector, beta)
+            solution = [0.0] * self._num_cols
+            coefs = _back_substitute(r, vals, rank)
+            for idx in range(rank):
+                solution[self._perm[idx]] = coefs[idx]
+            return solution
+
+        # A^T P = Q R, so P^T A = R^T Q^T: solve R^T w = P^T b, then x = Q w.
+        permuted = [rhs[idx] for idx in self._perm]
+        weights = [0.0] * self._num_cols
+        for i in range(rank):
+            weights[i] = (permuted[i] - sum(r[j][i] * weights[j] for j in range(i))) / r[i][i]
+        for start, vector, beta in reversed(self._reflectors):
+            _reflect(weights, start, vector, beta)
+        return weights
+
+
+def _householder_qr(matrix: List[List[float]], tolerance: float):
+    a = [list(row) for row in matrix]
+    num_rows, num_cols = len(a), len(a[0]) if a else 0
+    perm = list(range(num_cols))
+    reflectors = list()
+    threshold = tolerance * max((abs(val) for row in a for val in row), default=0) * max(num_rows, 1)
+    rank = 0
+    for k in range(min(num_rows, num_cols)):
+        norms = [math.sqrt(sum(a[i][col] ** 2 for i in range(k, num_rows))) for col in range(k, num_cols)]
+        best = max(range(len(norms)), key=lambda idx: norms[idx])
+        if norms[best] <= threshold:
+            break
+        col = k + best
+        for row in a:
+            row[k], row[col] = row[col], row[k]
+        perm[k], perm[col] = perm[col], perm[k]
+
+        vector = [a[i][k] for i in range(k, num_rows)]
+        alpha = -math.copysign(norms[best], vector[0])
+        vector[0] -= alpha
+        norm_sq = sum(val * val for val in vector)
+        if norm_sq > 0:
+            beta = 2 / norm_sq
+            for col_idx in range(k, num_cols):
+                dot = beta * sum(vector[i] * a[k + i][col_idx] for i in range(len(vector)))
+                if dot != 0:
+                    for i in range(len(vector)):
+                        a[k + i][col_idx] -= dot * vector[i]
+            reflectors.append((k, vector, beta))
+        rank = k + 1
+    return a, reflectors, perm, rank
+
+
+def _reflect(vals: List[float], start: int, vector: List[float], beta: float):
+    dot = beta * sum(vector[i] * vals[start + i] for i in range(len(vector)))
+    for i in range(len(vector)):
+        vals[start + i] -= dot * vector[i]
+
+
+def _back_substitute(r: List[List[float]], vals: List[float], rank: int) -> List[float]:
+    coefs = [0.0] * rank
+    for i in reversed(range(rank)):
+        coefs[i] = (vals[i] - sum(r[i][j] * coefs[j] for j in range(i + 1, rank))) / r[i][i]
+    return coefs
+
+
+class LinearSystemSolver(SolverMethod):
+    """
+    Solves problems made only of equality constraints and no objective. The solution's feasible flag is False when
+    the system is inconsistent and the values are a least-squares fit.
+    """
+
+    def __init__(self, sparse: Optional[bool] = None, tolerance=TOLERANCE):
+        self.sparse = sparse
+        self.tolerance = tolerance
+        self._cache: 'OrderedDict[tuple, Factorization]' = OrderedDict()
+
+    def can_solve(self, problem: Problem) -> bool:
+        matrix = MatrixProblem.from_problem(problem)
+        return len(matrix.objectives) == 0 and matrix.num_constraints > 0 and \
+            all(sign == EqualitySigns.EQUAL for sign in matrix.signs)
+
+    def solve(self, problem: Problem, tracing_hook: TracingHook = None) -> Optional[Solution]:
+        solutions = self.solve_many(problem, None, tracing_hook)
+        return solutions[0] if solutions is not None else None
+
+    def solve_many(self, problem: Problem, rhs_sets: Optional[List[Sequence[float]]],
+                   tracing_hook: TracingHook = None) -> Optional[List[Solution]]:
+        """ One solution per right hand side, the problem's own when rhs_sets is None, all from one factorization. """
+        matrix = MatrixProblem.from_problem(problem)
+        if not self.can_solve(matrix):
+            return None
+
+        stats = SolveStats() if tracing_hook is not None and tracing_hook.collects_stats else NULL_STATS
+        factorization = self.factorize(matrix, stats)
+        rows = _row_dicts(matrix)
+
+        solutions = list()
+        for rhs in rhs_sets if rhs_sets is not None else [matrix.rhs]:
+            if len(rhs) != matrix.num_constraints:
+                raise ValueError('Expected {} right hand side values, got {}'.format(matrix.num_constraints, len(rhs)))
+            values = factorization.solve(rhs)
+            solution = Solution(matrix.variable_names, [
+                -val if inverted else val for val, inverted in zip(values, matrix.inverted)])
+            solution.feasible = _residual(rows, values, rhs) <= self._scale(matrix, rhs)
+            solutions.append(solution)
+
+        if stats.enabled:
+            for solution in solutions:
+                solution.stats = stats
+            tracing_hook.report(stats)
+        return solutions
+
+    def factorize(self, problem: Problem, stats: SolveStats = NULL_STATS) -> Factorization:
+        matrix = MatrixProblem.from_problem(problem)
+        key = _cache_key(matrix)
+        factorization = self._cache.get(key)
+        if factorization is not None:
+            self._cache.move_to_end(key)
+            stats.increment('factorization_cache_hits')
+            return factorization
+
+        factorization = self._factorize(matrix)
+        stats.increment('factorizations')
+        self._cache[key] = factorization
+        if len(self._cache) > CACHED_FACTORIZATIONS:
+            self._cache.popitem(last=False)
+        return factorization
+
+    def _factorize(self, matrix: MatrixProblem) -> Factorization:
+        rows = _row_dicts(matrix)
+        size = matrix.num_variables
+        if matrix.num_constraints == size:
+            nnz = sum(len(row) for row in rows)
+            sparse = self.sparse if self.sparse is not None else nnz < SPARSE_DENSITY * size * size
+            try:
+                if sparse:
+                    return SparseLU(rows, size, self.tolerance)
+                return DenseLU(_dense(rows, size), self.tolerance)
+            except SingularMatrix:
+                logging.warning("Singular system, solving it in the least-squares sense")
+        return QRFactorization(_dense(rows, size), size, self.tolerance)
+
+    def _scale(self, matrix: MatrixProblem, rhs: Sequence[float]) -> float:
+        # Residuals are compared relative to the size of the data.
+        largest = max([abs(val) for val in matrix.rows.data] + [abs(val) for val in rhs] + [1])
+        return math.sqrt(self.tolerance) * largest * max(matrix.num_constraints, 1)
+
+
+def _row_dicts(matrix: MatrixProblem) -> List[Dict[int, float]]:
+    rows = list()
+    for row_idx in range(matrix.num_constraints):
+        row = dict()
+        for col, coef in zip(*matrix.rows.row(row_idx)):
+            row[col] = row.get(col, 0) + coef
+        rows.append({col: coef for col, coef in row.items() if coef != 0})
+    return rows
+
+
+def _dense(rows: List[Dict[int, float]], num_cols: int) -> List[List[float]]:
+    dense = list()
+    for row in rows:
+        values = [0.0] * num_cols
+        for col, coef in row.items():
+            values[col] = coef
+        dense.append(values)
+    return dense
+
+
+def _residual(rows: List[Dict[int, float]], values: Sequence[float], rhs: Sequence[float]) -> float:
+    return math.sqrt(sum((sum(coef * values[col] for col, coef in row.items()) - val) ** 2
+                         for row, val in zip(rows, rhs)))
+
+
+def _cache_key(matrix: MatrixProblem) -> tuple:
+    return (matrix.num_variables, array('q', matrix.rows.indptr).tobytes(), array('q', matrix.rows.indices).tobytes(),
+            array('d', matrix.rows.data).tobytes())
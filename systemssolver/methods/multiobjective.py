@@ -0,0 +1,174 @@
+from enum import Enum
+from itertools import combinations
+from typing import List, Optional, Sequence, Iterator
+
+from systemssolver.methods.limits import SolveLimits, LimitClock, LimitReached
+from systemssolver.methods.precision import Precision
+from systemssolver.methods.pricing import PricingMode
+from systemssolver.methods.simplex import Tableau, separate_rows
+from systemssolver.methods.solvermethod import SolverMethod
+from systemssolver.methods.standard import build_tableau, maximization_costs, objective_value
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.problem import Problem
+from systemssolver.solution import Solution
+from systemssolver.tracing.hook import TracingHook
+from systemssolver.tracing.stats import SolveStats, NULL_STATS, Phase
+
+
+class MultiObjectiveMode(Enum):
+    LEXICOGRAPHIC = 'lexicographic'
+    WEIGHTED = 'weighted'
+
+    @staticmethod
+    def from_val(val):
+        for mode in MultiObjectiveMode:
+            if mode.value == val.lower():
+                return mode
+        return None
+
+
+class MultiObjectiveSolver(SolverMethod):
+    """
+    Solves problems with several objectives on a single tableau. Lexicographic mode optimizes the objectives in the
+    order they were added, each stage adding a row that keeps the previous optimum and re-optimizing from the
+    previous basis. Weighted mode optimizes the weighted sum of the objectives, all taken as maximizations.
+    A non-zero tolerance lets each stage give up that fraction of the previous optimum.
+
+    A solve stopped by its limits returns the point of the last completed lexicographic stage, which is feasible and
+    optimal for the objectives up to that stage.
+
+    pricing and precision set the tableau's pricing rule and row storage, see systemssolver.methods.pricing and
+    systemssolver.methods.precision.
+    """
+
+    def __init__(self, mode=MultiObjectiveMode.LEXICOGRAPHIC, weights: Sequence[float] = None, tolerance=0.0,
+                 limits: SolveLimits = None, pricing=PricingMode.DANTZIG, precision=Precision.DOUBLE):
+        self.mode, self.weights, self.tolerance, self.limits = mode, weights, tolerance, limits
+        self.pricing = pricing
+        self.precision = precision
+
+    def can_solve(self, problem: Problem) -> bool:
+        matrix = MatrixProblem.from_problem(problem)
+        return len(matrix.objectives) > 0 and matrix.num_constraints > 0 and \
+            EqualitySigns.NOT_EQUAL not in matrix.signs and matrix.is_linear
+
+    def solve(self, problem: Problem, tracing_hook: TracingHook = None) -> Optional[Solution]:
+        if not self.can_solve(problem):
+            return None
+
+        stats = SolveStats() if tracing_hook is not None and tracing_hook.collects_stats else NULL_STATS
+        matrix = MatrixProblem.from_problem(problem)
+        clock = self.limits.start() if self.limits is not None else None
+        if self.mode == MultiObjectiveMode.LEXICOGRAPHIC:
+            costs, constant = maximization_costs(matrix.objectives[0])
+        else:
+            costs, constant = self._weighted_costs(matrix, self.weights)
+        tableau = build_tableau(matrix, costs, constant, stats)
+        tableau.pricing = self.pricing
+        tableau.precision = self.precision
+
+        separator = tracing_hook if tracing_hook is not None and tracing_hook.separates_rows else None
+        completed = None
+        try:
+            if self.mode == MultiObjectiveMode.LEXICOGRAPHIC:
+                for completed in self._solve_lexicographic(matrix, tableau, stats, clock, separator):
+                    pass
+            else:
+                stats.increment('pivots_stage_0', tableau.optimize(clock=clock))
+                if separator is not None:
+                    stats.increment('pivots_stage_0', separate_rows(tableau, separator, clock, stats))
+        except LimitReached as e:
+            stats.increment('limit_stops')
+            solution = self._to_solution(matrix, tableau, stats, completed)
+            solution.status, solution.feasible = e.status, completed is not None
+        else:
+            solution = self._to_solution(matrix, tableau, stats)
+        if stats.enabled:
+            solution.stats = stats
+            tracing_hook.report(stats)
+        return solution
+
+    def pareto_front(self, problem: Problem, weight_sets: List[Sequence[float]] = None, steps=4) -> List[Solution]:
+        """
+        Supported points of the Pareto front, found by sweeping the weighted objective over weight_sets (by default
+        every weight vector on a grid of the given number of steps). Each point is re-optimized from the basis of
+        the previous one, and duplicated points are dropped.
+        """
+        matrix = MatrixProblem.from_problem(problem)
+        weight_sets = weight_sets if weight_sets is not None else _weight_grid(len(matrix.objectives), steps)
+
+        front = list()
+        seen = set()
+        tableau = None
+        for weights in weight_sets:
+            costs, constant = self._weighted_costs(matrix, weights)
+            if tableau is None:
+                tableau = build_tableau(matrix, costs, constant)
+                tableau.pricing = self.pricing
+                tableau.precision = self.precision
+            else:
+                tableau.set_objective(costs, constant)
+            tableau.optimize()
+
+            point = tableau.values()[:matrix.num_variables]
+            if point in seen:
+                continue
+            seen.add(point)
+            front.append(self._to_solution(matrix, tableau, NULL_STATS))
+        return front
+
+    def _solve_lexicographic(self, matrix: MatrixProblem, tableau: Tableau, stats: SolveStats,
+                             clock: Optional[LimitClock], separator: TracingHook = None) -> Iterator[tuple]:
+        """
+        Runs the stages on a tableau built for the first objective, yielding the point each one ends at. Lazy
+        constraints from the separator are added at every stage's optimum, and stay for the later stages.
+        """
+        for stage, objective in enumerate(matrix.objectives):
+            costs, constant = maximization_costs(objective)
+            if stage > 0:
+                tableau.set_objective(costs, constant)
+            stats.increment('pivots_stage_{}'.format(stage), tableau.optimize(clock=clock))
+            if separator is not None:
+                stats.increment('pivots_stage_{}'.format(stage), separate_rows(tableau, separator, clock, stats))
+            yield tableau.values()
+
+            if stage < len(matrix.objectives) - 1:
+                # costs.x >= optimum - slack, written as a <= row. It is tight at the current vertex, so the next
+                # stage starts primal feasible from the same basis.
+                optimum = tableau.objective_value - constant
+                slack = self.tolerance * max(1, abs(optimum))
+                tableau.add_row({col: -coef for col, coef in costs.items()}, -optimum + slack,
+                                name='lex{}'.format(stage))
+
+    def _weighted_costs(self, matrix: MatrixProblem, weights: Optional[Sequence[float]]):
+        weights = weights if weights is not None else [1] * len(matrix.objectives)
+        if len(weights) != len(matrix.objectives):
+            raise ValueError('Expected {} weights, got {}'.format(len(matrix.objectives), len(weights)))
+        combined, combined_constant = dict(), 0
+        for weight, objective in zip(weights, matrix.objectives):
+            costs, constant = maximization_costs(objective)
+            for col, coef in costs.items():
+                combined[col] = combined.get(col, 0) + weight * coef
+            combined_constant += weight * constant
+        return combined, combined_constant
+
+    def _to_solution(self, matrix: MatrixProblem, tableau: Tableau, stats: SolveStats,
+                     values: tuple = None) -> Solution:
+        with stats.timer(Phase.EXTRACTION):
+            values = values if values is not None else tableau.values()
+            solution = tableau.to_solution(values)
+            solution.objective_values = [objective_value(objective, values) for objective in matrix.objectives]
+            return solution
+
+
+def _weight_grid(count: int, steps: int) -> List[List[float]]:
+    """ Every weight vector of count non-negative entries in multiples of 1/steps that sum to one. """
+    if count == 1:
+        return [[1.0]]
+    grid = list()
+    # Stars and bars: choose where the count - 1 bars go among steps + count - 1 slots.
+    for bars in combinations(range(steps + count - 1), count - 1):
+        bounds = (-1,) + bars + (steps + count - 1,)
+        grid.append([(bounds[i + 1] - bounds[i] - 1) / steps for i in range(count)])
+    return grid
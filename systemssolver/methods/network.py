@@ -0,0 +1,387 @@
+"""
+Network structure detection and a network simplex for min-cost flow models.
+
+A constraint matrix is a network when its rows can be scaled by +1 or -1 so every column has at most one +1 and at
+most one -1: rows are then nodes, columns are arcs leaving the node of their +1 and entering the node of their -1,
+and a column with a single entry is an arc to or from a root node that absorbs the slack of inequality rows. Rows
+that don't fit are side constraints.
+
+The network simplex keeps a spanning tree of arcs rooted at that node, prices arcs with node potentials and pivots by
+pushing flow around the cycle an entering arc closes. Each pivot costs a walk over the tree rather than a pass over a
+dense tableau.
+"""
+import logging
+from typing import List, Dict, Optional, Tuple
+
+from systemssolver.methods.limits import SolveLimits, LimitClock, LimitReached
+from systemssolver.methods.solvermethod import SolverMethod
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.modeling.objective import ObjectiveGoal
+from systemssolver.problem import Problem
+from systemssolver.solution import Solution
+from systemssolver.tracing.hook import TracingHook
+from systemssolver.tracing.stats import SolveStats, NULL_STATS, Phase
+
+EPSILON = 1e-9
+
+# Largest share of the rows that may be side constraints for a model to still count as a network.
+MAX_SIDE_FRACTION = 0.2
+
+
+class NetworkStructure:
+    """
+    orientation[row] is the +1 or -1 a network row is scaled by, or 0 for a side row. arcs[col] is the
+    (tail, head) pair of network rows a column runs between, None standing for the root, or None when the column
+    has no entry in any network row.
+    """
+
+    def __init__(self, orientation: List[int], arcs: List[Optional[Tuple[Optional[int], Optional[int]]]]):
+        self.orientation = orientation
+        self.arcs = arcs
+
+    @property
+    def network_rows(self) -> List[int]:
+        return [row for row, orientation in enumerate(self.orientation) if orientation != 0]
+
+    @property
+    def side_rows(self) -> List[int]:
+        return [row for row, orientation in enumerate(self.orientation) if orientation == 0]
+
+    @property
+    def is_pure(self) -> bool:
+        return all(orientation != 0 for orientation in self.orientation)
+
+
+def detect_network(problem: Problem) -> NetworkStructure:
+    """
+    Greedily takes rows into the network in order. A row is taken when all its coefficients are +1 or -1, it has
+    no column that already has two network entries, and some choice of signs for it and the rows it is linked to
+    keeps every column at one +1 and one -1. Linked rows are tracked as components whose signs flip together.
+    """
+    matrix = MatrixProblem.from_problem(problem)
+    rows = [_row_dict(matrix, row_idx) for row_idx in range(matrix.num_constraints)]
+    parent: Dict[int, int] = dict()
+    parity: Dict[int, int] = dict()
+
+    def find(row: int) -> Tuple[int, int]:
+        flip = 0
+        while parent[row] != row:
+            flip ^= parity[row]
+            row = parent[row]
+        return row, flip
+
+    col_entries: List[List[int]] = [list() for _ in range(matrix.num_variables)]
+    accepted = [False] * matrix.num_constraints
+    for row_idx, row in enumerate(rows):
+        if matrix.signs[row_idx] == EqualitySigns.NOT_EQUAL or not row or \
+                any(abs(coef) != 1 for coef in row.values()) or any(len(col_entries[col]) >= 2 for col in row):
+            continue
+
+        # The parity this row needs relative to the root of each component it touches. Equal signs in a column
+        # need opposite orientations, opposite signs the same one.
+        needs: Dict[int, int] = dict()
+        consistent = True
+        for col, coef in row.items():
+            for other in col_entries[col]:
+                root, flip = find(other)
+                need = flip ^ (1 if coef == rows[other][col] else 0)
+                if needs.setdefault(root, need) != need:
+                    consistent = False
+        if not consistent:
+            continue
+
+        parent[row_idx], parity[row_idx] = row_idx, 0
+        for root, need in needs.items():
+            parent[root], parity[root] = row_idx, need
+        for col in row:
+            col_entries[col].append(row_idx)
+        accepted[row_idx] = True
+
+    orientation = [0] * matrix.num_constraints
+    for row_idx in range(matrix.num_constraints):
+        if accepted[row_idx]:
+            orientation[row_idx] = -1 if find(row_idx)[1] else 1
+
+    arcs: List[Optional[Tuple[Optional[int], Optional[int]]]] = list()
+    for col, entries in enumerate(col_entries):
+        if not entries:
+            arcs.append(None)
+            continue
+        tail, head = None, None
+        for row_idx in entries:
+            if orientation[row_idx] * rows[row_idx][col] > 0:
+                tail = row_idx
+            else:
+                head = row_idx
+        arcs.append((tail, head))
+    return NetworkStructure(orientation, arcs)
+
+
+class NetworkSimplex:
+    """
+    Min-cost flow with non-negative flows and no capacities: minimize costs.flow subject to, at every node,
+    flow out minus flow in equal to its balance. Balances must sum to zero. Node num_nodes - 1 is the tree root.
+    """
+
+    def __init__(self, num_nodes: int, tails: List[int], heads: List[int], costs: List[float],
+                 balances: List[float], stats: SolveStats = NULL_STATS):
+        self._stats = stats
+        self._num_nodes = num_nodes
+        self._num_arcs = len(tails)
+        root = num_nodes - 1
+
+        # Big-M start: one artificial arc between every node and the root carries that node's balance. M exceeds
+        # the cost of any path, so optimal flows leave the artificial arcs empty whenever the network is feasible.
+        big_m = 1 + num_nodes * max([abs(cost) for cost in costs] + [1])
+        self._tails, self._heads = list(tails), list(heads)
+        self._costs = list(costs)
+        self._flows = [0.0] * len(tails)
+        self._in_tree = [False] * len(tails)
+        for node in range(num_nodes - 1):
+            if balances[node] >= 0:
+                self._add_arc(node, root, big_m, balances[node])
+            else:
+                self._add_arc(root, node, big_m, -balances[node])
+        self._root = root
+        self._next_price = 0
+        self._block = max(1, int(len(self._tails) ** 0.5))
+        self._rebuild_tree()
+
+    def _add_arc(self, tail: int, head: int, cost: float, flow: float):
+        self._tails.append(tail)
+        self._heads.append(head)
+        self._costs.append(cost)
+        self._flows.append(flow)
+        self._in_tree.append(True)
+
+    @property
+    def flows(self) -> List[float]:
+        return self._flows[:self._num_arcs]
+
+    @property
+    def is_feasible(self) -> bool:
+        return all(flow <= EPSILON for flow in self._flows[self._num_arcs:])
+
+    def optimize(self, clock: LimitClock = None) -> int:
+        """ Pivots until no arc prices out. Returns the number of pivots; raises RuntimeError when unbounded. """
+        pivots = 0
+        while True:
+            with self._stats.timer(Phase.PRICING):
+                entering = self._entering_arc()
+            if entering is None:
+                return pivots
+            self._pivot(entering)
+            pivots += 1
+            if clock is not None:
+                clock.raise_on_limit()
+
+    def _entering_arc(self) -> Optional[int]:
+        # Block pricing: the most negative reduced cost within the first block, from where the last search
+        # stopped, that has any.
+        tails, heads, costs = self._tails, self._heads, self._costs
+        potentials, in_tree = self._potentials, self._in_tree
+        count = len(tails)
+        best, best_cost = None, -EPSILON
+        for checked in range(count):
+            arc = (self._next_price + checked) % count
+            if not in_tree[arc]:
+                reduced = costs[arc] - potentials[tails[arc]] + potentials[heads[arc]]
+                if reduced < best_cost:
+                    best, best_cost = arc, reduced
+            if best is not None and (checked + 1) % self._block == 0:
+                self._next_price = (arc + 1) % count
+                return best
+        return best
+
+    def _pivot(self, entering: int):
+        with self._stats.timer(Phase.RATIO_TEST):
+            tail, head = self._tails[entering], self._heads[entering]
+            # The cycle runs along the entering arc, up from its head to the apex and down to its tail. Listed from
+            # the apex in that direction, so taking the last of the tied blocking arcs keeps the tree strongly
+            # feasible and rules out cycling.
+            up_from_head, down_to_tail = list(), list()
+            u, v = tail, head
+            while u != v:
+                if self._depth[u] >= self._depth[v]:
+                    down_to_tail.append(u)
+                    u = self._parent[u]
+                else:
+                    up_from_head.append(v)
+                    v = self._parent[v]
+
+            cycle = [(self._parent_arc[node], self._heads[self._parent_arc[node]] == node)
+                     for node in reversed(down_to_tail)]
+            cycle.append((entering, True))
+            cycle.extend((self._parent_arc[node], self._tails[self._parent_arc[node]] == node)
+                         for node in up_from_head)
+
+            leaving, theta = None, None
+            for arc, forward in cycle:
+                if not forward and (theta is None or self._flows[arc] <= theta):
+                    leaving, theta = arc, self._flows[arc]
+            if leaving is None:
+                logging.error("Flow cost is unbounded along arc {}".format(entering))
+                raise RuntimeError("Unbounded problem")
+
+        with self._stats.timer(Phase.PIVOT):
+            for arc, forward in cycle:
+                self._flows[arc] += theta if forward else -theta
+            self._flows[leaving] = max(self._flows[leaving], 0.0)
+            self._in_tree[leaving] = False
+            self._in_tree[entering] = True
+            self._rebuild_tree()
+        self._stats.increment('pivots')
+
+    def _rebuild_tree(self):
+        adjacency: List[List[int]] = [list() for _ in range(self._num_nodes)]
+        for arc, in_tree in enumerate(self._in_tree):
+            if in_tree:
+                adjacency[self._tails[arc]].append(arc)
+                adjacency[self._heads[arc]].append(arc)
+
+        parent, parent_arc = [-1] * self._num_nodes, [-1] * self._num_nodes
+        depth, potentials = [0] * self._num_nodes, [0.0] * self._num_nodes
+        stack = [self._root]
+        parent[self._root] = self._root
+        while stack:
+            node = stack.pop()
+            for arc in adjacency[node]:
+                other = self._heads[arc] if self._tails[arc] == node else self._tails[arc]
+                if parent[other] != -1:
+                    continue
+                parent[other], parent_arc[other], depth[other] = node, arc, depth[node] + 1
+                # A tree arc prices to zero: cost - potential(tail) + potential(head) = 0.
+                if self._tails[arc] == node:
+                    potentials[other] = potentials[node] - self._costs[arc]
+                else:
+                    potentials[other] = potentials[node] + self._costs[arc]
+                stack.append(other)
+        self._parent, self._parent_arc, self._depth, self._potentials = parent, parent_arc, depth, potentials
+
+
+class NetworkSimplexSolver(SolverMethod):
+    """
+    Solves single objective models whose constraints are a network, possibly with a few side constraints. The
+    network alone is solved by the network simplex; if its optimum also satisfies the side constraints it is the
+    optimum of the whole model, otherwise the model is handed to the general two-phase simplex.
+    """
+
+    def __init__(self, max_side_fraction=MAX_SIDE_FRACTION, limits: SolveLimits = None):
+        self.max_side_fraction = max_side_fraction
+        self.limits = limits
+
+    def can_solve(self, problem: Problem) -> bool:
+        matrix = MatrixProblem.from_problem(problem)
+        if len(matrix.objectives) != 1 or matrix.num_constraints == 0 or not matrix.is_linear:
+            return False
+        structure = detect_network(matrix)
+        side_rows = structure.side_rows
+        return len(side_rows) <= self.max_side_fraction * matrix.num_constraints and \
+            all(matrix.signs[row] != EqualitySigns.NOT_EQUAL for row in side_rows)
+
+    def solve(self, problem: Problem, tracing_hook: TracingHook = None) -> Optional[Solution]:
+        matrix = MatrixProblem.from_problem(problem)
+        if not self.can_solve(matrix):
+            return None
+
+        stats = SolveStats() if tracing_hook is not None and tracing_hook.collects_stats else NULL_STATS
+        with stats.timer(Phase.STANDARDIZATION):
+            structure = detect_network(matrix)
+        solution = self._solve_network(matrix, structure, stats)
+        if solution is None:
+            stats.increment('network_fallbacks')
+            from systemssolver.methods.multiobjective import MultiObjectiveSolver
+            solution = MultiObjectiveSolver(limits=self.limits).solve(matrix)
+
+        if stats.enabled:
+            solution.stats = stats
+            tracing_hook.report(stats)
+        return solution
+
+    def _solve_network(self, matrix: MatrixProblem, structure: NetworkStructure,
+                       stats: SolveStats) -> Optional[Solution]:
+        """ The network relaxation's optimum, or None when it doesn't settle the whole model. """
+        objective = matrix.objectives[0]
+        scale = 1 if objective.goal == ObjectiveGoal.MINIMIZE else -1
+        costs = [0.0] * matrix.num_variables
+        for col, coef in zip(objective.indices, objective.coefs):
+            costs[col] += scale * coef
+
+        with stats.timer(Phase.TABLEAU_BUILD):
+            nodes = {row: idx for idx, row in enumerate(structure.network_rows)}
+            root = len(nodes)
+            tails, heads, arc_costs, arc_cols = list(), list(), list(), list()
+            for col, arc in enumerate(structure.arcs):
+                if arc is None:
+                    # Only in side rows: the relaxation leaves it at zero, or is unbounded if it pays to raise it.
+                    if costs[col] < 0:
+                        return None
+                    continue
+                tails.append(root if arc[0] is None else nodes[arc[0]])
+                heads.append(root if arc[1] is None else nodes[arc[1]])
+                arc_costs.append(costs[col])
+                arc_cols.append(col)
+
+            balances = [0.0] * (root + 1)
+            for row, node in nodes.items():
+                orientation = structure.orientation[row]
+                balances[node] = orientation * matrix.rhs[row]
+                sign = matrix.signs[row]
+                if sign in (EqualitySigns.LE, EqualitySigns.LT, EqualitySigns.GE, EqualitySigns.GT):
+                    # out - in <= b takes a slack arc to the root, out - in >= b one from it.
+                    at_most = sign in (EqualitySigns.LE, EqualitySigns.LT)
+                    if (orientation > 0) == at_most:
+                        tails.append(node), heads.append(root)
+                    else:
+                        tails.append(root), heads.append(node)
+                    arc_costs.append(0.0)
+                    arc_cols.append(None)
+            balances[root] = -sum(balances)
+
+        network = NetworkSimplex(root + 1, tails, heads, arc_costs, balances, stats)
+        clock = self.limits.start() if self.limits is not None else None
+        status = None
+        try:
+            network.optimize(clock)
+        except LimitReached as e:
+            status = e.status
+        if status is None and not network.is_feasible:
+            logging.error("No flow satisfies all node balances")
+            raise RuntimeError("Infeasible problem")
+
+        values = [0.0] * matrix.num_variables
+        for col, flow in zip(arc_cols, network.flows):
+            if col is not None:
+                values[col] = flow
+        if status is None and not self._satisfies_side_rows(matrix, structure, values):
+            return None
+
+        with stats.timer(Phase.EXTRACTION):
+            cost = sum(costs[col] * values[col] for col in range(matrix.num_variables))
+            solution = Solution(
+                matrix.variable_names + ['z'],
+                [-val if inverted else val for val, inverted in zip(values, matrix.inverted)] +
+                [-cost - scale * objective.constant])
+            solution.objective_values = [scale * cost + objective.constant]
+            if status is not None:
+                solution.status, solution.feasible = status, network.is_feasible and \
+                    self._satisfies_side_rows(matrix, structure, values)
+            return solution
+
+    def _satisfies_side_rows(self, matrix: MatrixProblem, structure: NetworkStructure, values: List[float]) -> bool:
+        for row in structure.side_rows:
+            activity = sum(coef * values[col] for col, coef in zip(*matrix.rows.row(row)))
+            sign, rhs = matrix.signs[row], matrix.rhs[row]
+            if sign in (EqualitySigns.LE, EqualitySigns.LT) and activity > rhs + EPSILON or \
+                    sign in (EqualitySigns.GE, EqualitySigns.GT) and activity < rhs - EPSILON or \
+                    sign == EqualitySigns.EQUAL and abs(activity - rhs) > EPSILON:
+                return False
+        return True
+
+
+def _row_dict(matrix: MatrixProblem, row_idx: int) -> Dict[int, float]:
+    row = dict()
+    for col, coef in zip(*matrix.rows.row(row_idx)):
+        row[col] = row.get(col, 0) + coef
+    return {col: coef for col, coef in row.items() if coef != 0}
@@ -0,0 +1,42 @@
+"""
+Storage precision of the tableau's rows.
+
+Full precision keeps every row as a list of Python numbers, which costs a pointer and a boxed float per entry.
+Mixed precision stores and pivots the rows as float32 arrays instead, four bytes per entry, so a node fits a model
+twice the size it would in float64 and several times the size it does with lists.
+
+Pivoting in float32 lets the basic solution and the objective row drift, so a mixed precision tableau recomputes
+them every REFINE_INTERVAL pivots and at every optimum it reports: the residuals of the basic solution and of the
+duals are taken in float64 against the original rows, and corrected through the basis inverse the tableau already
+holds in float32, the classic iterative refinement. When the residual stays above REFINE_TOLERANCE the float32 basis
+inverse is too inaccurate to refine with, and the tableau falls back to full precision at the same basis.
+"""
+from array import array
+from enum import Enum
+from typing import Sequence
+
+# Absolute tolerance of the float32 pivots, in place of the full precision one: float32 keeps about seven digits.
+MIXED_EPSILON = 1e-6
+REFINE_INTERVAL = 50
+REFINE_STEPS = 5
+# Relative residual the refinement aims for, and the one above which it gives up on float32.
+REFINE_TARGET = 1e-13
+REFINE_TOLERANCE = 1e-9
+
+
+class Precision(Enum):
+    DOUBLE = 'double'
+    MIXED = 'mixed'
+
+    @staticmethod
+    def from_val(val):
+        for precision in Precision:
+            if precision.value == val.lower():
+                return precision
+        return None
+
+    def row(self, values: Sequence) -> Sequence:
+        """ A tableau row holding values, in this precision's storage. """
+        if self == Precision.MIXED:
+            return array('f', values)
+        return list(values)
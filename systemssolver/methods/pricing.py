@@ -0,0 +1,115 @@
+"""
+Pricing rules choosing the entering column of a primal simplex pivot from the tableau's objective row.
+
+Dantzig pricing scans the whole row for its most negative entry. On wide models with few rows that scan dominates
+the pivot, so the other rules look at less of it:
+
+* partial pricing scans the row one segment at a time, starting where the previous pivot left off, and stops at
+  the first segment holding an improving column;
+* multiple pricing keeps a short list of the most attractive columns of its last full scan and picks among those
+  until none of them improves any more.
+
+Blocks of the row are not priced in parallel. Threads hold the GIL through the scan, and handing the row to worker
+processes costs as much as scanning it: on a 400,000 column row, packing it into an array('d') and pickling it out
+takes about 15ms, as long as a key function scan of the whole row, before any process starts on its block. The scans
+use the builtin min and index instead, which run in C and take about 9ms on that row.
+
+Every rule only reports no entering column after checking the whole row, so optimality is decided as before.
+"""
+import heapq
+from enum import Enum
+from typing import List, Optional
+
+PARTIAL_SEGMENT_SIZE = 1024
+MULTIPLE_CANDIDATES = 16
+
+
+class PricingMode(Enum):
+    DANTZIG = 'dantzig'
+    PARTIAL = 'partial'
+    MULTIPLE = 'multiple'
+
+    @staticmethod
+    def from_val(val):
+        for mode in PricingMode:
+            if mode.value == val.lower():
+                return mode
+        return None
+
+    def pricer(self) -> 'Pricer':
+        return _PRICERS[self]()
+
+
+class Pricer:
+    """ Picks the entering column from the objective row, None when no entry is below -epsilon. """
+
+    def entering_col(self, objective_row: List, epsilon) -> Optional[int]:
+        return _most_negative(objective_row, 0, len(objective_row) - 1, epsilon)
+
+    def reset(self):
+        """ Called when columns are added or removed, so column indices kept from earlier pivots are stale. """
+        pass
+
+
+class PartialPricer(Pricer):
+
+    def __init__(self, segment_size=PARTIAL_SEGMENT_SIZE):
+        self.segment_size = segment_size
+        self._start = 0
+
+    def entering_col(self, objective_row: List, epsilon) -> Optional[int]:
+        width = len(objective_row) - 1
+        start = self._start if self._start < width else 0
+        scanned = 0
+        while scanned < width:
+            end = min(start + self.segment_size, width)
+            col = _most_negative(objective_row, start, end, epsilon)
+            scanned += end - start
+            start = end if end < width else 0
+            if col is not None:
+                self._start = start
+                return col
+        return None
+
+    def reset(self):
+        self._start = 0
+
+
+class MultiplePricer(Pricer):
+
+    def __init__(self, candidates=MULTIPLE_CANDIDATES):
+        self.candidates = candidates
+        self._list: List[int] = list()
+
+    def entering_col(self, objective_row: List, epsilon) -> Optional[int]:
+        # The candidates' entries are already current, pivots update the whole objective row.
+        self._list = [col for col in self._list if objective_row[col] < -epsilon]
+        if not self._list:
+            width = len(objective_row) - 1
+            improving = (col for col in range(width) if objective_row[col] < -epsilon)
+            self._list = heapq.nsmallest(self.candidates, improving, key=objective_row.__getitem__)
+            if not self._list:
+                return None
+        col = min(self._list, key=objective_row.__getitem__)
+        # The entering column turns basic, its entry goes to zero and it would drop out at the next pivot anyway.
+        self._list.remove(col)
+        return col
+
+    def reset(self):
+        self._list = list()
+
+
+def _most_negative(objective_row: List, start: int, end: int, epsilon) -> Optional[int]:
+    """ Column of the smallest entry in [start, end), first one on ties, or None when it isn't below -epsilon. """
+    if start >= end:
+        return None
+    block = objective_row[start:end]
+    val = min(block)
+    return start + block.index(val) if val < -epsilon else None
+
+
+_PRICERS = {
+    PricingMode.DANTZIG: Pricer,
+    PricingMode.PARTIAL: PartialPricer,
+    PricingMode.MULTIPLE: MultiplePricer,
+}
@@ -0,0 +1,332 @@
+"""
+Convex quadratic programming by a primal active-set method. The objective's quadratic terms are solved natively
+rather than piecewise linearized: each iteration solves the equality constrained problem on the current working set
+through its KKT system, steps towards its minimizer until a constraint blocks, and drops the constraint with the
+most negative multiplier once the step vanishes.
+
+Constraints are numbered by the model's rows, then the non-negativity bound of every variable, so row i is i and the
+bound of variable j is num_constraints + j. The working set a solve finished with is kept in active_set and can be
+passed to the next solve as warm_start, which starts from the minimizer on that working set when it's feasible:
+
+    first = ActiveSetQPSolver()
+    first.solve(problem)
+    second = ActiveSetQPSolver(warm_start=first.active_set).solve(changed_problem)
+"""
+import logging
+import math
+from typing import List, Dict, Tuple, Optional, Sequence
+
+from systemssolver.methods.limits import SolveLimits, LimitClock, LimitReached
+from systemssolver.methods.solvermethod import SolverMethod
+from systemssolver.methods.standard import build_tableau, objective_value
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.modeling.objective import ObjectiveGoal
+from systemssolver.modeling.variables import VariableType
+from systemssolver.problem import Problem
+from systemssolver.solution import Solution
+from systemssolver.tracing.hook import TracingHook
+from systemssolver.tracing.stats import SolveStats, NULL_STATS, Phase
+
+TOLERANCE = 1e-9
+
+
+class QuadraticModel:
+    """
+    min 1/2 x'Hx + c'x s.t. a_i x <= b_i, or = b_i for equalities, and x >= 0, from a single objective MatrixProblem.
+    A maximization is negated, so H = -(Q + Q') for it and Q + Q' for a minimization.
+    """
+
+    def __init__(self, matrix: MatrixProblem):
+        objective = matrix.objectives[0]
+        self.num_variables = n = matrix.num_variables
+        self.num_rows = matrix.num_constraints
+        scale = 1 if objective.goal == ObjectiveGoal.MINIMIZE else -1
+
+        self.hessian = [[0.0] * n for _ in range(n)]
+        for first, second, coef in objective.quadratic:
+            self.hessian[first][second] += scale * coef
+            self.hessian[second][first] += scale * coef
+        self.linear = [scale * coef for coef in objective.dense(n)]
+
+        # Every constraint as (coefs, rhs, is_equality), rows first, then the bounds as -x_j <= 0.
+        self.constraints: List[Tuple[Dict[int, float], float, bool]] = list()
+        for row_idx in range(matrix.num_constraints):
+            indices, coefs = matrix.rows.row(row_idx)
+            row = dict()
+            for col, coef in zip(indices, coefs):
+                row[col] = row.get(col, 0) + coef
+            sign, rhs = matrix.signs[row_idx], matrix.rhs[row_idx]
+            if sign in (EqualitySigns.GE, EqualitySigns.GT):
+                self.constraints.append(({col: -coef for col, coef in row.items()}, -rhs, False))
+            else:
+                self.constraints.append((row, rhs, sign == EqualitySigns.EQUAL))
+        for col in range(n):
+            self.constraints.append(({col: -1}, 0, False))
+
+    @property
+    def equalities(self) -> List[int]:
+        return [idx for idx, (_, _, equality) in enumerate(self.constraints) if equality]
+
+    def gradient(self, x: Sequence[float]) -> List[float]:
+        return [sum(h * val for h, val in zip(row, x)) + c for row, c in zip(self.hessian, self.linear)]
+
+    def slack(self, idx: int, x: Sequence[float]) -> float:
+        coefs, rhs, _ = self.constraints[idx]
+        return rhs - sum(coef * x[col] for col, coef in coefs.items())
+
+    def is_feasible(self, x: Sequence[float]) -> bool:
+        for idx, (_, rhs, equality) in enumerate(self.constraints):
+            slack = self.slack(idx, x)
+            tolerance = 1e-7 * (1 + abs(rhs))
+            if slack < -tolerance or (equality and slack > tolerance):
+                return False
+        return True
+
+    def is_convex(self) -> bool:
+        """ Whether H is positive semidefinite, by a symmetric elimination that fails on a negative pivot. """
+        h = [list(row) for row in self.hessian]
+        size = len(h)
+        tolerance = TOLERANCE * max((abs(val) for row in h for val in row), default=0)
+        for k in range(size):
+            pivot = h[k][k]
+            if pivot < -tolerance:
+                return False
+            if pivot <= tolerance:
+                # A zero pivot needs a zero row, or a 2x2 minor would be negative.
+                if any(abs(h[k][j]) > tolerance for j in range(k + 1, size)):
+                    return False
+                continue
+            for i in range(k + 1, size):
+                factor = h[i][k] / pivot
+                if factor:
+                    for j in range(k, size):
+                        h[i][j] -= factor * h[k][j]
+        return True
+
+
+class ActiveSetQPSolver(SolverMethod):
+    """
+    Single objective convex QPs over the usual non-negative variables. The first feasible point comes from the
+    simplex on the constraints alone, unless a warm start's working set gives a feasible one. Objectives that
+    aren't convex are turned down by can_solve.
+
+    A solve stopped by its limits returns the iterate it stopped at, which is always feasible.
+    """
+
+    def __init__(self, warm_start: Sequence[int] = None, limits: SolveLimits = None, max_iterations: int = None):
+        self.warm_start = warm_start
+        self.limits = limits
+        self.max_iterations = max_iterations
+        self.active_set: List[int] = list()
+
+    def can_solve(self, problem: Problem) -> bool:
+        matrix = MatrixProblem.from_problem(problem)
+        if len(matrix.objectives) != 1 or matrix.num_constraints == 0 or not matrix.objectives[0].is_quadratic:
+            return False
+        if EqualitySigns.NOT_EQUAL in matrix.signs or VariableType.INTEGER in matrix.variable_types:
+            return False
+        return QuadraticModel(matrix).is_convex()
+
+    def solve(self, problem: Problem, tracing_hook: TracingHook = None) -> Optional[Solution]:
+        if not self.can_solve(problem):
+            return None
+
+        stats = SolveStats() if tracing_hook is not None and tracing_hook.collects_stats else NULL_STATS
+        matrix = MatrixProblem.from_problem(problem)
+        model = QuadraticModel(matrix)
+        clock = self.limits.start() if self.limits is not None else None
+
+        start = self._warm_start(model, stats) if self.warm_start is not None else None
+        if start is None:
+            start = self._cold_start(matrix, model, stats)
+        x, working = start
+
+        status = None
+        try:
+            self._iterate(model, x, working, stats, clock)
+        except LimitReached as e:
+            status = e.status
+            stats.increment('limit_stops')
+        self.active_set = sorted(idx for idx in working if not model.constraints[idx][2])
+
+        with stats.timer(Phase.EXTRACTION):
+            objective = matrix.objectives[0]
+            value = objective_value(objective, x)
+            solution = Solution(matrix.variable_names + ['z'],
+                                [-val if inverted else val for val, inverted in zip(x, matrix.inverted)] +
+                                [value if objective.goal == ObjectiveGoal.MAXIMIZE else -value])
+            solution.objective_values = [value]
+            if status is not None:
+                solution.status = status
+        if stats.enabled:
+            solution.stats = stats
+            tracing_hook.report(stats)
+        return solution
+
+    def _iterate(self, model: QuadraticModel, x: List[float], working: List[int], stats: SolveStats,
+                 clock: Optional[LimitClock]):
+        """ Active-set iterations from the feasible x, updating x and the working set in place. """
+        n = model.num_variables
+        max_iterations = self.max_iterations if self.max_iterations is not None else \
+            50 * (n + len(model.constraints))
+        for _ in range(max_iterations):
+            gradient = model.gradient(x)
+            with stats.timer(Phase.PIVOT):
+                kind, vector = _solve_kkt(model, working, [-val for val in gradient], [0.0] * len(working))
+            step = vector[:n]
+            if kind == _SOLUTION and max(map(abs, step), default=0) <= TOLERANCE * (1 + max(map(abs, x))):
+                with stats.timer(Phase.PRICING):
+                    # Equalities stay in the working set whatever the sign of their multiplier.
+                    candidates = [(vector[n + pos], idx) for pos, idx in enumerate(working)
+                                  if not model.constraints[idx][2]]
+                    multiplier, leaving = min(candidates, default=(0, None))
+                if leaving is None or multiplier >= -TOLERANCE:
+                    return
+                working.remove(leaving)
+                stats.increment('constraints_dropped')
+            else:
+                with stats.timer(Phase.RATIO_TEST):
+                    length, blocking = self._ratio_test(model, x, working, step, 1 if kind == _SOLUTION else None)
+                if length is None:
+                    logging.error("Objective is unbounded along a direction of zero curvature")
+                    raise RuntimeError("Unbounded problem")
+                for col in range(n):
+                    x[col] += length * step[col]
+                if blocking is not None:
+                    working.append(blocking)
+                    stats.increment('constraints_added')
+            stats.increment('qp_iterations')
+            if clock is not None:
+                clock.raise_on_limit()
+        logging.error("No optimum after {} active set iterations".format(max_iterations))
+        raise RuntimeError("Active set method did not converge")
+
+    @staticmethod
+    def _ratio_test(model: QuadraticModel, x: List[float], working: List[int], step: List[float],
+                    max_length: Optional[float]) -> Tuple[Optional[float], Optional[int]]:
+        """ Longest step along step keeping every constraint, up to max_length, and the one that blocks it. """
+        in_working = set(working)
+        length, blocking = max_length, None
+        for idx, (coefs, _, _) in enumerate(model.constraints):
+            if idx in in_working:
+                continue
+            rate = sum(coef * step[col] for col, coef in coefs.items())
+            if rate > TOLERANCE:
+                ratio = max(0.0, model.slack(idx, x)) / rate
+                if length is None or ratio < length:
+                    length, blocking = ratio, idx
+        return length, blocking
+
+    def _cold_start(self, matrix: MatrixProblem, model: QuadraticModel, stats: SolveStats):
+        # Any vertex of the constraints will do; its active constraints seed the working set.
+        tableau = build_tableau(matrix, dict(), 0, stats)
+        stats.increment('phase_one_pivots', tableau.optimize())
+        x = list(tableau.values()[:model.num_variables])
+        active = [idx for idx in range(len(model.constraints)) if abs(model.slack(idx, x)) <= TOLERANCE]
+        return x, _independent(model, model.equalities + [idx for idx in active if idx not in model.equalities])
+
+    def _warm_start(self, model: QuadraticModel, stats: SolveStats):
+        """ The minimizer on the warm start's working set with the equalities, when it's feasible. """
+        known = [idx for idx in self.warm_start if 0 <= idx < len(model.constraints)]
+        working = _independent(model, model.equalities + [idx for idx in known if idx not in model.equalities])
+        kind, vector = _solve_kkt(model, working, [-val for val in model.linear],
+                                  [model.constraints[idx][1] for idx in working])
+        x = vector[:model.num_variables]
+        if kind != _SOLUTION or not model.is_feasible(x):
+            stats.increment('warm_starts_rejected')
+            return None
+        stats.increment('warm_starts')
+        return [max(val, 0.0) for val in x], working
+
+
+_SOLUTION = 'solution'
+_RAY = 'ray'
+
+
+def _solve_kkt(model: QuadraticModel, working: List[int], top: List[float], bottom: List[float]):
+    """
+    Solves [H A'; A 0] [x; l] = [top; bottom] for the working set's rows A. The system is singular when H is
+    along some direction of the working set's null space; when it then has no solution, returns (_RAY, v) with v
+    such a direction of zero curvature, oriented to decrease the objective along the step's gradient -top.
+    """
+    n = model.num_variables
+    size = n + len(working)
+    matrix = [list(row) + [0.0] * len(working) for row in model.hessian] + [[0.0] * size for _ in working]
+    for pos, idx in enumerate(working):
+        for col, coef in model.constraints[idx][0].items():
+            matrix[col][n + pos] = coef
+            matrix[n + pos][col] = coef
+    solution, null_vectors = _row_reduce(matrix, top + bottom)
+    if solution is not None:
+        return _SOLUTION, solution
+
+    # top + bottom has a component in the null space; a null vector (p, m) has Hp = 0 and Ap = 0, and the objective
+    # changes along p at the rate -top.p, which the one picked makes negative.
+    rhs = top + bottom
+    direction = max(null_vectors, key=lambda vector: abs(sum(a * b for a, b in zip(rhs, vector))))
+    sign = 1 if sum(a * b for a, b in zip(rhs, direction)) > 0 else -1
+    return _RAY, [sign * val for val in direction]
+
+
+def _row_reduce(matrix: List[List[float]], rhs: List[float]) -> Tuple[Optional[List[float]], List[List[float]]]:
+    """
+    Gauss-Jordan elimination with partial pivoting. Returns a solution, free variables set to zero, or None and the
+    null space basis when the system is inconsistent.
+    """
+    size = len(matrix)
+    rows = [list(row) + [val] for row, val in zip(matrix, rhs)]
+    tolerance = TOLERANCE * max((abs(val) for row in matrix for val in row), default=1)
+    pivots = list()
+    rank = 0
+    for col in range(size):
+        pivot = max(range(rank, size), key=lambda idx: abs(rows[idx][col]), default=None)
+        if pivot is None or abs(rows[pivot][col]) <= tolerance:
+            continue
+        rows[rank], rows[pivot] = rows[pivot], rows[rank]
+        pivot_row = rows[rank]
+        scale = pivot_row[col]
+        for j in range(col, size + 1):
+            pivot_row[j] /= scale
+        for idx, row in enumerate(rows):
+            factor = row[col]
+            if idx != rank and factor != 0:
+                for j in range(col, size + 1):
+                    row[j] -= factor * pivot_row[j]
+        pivots.append(col)
+        rank += 1
+
+    scale = max(1.0, max(map(abs, rhs), default=0))
+    if all(abs(rows[idx][-1]) <= math.sqrt(TOLERANCE) * scale for idx in range(rank, size)):
+        solution = [0.0] * size
+        for pos, col in enumerate(pivots):
+            solution[col] = rows[pos][-1]
+        return solution, list()
+
+    null_vectors = list()
+    for free in sorted(set(range(size)) - set(pivots)):
+        vector = [0.0] * size
+        vector[free] = 1.0
+        for pos, col in enumerate(pivots):
+            vector[col] = -rows[pos][free]
+        null_vectors.append(vector)
+    return None, null_vectors
+
+
+def _independent(model: QuadraticModel, candidates: List[int]) -> List[int]:
+    """ The candidates, in order, whose rows are linearly independent of the ones kept before them. """
+    basis: List[List[float]] = list()
+    kept = list()
+    for idx in candidates:
+        row = [0.0] * model.num_variables
+        for col, coef in model.constraints[idx][0].items():
+            row[col] = coef
+        norm = math.sqrt(sum(val * val for val in row))
+        for vector in basis:
+            dot = sum(a * b for a, b in zip(row, vector))
+            row = [a - dot * b for a, b in zip(row, vector)]
+        residual = math.sqrt(sum(val * val for val in row))
+        if residual > 1e-8 * norm and len(kept) < model.num_variables:
+            basis.append([val / residual for val in row])
+            kept.append(idx)
+    return kept
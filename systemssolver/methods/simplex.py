@@ -1,36 +1,702 @@
+import copy
 import logging
-from typing import Optional, List
+import sys
+from fractions import Fraction
+from typing import Optional, List, Dict, Tuple
 
+from systemssolver.methods.crash import CrashMode, crash_basis
+from systemssolver.methods.limits import SolveLimits, LimitClock, LimitReached
+from systemssolver.methods.precision import Precision, MIXED_EPSILON, REFINE_INTERVAL, REFINE_STEPS, REFINE_TARGET, \
+    REFINE_TOLERANCE
+from systemssolver.methods.pricing import PricingMode
 from systemssolver.methods.solvermethod import SolverMethod
 from systemssolver.modeling.equation import EqualitySigns, convert_constraint_to, Constraint, Expression
+from systemssolver.modeling.matrix import MatrixProblem
 from systemssolver.modeling.objective import ObjectiveGoal, convert_objective_to_goal
 from systemssolver.modeling.variables import Variable, Term
 from systemssolver.problem import Problem
-from systemssolver.solution import Solution
+from systemssolver.solution import Solution, SolveStatus
 from systemssolver.tracing.hook import TracingHook
+from systemssolver.tracing.stats import SolveStats, NULL_STATS, Phase
+
+
+EPSILON = 1e-9
+
+# Consecutive degenerate pivots after which the primal simplex switches to Bland's rule to avoid cycling.
+DEGENERATE_PIVOTS_BEFORE_BLAND = 50
 
 
 class Tableau:
 
-    def __init__(self, objective: Expression, constraints: List[Constraint]):
+    def __init__(self, objective: Expression, constraints: List[Constraint], stats: SolveStats = NULL_STATS):
         self._objective = objective
         self._constraints = constraints
+        self._stats = stats
         self._check_valid()
         self._variables = self._get_variables()
         self._tableau = self._build_tableau()
+        self._costs = self._objective_costs()
+        self._basis = self._find_basis()
+        self._epsilon = EPSILON
+        self.pricing = PricingMode.DANTZIG
+        self._set_full_precision()
+        self._snapshot_original()
+
+    @staticmethod
+    def from_rows(variables: List[Variable], objective: Dict[int, float], constant, rows: List[Dict[int, float]],
+                  rhs: List[float], stats: SolveStats = NULL_STATS) -> 'Tableau':
+        """
+        Tableau for max objective.x + constant s.t. rows x <= rhs, from already indexed sparse rows. One slack per
+        row and the objective variable are appended after the given variables, in that order.
+        """
+        tableau = Tableau.__new__(Tableau)
+        tableau._objective, tableau._constraints, tableau._stats = None, None, stats
+
+        taken = {var.name for var in variables}
+        slacks = [Variable(name=_unique_name('s{}'.format(i), taken)) for i in range(len(rows))]
+        tableau._optimization_var = Variable(name=_unique_name('z', taken))
+        tableau._variables = list(variables) + slacks + [tableau._optimization_var]
+
+        width = len(tableau._variables) + 1
+        num_structural = len(variables)
+        tableau._tableau = list()
+        for row_idx, (row, val) in enumerate(zip(rows, rhs)):
+            dense = [0] * width
+            for col, coef in row.items():
+                dense[col] += coef
+            dense[num_structural + row_idx] = 1
+            dense[-1] = val
+            tableau._tableau.append(dense)
+        tableau._tableau.append([0] * width)
+        tableau._basis = [num_structural + row_idx for row_idx in range(len(rows))]
+        tableau._epsilon = EPSILON
+        tableau.pricing = PricingMode.DANTZIG
+        tableau._set_full_precision()
+        tableau._snapshot_original()
+        tableau.set_objective(objective, constant)
+        return tableau
+
+    def _snapshot_original(self):
+        # The starting rows, kept sparse so an exact copy can be rebuilt, and the variable that starts basic in
+        # each row: its current column is the matching column of the basis inverse.
+        self._original_rows = [{col: val for col, val in enumerate(row[:-1]) if val != 0} for row in self._tableau[:-1]]
+        self._original_rhs = [row[-1] for row in self._tableau[:-1]]
+        self._row_slacks = list(self._basis)
 
     def step(self) -> bool:
         if self._check_optimal():
             return True
 
-        pivot_col = self._identify_pivot_col()
-        pivot_row = self._identify_pivot_row(pivot_col)
-        self._tableau = self._create_new_tableau(pivot_row, pivot_col)
+        with self._stats.timer(Phase.PRICING):
+            pivot_col = self._identify_pivot_col()
+        with self._stats.timer(Phase.RATIO_TEST):
+            pivot_row = self._identify_pivot_row(pivot_col)
+        self.pivot(pivot_row, pivot_col)
         return self._check_optimal()
 
-    def to_solution(self) -> Solution:
-        optimal_variables = set()
-        for var_idx, var in enumerate(self._variables):
+    def pivot(self, pivot_row: int, pivot_col: int):
+        with self._stats.timer(Phase.PIVOT):
+            self._tableau = self._create_new_tableau(pivot_row, pivot_col)
+        self._basis[pivot_row] = pivot_col
+        self._stats.increment('pivots')
+        self._refined = None
+        if self._precision == Precision.MIXED:
+            self._unrefined_pivots += 1
+            if self._unrefined_pivots >= REFINE_INTERVAL:
+                self.refine()
+
+    def optimize(self, max_iterations: int = None, clock: LimitClock = None, quiet=False) -> int:
+        """
+        Two-phase simplex from the current basis with proper ratio tests: the dual simplex restores feasibility when
+        the objective row allows it, an auxiliary problem does otherwise, then the primal simplex runs to optimality.
+        Returns the number of pivots. Raises RuntimeError when the problem is infeasible or unbounded, and
+        LimitReached when the clock of a limited solve runs out, leaving the tableau at the basis it stopped at.
+        Quiet skips logging the RuntimeError, for callers that expect infeasible subproblems, like branch and bound.
+        """
+        iterations = self.restore_feasibility(max_iterations, clock, quiet)
+        degenerate = 0
+        while True:
+            objective_val = self._tableau[-1][-1]
+            if self.primal_step(bland=degenerate >= DEGENERATE_PIVOTS_BEFORE_BLAND, quiet=quiet):
+                return iterations
+            iterations += 1
+            self._check_iterations(iterations, max_iterations, clock)
+            degenerate = degenerate + 1 if abs(self._tableau[-1][-1] - objective_val) <= self._epsilon else 0
+
+    def restore_feasibility(self, max_iterations: int = None, clock: LimitClock = None, quiet=False) -> int:
+        """
+        Pivots to a primal feasible basis, with the dual simplex when the objective row allows it and an auxiliary
+        problem otherwise. Returns the number of pivots, none when the basis is feasible already.
+        """
+        iterations = 0
+        if not self.is_primal_feasible():
+            if self.is_dual_feasible():
+                while not self.dual_step(quiet):
+                    iterations += 1
+                    self._check_iterations(iterations, max_iterations, clock)
+            else:
+                iterations += self._phase_one(max_iterations, clock, quiet)
+        return iterations
+
+    def primal_step(self, bland=False, quiet=False) -> bool:
+        """ One primal simplex pivot from a feasible basis. Returns True when the basis is already optimal. """
+        with self._stats.timer(Phase.PRICING):
+            pivot_col = self._entering_col(bland)
+        if pivot_col is None and self._precision == Precision.MIXED and self.refine() is not None:
+            # The float32 objective row drifts, so an optimum only stands once the refined reduced costs agree, and
+            # only within the full precision tolerances once the float32 ones stop telling the bases apart.
+            if self._precision == Precision.MIXED and not self._meets_full_precision():
+                self._stats.increment('precision_fallbacks')
+                self.precision = Precision.DOUBLE
+            if self._precision == Precision.DOUBLE:
+                self._stats.increment('precision_repair_pivots', self.optimize(quiet=quiet))
+                return True
+            with self._stats.timer(Phase.PRICING):
+                pivot_col = self._entering_col(bland)
+        if pivot_col is None:
+            return True
+
+        with self._stats.timer(Phase.RATIO_TEST):
+            pivot_row = self._leaving_row(pivot_col)
+        if pivot_row is None:
+            if not quiet:
+                logging.error("Objective is unbounded along {}".format(self._variables[pivot_col]))
+            raise RuntimeError("Unbounded problem")
+        self.pivot(pivot_row, pivot_col)
+        return False
+
+    def dual_step(self, quiet=False) -> bool:
+        """ One dual simplex pivot from a dual feasible basis. Returns True when the basis is primal feasible. """
+        with self._stats.timer(Phase.RATIO_TEST):
+            pivot_row = min(range(len(self._basis)), key=lambda idx: self._tableau[idx][-1], default=None)
+        if pivot_row is None or self._tableau[pivot_row][-1] >= -self._epsilon:
+            return True
+
+        with self._stats.timer(Phase.PRICING):
+            row, objective_row = self._tableau[pivot_row], self._tableau[-1]
+            pivot_col = None
+            best_ratio = None
+            for col_idx in range(len(row) - 1):
+                if row[col_idx] < -self._epsilon:
+                    ratio = objective_row[col_idx] / -row[col_idx]
+                    if best_ratio is None or ratio < best_ratio - self._epsilon:
+                        pivot_col, best_ratio = col_idx, ratio
+        if pivot_col is None:
+            if not quiet:
+                logging.error("Row {} cannot be made feasible".format(pivot_row))
+            raise RuntimeError("Infeasible problem")
+        self.pivot(pivot_row, pivot_col)
+        return False
+
+    def is_primal_feasible(self) -> bool:
+        return all(row[-1] >= -self._epsilon for row in self._tableau[:-1])
+
+    def is_dual_feasible(self) -> bool:
+        return all(val >= -self._epsilon for val in self._tableau[-1][:-1])
+
+    def set_objective(self, objective: Dict[int, float], constant=0):
+        """
+        Replaces the objective with max objective.x + constant, keeping the current basis. The new row is priced
+        against the basis so the tableau can be re-optimized from where it is.
+        """
+        self._costs = (dict(objective), constant)
+        objective_row = [0] * len(self._tableau[-1])
+        for col, coef in objective.items():
+            objective_row[col] -= coef
+        objective_row[self._variables.index(self._optimization_var)] = 1
+        objective_row[-1] = constant
+        self._tableau[-1] = self._precision.row(self._price_out(self._exact_entries(objective_row)))
+        self._refined = None
+
+    def add_variable(self, name: str, column: Dict[int, float] = None, cost=0) -> int:
+        """
+        Appends a variable whose entries in the current tableau rows are given by column, so callers pass
+        the column already expressed in the current basis. Returns its index.
+        """
+        taken = {var.name for var in self._variables}
+        self._variables.append(Variable(name=_unique_name(name, taken)))
+        column = column if column is not None else dict()
+        for row_idx, row in enumerate(self._tableau[:-1]):
+            row.insert(len(row) - 1, self._exact_entry(column.get(row_idx, 0)))
+        # Reduced cost against the current basis: the costs of the basic variables weighted by the column's entries.
+        costs = self._costs[0]
+        reduced = -cost + sum(costs.get(self._basis[row_idx], 0) * val for row_idx, val in column.items())
+        self._tableau[-1].insert(len(self._tableau[-1]) - 1, self._exact_entry(reduced))
+        col = len(self._variables) - 1
+        if cost:
+            costs[col] = cost
+        self._pricer.reset()
+        self._refined = None
+        return col
+
+    def add_row(self, coefs: Dict[int, float], rhs, name: str = None) -> int:
+        """
+        Adds coefs.x <= rhs, written over the tableau's variables, with a new basic slack. The row is rewritten in
+        terms of the current basis, so it may be primal infeasible; dual_step or optimize repair that.
+        Returns the index of the new slack.
+        """
+        slack = self.add_variable(name if name is not None else 's{}'.format(len(self._basis)))
+        row = [0] * len(self._tableau[-1])
+        for col, coef in coefs.items():
+            row[col] += coef
+        row[slack] = 1
+        row[-1] = rhs
+        original = {col: val for col, val in enumerate(row[:-1]) if val != 0}
+        row = self._precision.row(self._price_out(self._exact_entries(row)))
+        self._tableau.insert(len(self._tableau) - 1, row)
+        self._basis.append(slack)
+        self._original_rows.append(original)
+        self._original_rhs.append(rhs)
+        self._row_slacks.append(slack)
+        return slack
+
+    def add_column(self, name: str, column: Dict[int, float], cost=0) -> int:
+        """
+        Appends a variable given its original column (coefficient per constraint row, in the order the rows were
+        built or added). The column is brought into the current basis through the basis inverse, so the tableau is
+        patched rather than rebuilt. Returns its index.
+        """
+        current = dict()
+        for row_idx, coef in column.items():
+            if coef == 0:
+                continue
+            for target_idx, val in enumerate(self.column(self._row_slacks[row_idx])):
+                if val != 0:
+                    current[target_idx] = current.get(target_idx, 0) + coef * val
+        col = self.add_variable(name, current, cost)
+        for row_idx, coef in column.items():
+            if coef != 0:
+                self._original_rows[row_idx][col] = coef
+        return col
+
+    def constraint_rows(self, constraint: Constraint) -> List[Tuple[Dict[int, float], float]]:
+        """
+        A constraint over the tableau's variables as `coefs.x <= rhs` rows, two for an equality. Coefficients are
+        on the variables' own values, so they flip for inverted variables, whose columns hold the negated value.
+        """
+        index = {var.name: idx for idx, var in enumerate(self._variables)}
+        coefs, constant = dict(), 0
+        for scale, expression in ((1, constraint.left), (-1, constraint.right)):
+            for term in expression.terms:
+                if term.var is None:
+                    constant += scale * term.coef
+                    continue
+                col = index.get(term.var.name)
+                if col is None:
+                    raise ValueError('Unknown variable {} in constraint {}'.format(term.var.name, constraint))
+                flip = -1 if self._variables[col].is_inverted else 1
+                coefs[col] = coefs.get(col, 0) + flip * scale * term.coef
+
+        rows = list()
+        if constraint.sign in (EqualitySigns.LE, EqualitySigns.LT, EqualitySigns.EQUAL):
+            rows.append((coefs, -constant))
+        if constraint.sign in (EqualitySigns.GE, EqualitySigns.GT, EqualitySigns.EQUAL):
+            rows.append(({col: -coef for col, coef in coefs.items()}, constant))
+        if constraint.sign == EqualitySigns.NOT_EQUAL:
+            raise NotImplementedError()
+        return rows
+
+    def remove_variable(self, col: int):
+        """ Drops a non-basic variable's column. """
+        if col in self._basis:
+            raise RuntimeError("Cannot remove basic variable {}".format(self._variables[col]))
+        self._variables.pop(col)
+        for row in self._tableau:
+            row.pop(col)
+        self._basis = [idx - 1 if idx > col else idx for idx in self._basis]
+        self._row_slacks = [idx - 1 if idx > col else idx for idx in self._row_slacks]
+        self._original_rows = [
+            {idx - 1 if idx > col else idx: val for idx, val in row.items() if idx != col}
+            for row in self._original_rows
+        ]
+        costs, constant = self._costs
+        self._costs = ({idx - 1 if idx > col else idx: coef for idx, coef in costs.items() if idx != col}, constant)
+        self._pricer.reset()
+        self._refined = None
+
+    def copy(self) -> 'Tableau':
+        """ An independent tableau at the same basis and precision, sharing the stats and the pricing mode. """
+        copied = copy.copy(self)
+        copied._variables = list(self._variables)
+        copied._tableau = [copy.copy(row) for row in self._tableau]
+        copied._basis = list(self._basis)
+        copied._costs = (dict(self._costs[0]), self._costs[1])
+        copied._original_rows = [dict(row) for row in self._original_rows]
+        copied._original_rhs = list(self._original_rhs)
+        copied._row_slacks = list(self._row_slacks)
+        copied.pricing = self.pricing
+        return copied
+
+    def to_exact(self) -> 'Tableau':
+        """
+        A copy of this tableau in exact rational arithmetic, rebuilt from the original rows and pivoted straight to the
+        current basis. Float inputs are read as the decimal they print as, so 0.1 becomes 1/10.
+        """
+        exact = Tableau.__new__(Tableau)
+        exact._objective, exact._constraints, exact._stats = self._objective, self._constraints, self._stats
+        exact._variables = [Variable(name=var.name, vtype=var.var_type, inverted=var.is_inverted)
+                            for var in self._variables]
+        exact._optimization_var = exact._variables[self._variables.index(self._optimization_var)]
+        exact._epsilon = 0
+        exact.pricing = self.pricing
+        exact._set_full_precision()
+
+        width = len(self._variables) + 1
+        exact._tableau = list()
+        for row, rhs in zip(self._original_rows, self._original_rhs):
+            dense = [Fraction(0)] * width
+            for col, val in row.items():
+                dense[col] = to_fraction(val)
+            dense[-1] = to_fraction(rhs)
+            exact._tableau.append(dense)
+        exact._tableau.append([Fraction(0)] * width)
+        exact._basis = list(self._row_slacks)
+        exact._snapshot_original()
+
+        costs, constant = self._costs
+        exact.set_objective({col: to_fraction(val) for col, val in costs.items()}, to_fraction(constant))
+        exact.pivot_to_basis(self._basis)
+        return exact
+
+    def pivot_to_basis(self, basis: List[Optional[int]]) -> int:
+        """ Pivots every variable of basis into the tableau's basis, Gauss-Jordan style. Returns the pivots made. """
+        target = {var_idx for var_idx in basis if var_idx is not None}
+        pivots = 0
+        for var_idx in basis:
+            if var_idx is None or var_idx in self._basis:
+                continue
+            candidates = [
+                row_idx for row_idx, basic in enumerate(self._basis)
+                if basic not in target and self._tableau[row_idx][var_idx] != 0
+            ]
+            if not candidates:
+                continue
+            self.pivot(max(candidates, key=lambda row_idx: abs(self._tableau[row_idx][var_idx])), var_idx)
+            pivots += 1
+        return pivots
+
+    def refine(self) -> Optional[float]:
+        """
+        Recomputes the basic solution and the objective row of a mixed precision tableau in double precision, by
+        iterative refinement against the original rows, and writes them over the drifted float32 values. Returns
+        the relative residual left, or None for a full precision tableau and for a basis holding a column the original
+        rows lack, phase one's artificial. A residual above REFINE_TOLERANCE rebuilds the tableau in full precision.
+        """
+        if self._precision != Precision.MIXED:
+            return None
+        refined = self._refined_solution()
+        if refined is None:
+            return None
+        values, reduced, residual, objective = refined
+        self._unrefined_pivots = 0
+        self._stats.increment('refinements')
+        if residual > REFINE_TOLERANCE:
+            logging.warning('Residual {:.3g} after refinement, falling back to full precision'.format(residual))
+            self._stats.increment('precision_fallbacks')
+            self.precision = Precision.DOUBLE
+            return residual
+
+        for row, value in zip(self._tableau, values):
+            row[-1] = value
+        objective_row = self._tableau[-1]
+        for col, val in reduced.items():
+            objective_row[col] = val
+        objective_row[-1] = objective
+        self._refined = refined
+        return residual
+
+    def _refined_solution(self) -> Optional[tuple]:
+        # B x = b and y B = c_B solved from the float32 values, each step correcting by the residual taken in double
+        # precision and multiplied by the basis inverse: the current columns of the slacks that started basic.
+        if any(slack is None for slack in self._row_slacks):
+            return None
+        columns = dict()
+        for row_idx, row in enumerate(self._original_rows):
+            for col, val in row.items():
+                columns.setdefault(col, list()).append((row_idx, val))
+        if any(var_idx is None or var_idx not in columns for var_idx in self._basis):
+            return None
+
+        rows = self._tableau[:-1]
+        costs, constant = self._costs
+        basic_costs = [costs.get(var_idx, 0) for var_idx in self._basis]
+        values = [float(row[-1]) for row in rows]
+        duals = [float(self._tableau[-1][slack]) + costs.get(slack, 0) for slack in self._row_slacks]
+        rhs_scale = max([1.0] + [abs(val) for val in self._original_rhs])
+        cost_scale = max([1.0] + [abs(val) for val in basic_costs])
+        for step in range(REFINE_STEPS + 1):
+            primal = list(self._original_rhs)
+            for row_idx, var_idx in enumerate(self._basis):
+                for target_idx, val in columns[var_idx]:
+                    primal[target_idx] -= val * values[row_idx]
+            dual = [cost - sum(duals[row_idx] * val for row_idx, val in columns[var_idx])
+                    for var_idx, cost in zip(self._basis, basic_costs)]
+            residual = max(max(map(abs, primal)) / rhs_scale, max(map(abs, dual)) / cost_scale)
+            if residual <= REFINE_TARGET or step == REFINE_STEPS:
+                break
+            for row_idx, row in enumerate(rows):
+                values[row_idx] += sum(row[slack] * val for slack, val in zip(self._row_slacks, primal))
+            for target_idx, slack in enumerate(self._row_slacks):
+                duals[target_idx] += sum(row[slack] * val for row, val in zip(rows, dual))
+
+        reduced = {col: sum(duals[row_idx] * val for row_idx, val in entries) - costs.get(col, 0)
+                   for col, entries in columns.items()}
+        objective = constant + sum(cost * val for cost, val in zip(basic_costs, values))
+        return values, reduced, residual, objective
+
+    def _meets_full_precision(self) -> bool:
+        values, reduced, _, _ = self._refined
+        reduced_costs = [val for col, val in reduced.items() if col not in self._basis]
+        return all(val >= -EPSILON for val in values) and all(val >= -EPSILON for val in reduced_costs)
+
+    def _set_full_precision(self):
+        self._precision = Precision.DOUBLE
+        self._unrefined_pivots = 0
+        self._refined = None
+
+    def _rebuild_full_precision(self):
+        # The float32 rows can't be trusted any more, so they are rebuilt from the original ones and pivoted to the
+        # current basis, as to_exact does.
+        width = len(self._variables) + 1
+        basis = self._basis
+        self._tableau = list()
+        for row, rhs in zip(self._original_rows, self._original_rhs):
+            dense = [0] * width
+            for col, val in row.items():
+                dense[col] = val
+            dense[-1] = rhs
+            self._tableau.append(dense)
+        self._tableau.append([0] * width)
+        self._basis = list(self._row_slacks)
+        self._set_full_precision()
+        self._epsilon = EPSILON
+        costs, constant = self._costs
+        self.set_objective(costs, constant)
+        self.pivot_to_basis(basis)
+
+    def column(self, col: int) -> List:
+        return [row[col] for row in self._tableau[:-1]]
+
+    def row(self, row_idx: int) -> List:
+        return list(self._tableau[row_idx])
+
+    def memory_size(self) -> int:
+        """
+        Approximate bytes held by the tableau: the row lists plus one boxed number per entry, or the float32 arrays
+        of a mixed precision tableau.
+        """
+        rows = self._tableau
+        if self._precision == Precision.MIXED:
+            return sys.getsizeof(rows) + sum(sys.getsizeof(row) for row in rows)
+        return sys.getsizeof(rows) + len(rows) * (sys.getsizeof(rows[0]) + len(rows[0]) * sys.getsizeof(0.0))
+
+    @property
+    def variables(self) -> List[Variable]:
+        return self._variables
+
+    @property
+    def stats(self) -> SolveStats:
+        return self._stats
+
+    @stats.setter
+    def stats(self, stats: SolveStats):
+        self._stats = stats
+
+    @property
+    def pricing(self) -> PricingMode:
+        """ Rule choosing the entering columns; Bland's rule still takes over on degenerate stalls. """
+        return self._pricing
+
+    @pricing.setter
+    def pricing(self, mode: PricingMode):
+        self._pricing = mode
+        self._pricer = mode.pricer()
+
+    @property
+    def precision(self) -> Precision:
+        """ Storage of the rows, see systemssolver.methods.precision. Switching rebuilds them at the current basis. """
+        return self._precision
+
+    @precision.setter
+    def precision(self, precision: Precision):
+        if precision == self._precision:
+            return
+        if precision == Precision.MIXED:
+            if self._epsilon == 0:
+                raise ValueError('An exact tableau cannot pivot in mixed precision')
+            self._tableau = [Precision.MIXED.row(row) for row in self._tableau]
+            self._precision, self._epsilon = Precision.MIXED, MIXED_EPSILON
+            self._unrefined_pivots = 0
+        else:
+            self._rebuild_full_precision()
+
+    @property
+    def basic_variables(self) -> List[int]:
+        return list(self._basis)
+
+    @property
+    def row_slacks(self) -> List[Optional[int]]:
+        """ The variable that started basic in every row, a slack unless the row came without one. """
+        return list(self._row_slacks)
+
+    @property
+    def rhs(self) -> List:
+        return [row[-1] for row in self._tableau[:-1]]
+
+    @property
+    def reduced_costs(self) -> List:
+        return self._tableau[-1][:-1]
+
+    @property
+    def objective_value(self):
+        if self._refined is not None:
+            return self._refined[3]
+        return self._tableau[-1][-1]
+
+    @property
+    def duals(self) -> List:
+        """
+        Shadow price of every row, in the order the rows were built or added: the objective row entry of the slack
+        that started basic in it. At an optimum these are the dual values, non-negative for the `<=` rows.
+        """
+        return [self._tableau[-1][slack] if slack is not None else 0 for slack in self._row_slacks]
+
+    def index_of(self, name: str) -> int:
+        for idx, var in enumerate(self._variables):
+            if var.name == name:
+                return idx
+        raise KeyError(name)
+
+    def basis(self) -> tuple:
+        """
+        Basic variable of every row. Two iterations with the same basis are the same vertex, whereas equal values
+        alone also match degenerate pivots.
+        """
+        return tuple(self._basis)
+
+    def values(self) -> tuple:
+        """
+        Value of every variable at the current basis, in the tableau's variable order. Cheaper than a full
+        solution and enough to compare two iterations.
+        """
+        basic, objective = self.column(-1), self._tableau[-1][-1]
+        if self._precision == Precision.MIXED:
+            # The float32 values, refined in double precision when the basis allows it, without writing them back.
+            if self._refined is None:
+                self._refined = self._refined_solution()
+            if self._refined is not None:
+                basic, _, _, objective = self._refined
+        values = [0] * len(self._variables)
+        for row_idx, var_idx in enumerate(self._basis):
+            if var_idx is not None:
+                values[var_idx] = basic[row_idx]
+        values[self._variables.index(self._optimization_var)] = objective
+        return tuple(values)
+
+    def _exact_entry(self, val):
+        # An exact tableau keeps every entry a Fraction: an int divided by an int would bring floats back in.
+        return to_fraction(val) if self._epsilon == 0 else val
+
+    def _exact_entries(self, row: List) -> List:
+        return [to_fraction(val) for val in row] if self._epsilon == 0 else row
+
+    def _price_out(self, row: List) -> List:
+        """ Eliminates every basic column from row using the rows they are basic in. """
+        for row_idx, var_idx in enumerate(self._basis):
+            if var_idx is None:
+                continue
+            multiplier = row[var_idx]
+            if multiplier != 0:
+                basic_row = self._tableau[row_idx]
+                row = [val - multiplier * basic_val for val, basic_val in zip(row, basic_row)]
+        return row
+
+    def _entering_col(self, bland=False) -> Optional[int]:
+        objective_row = self._tableau[-1]
+        if not bland:
+            return self._pricer.entering_col(objective_row, self._epsilon)
+        for col_idx in range(len(objective_row) - 1):
+            if objective_row[col_idx] < -self._epsilon:
+                return col_idx
+        return None
+
+    def _leaving_row(self, pivot_col: int) -> Optional[int]:
+        best_row, best_ratio = None, None
+        for row_idx, row in enumerate(self._tableau[:-1]):
+            if row[pivot_col] > self._epsilon:
+                ratio = row[-1] / row[pivot_col]
+                if best_row is None or ratio < best_ratio - self._epsilon or \
+                        (abs(ratio - best_ratio) <= self._epsilon and self._basis[row_idx] < self._basis[best_row]):
+                    best_row, best_ratio = row_idx, ratio
+        return best_row
+
+    def _phase_one(self, max_iterations: int = None, clock: LimitClock = None, quiet=False) -> int:
+        # Auxiliary problem: max -a s.t. the current rows with -a added to every infeasible one. Pivoting a into
+        # the most infeasible row makes the basis feasible; a reaching zero means the original rows are feasible.
+        costs, constant = self._costs
+        infeasible = {row_idx: -1 for row_idx, row in enumerate(self._tableau[:-1]) if row[-1] < -self._epsilon}
+        artificial = self.add_variable('a', infeasible)
+        self.set_objective({artificial: -1})
+        self.pivot(min(infeasible, key=lambda row_idx: self._tableau[row_idx][-1]), artificial)
+
+        iterations = 1
+        while not self.primal_step():
+            iterations += 1
+            self._check_iterations(iterations, max_iterations, clock)
+        if self._tableau[-1][-1] < -self._epsilon:
+            if not quiet:
+                logging.error("No feasible point satisfies all constraints")
+            raise RuntimeError("Infeasible problem")
+
+        if artificial in self._basis:
+            row_idx = self._basis.index(artificial)
+            row = self._tableau[row_idx]
+            col = next((col for col in range(len(row) - 1)
+                        if col != artificial and abs(row[col]) > self._epsilon), None)
+            if col is not None:
+                self.pivot(row_idx, col)
+                iterations += 1
+        if artificial not in self._basis:
+            self.remove_variable(artificial)
+        self.set_objective(costs, constant)
+        return iterations
+
+    def _check_iterations(self, iterations: int, max_iterations: Optional[int], clock: Optional[LimitClock]):
+        if clock is not None:
+            clock.raise_on_limit(self)
+        if max_iterations is not None and iterations >= max_iterations:
+            logging.error("Simplex did not converge in {} iterations".format(max_iterations))
+            raise RuntimeError("Iteration limit reached")
+
+    def _find_basis(self) -> List[Optional[int]]:
+        basis = [None] * (len(self._tableau) - 1)
+        for var_idx, row_idx in enumerate(self._basic_rows()):
+            if row_idx is not None and row_idx < len(basis) and basis[row_idx] is None:
+                basis[row_idx] = var_idx
+        return basis
+
+    def _objective_costs(self):
+        costs = dict()
+        constant = 0
+        for term in self._objective.terms:
+            if term.var is None:
+                constant += term.coef
+            else:
+                var_idx = self._variables.index(term.var)
+                costs[var_idx] = costs.get(var_idx, 0) + term.coef
+        return costs, constant
+
+    def to_solution(self, values: tuple = None) -> Solution:
+        """ The solution at the current basis, or at values saved from an earlier call to values(). """
+        # Values go into the Solution only; the Variables may belong to a Problem other solves are reading.
+        names = [var.name for var in self._variables]
+        values = values if values is not None else self.values()
+        values = [-val if var.is_inverted else val for var, val in zip(self._variables, values)]
+        return Solution(names, values)
+
+    def _basic_rows(self) -> List[Optional[int]]:
+        basic_rows = list()
+        for var_idx in range(len(self._variables)):
             optimal_row_idx = None
             for row_idx, row in enumerate(self._tableau):
                 if row[var_idx] == 1 and optimal_row_idx is None:
@@ -38,21 +704,16 @@ class Tableau:
                 elif row[var_idx] == 1 or row[var_idx] != 0:
                     optimal_row_idx = None
                     break
-
-            if optimal_row_idx is None:
-                var.val = 0
-            else:
-                var.val = self._tableau[optimal_row_idx][-1]
-            optimal_variables.add(var)
-        return Solution(optimal_variables)
+            basic_rows.append(optimal_row_idx)
+        return basic_rows
 
     def _check_optimal(self) -> bool:
         return all(val >= 0 for val in self._tableau[-1][:-1])
 
     def _create_new_tableau(self, pivot_row, pivot_col):
 
-        pivot_var_val = self._tableau[pivot_row][pivot_col]
-        new_tableau = [list(x) for x in self._tableau]
+        pivot_var_val = self._exact_entry(self._tableau[pivot_row][pivot_col])
+        new_tableau = [copy.copy(x) for x in self._tableau]
 
         for col_idx, val in enumerate(self._tableau[pivot_row]):
             new_tableau[pivot_row][col_idx] /= pivot_var_val
@@ -61,6 +722,8 @@ class Tableau:
 
         for row_idx, row in filter(lambda i_r: i_r[0] != pivot_row, enumerate(new_tableau)):
             row_multiplier = row[pivot_col] / pivot_var_val
+            if row_multiplier == 0:
+                continue
             for col_idx, val in enumerate(row):
                 new_tableau[row_idx][col_idx] -= row_multiplier * new_tableau[pivot_row][col_idx]
         return new_tableau
@@ -146,54 +809,223 @@ class Tableau:
         return x
 
 
+def to_fraction(val) -> Fraction:
+    if isinstance(val, float):
+        return Fraction(repr(val))
+    return Fraction(val)
+
+
+def _unique_name(name: str, taken: set) -> str:
+    candidate, i = name, 0
+    while candidate in taken:
+        candidate = '{}_{}'.format(name, i)
+        i += 1
+    taken.add(candidate)
+    return candidate
+
+
 class SimplexSolver(SolverMethod):
+    """
+    With exact=True the solve still pivots in floating point, then rebuilds the final basis in exact rationals and
+    lets the exact tableau repair it to a verified optimum, so only the last few pivots pay for Fractions.
+
+    With limits set, a solve that runs out of time, iterations or memory, or is cancelled, returns the best feasible
+    point it passed through instead of running on, its status saying which limit stopped it.
+
+    pricing picks the rule choosing entering columns, see systemssolver.methods.pricing; the cheaper rules pay off
+    on models with many more columns than rows, and pivot with the primal simplex's ratio test.
+
+    crash picks structurals for the starting basis instead of the slacks, see systemssolver.methods.crash. The stats
+    count its pivots in crash_pivots, the ones repairing the basis it left in crash_repair_pivots, and the simplex
+    iterations after it in iterations as before.
+
+    precision=Precision.MIXED pivots in float32, see systemssolver.methods.precision, and still reports the basic
+    solution refined in double precision.
+    """
+
+    def __init__(self, exact=False, limits: SolveLimits = None, pricing=PricingMode.DANTZIG, crash=CrashMode.SLACK,
+                 precision=Precision.DOUBLE):
+        self.exact = exact
+        self.limits = limits
+        self.pricing = pricing
+        self.crash = crash
+        self.precision = precision
 
     def solve(self, problem: Problem, tracing_hook: TracingHook = None) -> Optional[Solution]:
         if not self.can_solve(problem):
             return None
 
+        stats = SolveStats() if tracing_hook is not None and tracing_hook.collects_stats else NULL_STATS
+        solution = self._solve(problem, tracing_hook, stats)
+        if stats.enabled:
+            solution.stats = stats
+            tracing_hook.report(stats)
+        return solution
+
+    def _solve(self, problem: Problem, tracing_hook: Optional[TracingHook], stats: SolveStats) -> Solution:
+        if isinstance(problem, MatrixProblem):
+            # Already indexed, e.g. an instantiated template: the rows go straight into the tableau.
+            from systemssolver.methods.standard import build_tableau, maximization_costs
+            costs, constant = maximization_costs(problem.objectives[0])
+            tableau = build_tableau(problem, costs, constant, stats)
+        else:
+            tableau = self._build_tableau(problem, stats)
+        tableau.pricing = self.pricing
+        tableau.precision = self.precision
+        return self._run(tableau, tracing_hook, stats, legacy_start=not isinstance(problem, MatrixProblem))
+
+    @staticmethod
+    def _build_tableau(problem: Problem, stats: SolveStats) -> Tableau:
         objective = problem.objectives[0]
 
-        # Standard form,
-        # (1) must be a maximization problem,
-        min_objective = convert_objective_to_goal(objective, ObjectiveGoal.MAXIMIZE)
-
-        # (2) all linear constraints must be in a less-than-or-equal-to inequality,
-        lte_constraints = [convert_constraint_to(constraint, EqualitySigns.LE) for constraint in problem.constraints]
-        for constraint in lte_constraints:
-            lh_constants = [term for term in constraint.left.terms if term.var is None]
-            rh_vars = [term for term in constraint.right.terms if term.var is not None]
-            for term in lh_constants:
-                constraint.left -= term
-                constraint.right += term
-            for var in rh_vars:
-                constraint.left += var
-                constraint.right -= var
-
-        # (3) all variables are non-negative.
-
-        # Introducing slack variables: additional variables that make inequalities to
-        # equal. The new system is called canonical form.
-        slack_variables = [Variable(name="s{}".format(i)) for i in range(len(lte_constraints))]
-        slacked_constraints = [
-            Constraint(left=constraint.left + Term(var=slack), right=constraint.right, sign=EqualitySigns.EQUAL)
-            for constraint, slack in zip(lte_constraints, slack_variables)
-        ]
+        with stats.timer(Phase.STANDARDIZATION):
+            # Standard form,
+            # (1) must be a maximization problem,
+            min_objective = convert_objective_to_goal(objective, ObjectiveGoal.MAXIMIZE)
+
+            # (2) all linear constraints must be in a less-than-or-equal-to inequality,
+            # The constraints are copied first, the moves below rebind their sides and the problem may be shared.
+            lte_constraints = [
+                convert_constraint_to(Constraint(left=constraint.left, right=constraint.right, sign=constraint.sign),
+                                      EqualitySigns.LE)
+                for constraint in problem.constraints]
+            for constraint in lte_constraints:
+                lh_constants = [term for term in constraint.left.terms if term.var is None]
+                rh_vars = [term for term in constraint.right.terms if term.var is not None]
+                for term in lh_constants:
+                    constraint.left -= term
+                    constraint.right += term
+                for var in rh_vars:
+                    constraint.left += var
+                    constraint.right -= var
+
+            # (3) all variables are non-negative.
+
+        with stats.timer(Phase.SLACK_INSERTION):
+            # Introducing slack variables: additional variables that make inequalities to
+            # equal. The new system is called canonical form.
+            slack_variables = [Variable(name="s{}".format(i)) for i in range(len(lte_constraints))]
+            slacked_constraints = [
+                Constraint(left=constraint.left + Term(var=slack), right=constraint.right, sign=EqualitySigns.EQUAL)
+                for constraint, slack in zip(lte_constraints, slack_variables)
+            ]
 
         # Creating the tableau
-        tableau = Tableau(objective=min_objective.expression, constraints=slacked_constraints)
-        prev_solution = None
-        last_solution = None
-        while not tableau.step():
-            solution = tableau.to_solution()
-            if tracing_hook and not tracing_hook.step(solution):
-                return solution
-            if solution == prev_solution or solution == last_solution:
+        with stats.timer(Phase.TABLEAU_BUILD):
+            return Tableau(objective=min_objective.expression, constraints=slacked_constraints, stats=stats)
+
+    def _run(self, tableau: Tableau, tracing_hook: Optional[TracingHook], stats: SolveStats,
+             legacy_start=True) -> Solution:
+        # step() picks its pivot rows for the slack basis it starts from; a crashed basis goes on with the primal
+        # simplex's ratio test instead, which holds from any feasible basis, and so do the float32 pivots that need
+        # its tolerances and its refined optimality check. An exact solve takes it too: the float pass only warms
+        # up the basis the Fraction tableau starts from, and step() can cycle on rows it cannot start feasible. So
+        # do the partial and multiple pricing rules, whose entering columns step()'s ratio test was never made for.
+        # A MatrixProblem has no legacy results to keep, and its >= and = rows start with a negative right-hand side
+        # that step() never repairs.
+        legacy = legacy_start and self.crash == CrashMode.SLACK and self.precision == Precision.DOUBLE and \
+            not self.exact and self.pricing == PricingMode.DANTZIG
+        clock = self.limits.start() if self.limits is not None else None
+        if not legacy:
+            if self.crash != CrashMode.SLACK:
+                stats.increment('crash_pivots', crash_basis(tableau, self.crash))
+            try:
+                repaired = tableau.restore_feasibility(clock=clock)
+            except LimitReached as e:
+                stats.increment('limit_stops')
+                return _partial_solution(tableau, None, e.status)
+            stats.increment('crash_repair_pivots' if self.crash != CrashMode.SLACK else 'phase_one_pivots', repaired)
+
+        # Loop detection compares bases so no solution has to be built unless the hook wants one.
+        traces_solutions = tracing_hook is not None and tracing_hook.traces_solutions
+        status = clock.check(tableau) if clock is not None else None
+        best = _best_feasible(tableau, None) if clock is not None else None
+        prev_basis = None
+        last_basis = tableau.basis()
+        advance = tableau.step if legacy else tableau.primal_step
+        while status is None and not advance():
+            stats.increment('iterations')
+            basis = tableau.basis()
+            if traces_solutions:
+                stats.increment('traced_solutions')
+                if not tracing_hook.step(tableau.to_solution()):
+                    break
+            if basis == prev_basis or basis == last_basis:
                 logging.warning('Loop detected')
-                return solution
-            prev_solution = last_solution
-            last_solution = solution
-        return tableau.to_solution()
+                stats.increment('loops_detected')
+                break
+            prev_basis = last_basis
+            last_basis = basis
+            if clock is not None:
+                best = _best_feasible(tableau, best)
+                status = clock.tick(tableau)
+
+        optimal = tableau._check_optimal() if legacy else tableau.is_dual_feasible()
+        if status is None and tracing_hook is not None and tracing_hook.separates_rows and optimal:
+            try:
+                stats.increment('iterations', separate_rows(tableau, tracing_hook, clock, stats))
+            except LimitReached as e:
+                status = e.status
+                best = _best_feasible(tableau, best)
+
+        if status is None and self.exact:
+            tableau = tableau.to_exact()
+            try:
+                stats.increment('exact_repair_pivots', tableau.optimize(clock=clock))
+            except LimitReached as e:
+                status = e.status
+                best = _best_feasible(tableau, best)
+
+        with stats.timer(Phase.EXTRACTION):
+            if status is None:
+                return tableau.to_solution()
+            stats.increment('limit_stops')
+            return _partial_solution(tableau, best, status)
 
     def can_solve(self, problem: Problem) -> bool:
-        return len(problem.objectives) == 1 and len(problem.constraints) > 0
+        if isinstance(problem, MatrixProblem):
+            return len(problem.objectives) == 1 and problem.num_constraints > 0 and problem.is_linear and \
+                EqualitySigns.NOT_EQUAL not in problem.signs
+        return len(problem.objectives) == 1 and len(problem.constraints) > 0 and \
+            not problem.objectives[0].is_quadratic
+
+
+def separate_rows(tableau: Tableau, tracing_hook: TracingHook, clock: LimitClock = None,
+                  stats: SolveStats = NULL_STATS) -> int:
+    """
+    Lazy constraints: hands the point at the tableau's optimum to the hook, adds the rows of the returned constraints
+    that the point violates and re-optimizes from the current basis, which the dual simplex repairs, until the hook
+    returns nothing violated. Returns the pivots made.
+    """
+    pivots = 0
+    while True:
+        values = tableau.values()
+        violated = list()
+        for constraint in tracing_hook.separate(tableau.to_solution(values)):
+            for coefs, rhs in tableau.constraint_rows(constraint):
+                if sum(coef * values[col] for col, coef in coefs.items()) > rhs + tableau._epsilon:
+                    violated.append((coefs, rhs))
+        if not violated:
+            return pivots
+
+        stats.increment('separation_rounds')
+        stats.increment('lazy_rows', len(violated))
+        for coefs, rhs in violated:
+            tableau.add_row(coefs, rhs, name='lazy')
+        pivots += tableau.optimize(clock=clock)
+
+
+def _best_feasible(tableau: Tableau, best: Optional[tuple]) -> Optional[tuple]:
+    """ (objective value, values) of whichever of best and the current basis is the better feasible point. """
+    if tableau.is_primal_feasible() and (best is None or tableau.objective_value > best[0]):
+        return tableau.objective_value, tableau.values()
+    return best
+
+
+def _partial_solution(tableau: Tableau, best: Optional[tuple], status: SolveStatus) -> Solution:
+    solution = tableau.to_solution(best[1] if best is not None else None)
+    solution.status = status
+    solution.feasible = best is not None
+    # A dual feasible basis prices every column out, so its objective bounds the optimum from above.
+    solution.bound = tableau.objective_value if tableau.is_dual_feasible() else None
+    return solution
@@ -0,0 +1,76 @@
+"""
+Standard form built straight from a MatrixProblem: every row as an indexed `row <= rhs` and every objective as a
+maximization, for the solvers that run the two-phase Tableau.optimize rather than the legacy SimplexSolver loop.
+"""
+from typing import List, Dict, Tuple
+
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem, MatrixObjective
+from systemssolver.modeling.objective import ObjectiveGoal
+from systemssolver.modeling.variables import Variable
+from systemssolver.methods.simplex import Tableau
+from systemssolver.tracing.stats import SolveStats, NULL_STATS, Phase
+
+
+def standard_rows(matrix: MatrixProblem) -> Tuple[List[Dict[int, float]], List[float]]:
+    rows, rhs = list(), list()
+    for row_idx in range(matrix.num_constraints):
+        indices, coefs = matrix.rows.row(row_idx)
+        row = dict()
+        for col, coef in zip(indices, coefs):
+            row[col] = row.get(col, 0) + coef
+        sign, val = matrix.signs[row_idx], matrix.rhs[row_idx]
+
+        if sign in (EqualitySigns.LE, EqualitySigns.LT, EqualitySigns.EQUAL):
+            rows.append(row)
+            rhs.append(val)
+        if sign in (EqualitySigns.GE, EqualitySigns.GT, EqualitySigns.EQUAL):
+            rows.append({col: -coef for col, coef in row.items()})
+            rhs.append(-val)
+        if sign == EqualitySigns.NOT_EQUAL:
+            raise NotImplementedError()
+    return rows, rhs
+
+
+def standard_row_map(matrix: MatrixProblem) -> List[List[Tuple[int, int]]]:
+    """ For every constraint, the standard rows standard_rows made of it and the scale, 1 or -1, of each. """
+    mapping, count = list(), 0
+    for sign in matrix.signs:
+        rows = list()
+        if sign in (EqualitySigns.LE, EqualitySigns.LT, EqualitySigns.EQUAL):
+            rows.append((count, 1))
+            count += 1
+        if sign in (EqualitySigns.GE, EqualitySigns.GT, EqualitySigns.EQUAL):
+            rows.append((count, -1))
+            count += 1
+        mapping.append(rows)
+    return mapping
+
+
+def maximization_costs(objective: MatrixObjective) -> Tuple[Dict[int, float], float]:
+    scale = 1 if objective.goal == ObjectiveGoal.MAXIMIZE else -1
+    costs = dict()
+    for col, coef in zip(objective.indices, objective.coefs):
+        costs[col] = costs.get(col, 0) + scale * coef
+    return costs, scale * objective.constant
+
+
+def objective_value(objective: MatrixObjective, values) -> float:
+    """ Value of the objective, in its own goal's orientation, for raw structural values. """
+    return sum(coef * values[col] for col, coef in zip(objective.indices, objective.coefs)) + objective.constant + \
+        sum(coef * values[first] * values[second] for first, second, coef in objective.quadratic)
+
+
+def matrix_variables(matrix: MatrixProblem) -> List[Variable]:
+    return [
+        Variable(name=name, vtype=vtype, inverted=inverted)
+        for name, vtype, inverted in zip(matrix.variable_names, matrix.variable_types, matrix.inverted)
+    ]
+
+
+def build_tableau(matrix: MatrixProblem, costs: Dict[int, float], constant=0,
+                  stats: SolveStats = NULL_STATS) -> Tableau:
+    with stats.timer(Phase.STANDARDIZATION):
+        rows, rhs = standard_rows(matrix)
+    with stats.timer(Phase.TABLEAU_BUILD):
+        return Tableau.from_rows(matrix_variables(matrix), costs, constant, rows, rhs, stats=stats)
@@ -0,0 +1,172 @@
+"""
+Problems as plain dictionaries, in the same shape the web API lists objectives, constraints and variables in, so a
+model can be saved as JSON and loaded by the command line or posted in one request.
+
+The matrix form carries the same model as the arrays of a MatrixProblem instead of expression strings, which can be
+loaded without running the expression parser once per row.
+"""
+from array import array
+from decimal import Decimal
+from typing import Dict
+
+from systemssolver.modeling.equation import Constraint, EqualitySigns, Expression
+from systemssolver.modeling.matrix import MatrixProblem, MatrixObjective, SparseRows
+from systemssolver.modeling.objective import Objective, ObjectiveGoal, QuadraticTerm
+from systemssolver.modeling.parsing import ExpressionParser
+from systemssolver.modeling.variables import Variable, VariableType
+from systemssolver.problem import Problem
+
+
+def problem_from_dict(data: Dict) -> Problem:
+    if 'rows' in data:
+        return matrix_from_dict(data).to_problem()
+
+    parser = ExpressionParser()
+    problem = Problem()
+    # Variables go first, so expressions are taken as written: an inverted variable's terms are stored already
+    # flipped, as problem_to_dict writes them, and are not flipped again.
+    for variable in data.get('variables', ()):
+        problem.set_variable(Variable(
+            name=variable['name'], vtype=_variable_type(variable), inverted=variable.get('inverted', False)))
+
+    for objective in data.get('objectives', ()):
+        goal = ObjectiveGoal.from_str(objective['goal'])
+        if goal is None:
+            raise ValueError('Unknown goal {}'.format(objective['goal']))
+        quadratic = [
+            QuadraticTerm(Variable(name=term['first']), Variable(name=term['second']), term.get('coef', 1))
+            for term in objective.get('quadratic', ())
+        ]
+        problem.add_objective(Objective(expression=parser.parse(objective['expression']), goal=goal,
+                                        quadratic=quadratic))
+
+    for constraint in data.get('constraints', ()):
+        sign = EqualitySigns.from_val(constraint['sign'])
+        if sign is None:
+            raise ValueError('Unknown sign {}'.format(constraint['sign']))
+        problem.add_constraint(Constraint(
+            left=parser.parse(constraint['left']), right=parser.parse(constraint['right']), sign=sign))
+
+    return problem
+
+
+def problem_to_dict(problem: Problem) -> Dict:
+    return {
+        'objectives': [_objective_dict(objective) for objective in problem.objectives],
+        'constraints': [
+            {'left': _encode(constraint.left), 'sign': constraint.sign.value, 'right': _encode(constraint.right)}
+            for constraint in problem.constraints
+        ],
+        'variables': [
+            {'name': var.name, 'inverted': var.is_inverted, 'type': var.var_type.value}
+            for var in sorted(problem.variables, key=lambda var: var.name)
+        ]
+    }
+
+
+def _objective_dict(objective: Objective) -> Dict:
+    data = {'goal': objective.goal.value, 'expression': _encode(objective.expression)}
+    if objective.is_quadratic:
+        data['quadratic'] = [
+            {'first': term.first.name, 'second': term.second.name, 'coef': term.coef} for term in objective.quadratic
+        ]
+    return data
+
+
+def _encode(expression: Expression) -> str:
+    """
+    The expression as str() writes it, but with every number in positional notation: the parser reads the exponent
+    of 1e-05x as a variable e.
+    """
+    terms = list()
+    for term in expression.terms:
+        if term.coef == 0:
+            continue
+        encoded = ('+ ' if terms else '') if term.coef > 0 else '- '
+        if term.var is None or abs(term.coef) != 1:
+            encoded += _number(abs(term.coef))
+        if term.var is not None:
+            encoded += str(term.var)
+        terms.append(encoded)
+    return ' '.join(terms) if terms else '0'
+
+
+def _number(val) -> str:
+    # The shortest repr, which reads back as the same float, laid out without an exponent.
+    return format(Decimal(repr(float(val))), 'f')
+
+
+def matrix_from_dict(data: Dict) -> MatrixProblem:
+    """
+    A MatrixProblem from {'variables', 'objectives': [{'goal', 'indices', 'coefs', 'constant', 'quadratic'}],
+    'rows': {'indptr', 'indices', 'data'}, 'signs', 'rhs'}, variables as in problem_to_dict and the optional
+    quadratic entries as [row, column, coef] triples.
+    """
+    variables = data.get('variables', ())
+    matrix = MatrixProblem(
+        [variable['name'] for variable in variables], [_variable_type(variable) for variable in variables],
+        [variable.get('inverted', False) for variable in variables])
+
+    for objective in data.get('objectives', ()):
+        goal = ObjectiveGoal.from_str(objective['goal'])
+        if goal is None:
+            raise ValueError('Unknown goal {}'.format(objective['goal']))
+        _check_indices(objective['indices'], len(objective['coefs']), matrix.num_variables)
+        quadratic = objective.get('quadratic', ())
+        _check_indices([idx for entry in quadratic for idx in entry[:2]], 2 * len(quadratic), matrix.num_variables)
+        matrix.add_objective(goal, objective['indices'], objective['coefs'], objective.get('constant', 0.0),
+                             quadratic)
+
+    rows = data['rows']
+    signs = [EqualitySigns.from_val(sign) for sign in data['signs']]
+    if None in signs:
+        raise ValueError('Unknown sign {}'.format(data['signs'][signs.index(None)]))
+    indptr = array('q', rows['indptr'])
+    if len(indptr) != len(signs) + 1 or len(signs) != len(data['rhs']) or indptr[0] != 0 or \
+            indptr[-1] != len(rows['indices']) or any(start > end for start, end in zip(indptr, indptr[1:])):
+        raise ValueError('Rows, signs and rhs do not line up')
+    _check_indices(rows['indices'], len(rows['data']), matrix.num_variables)
+
+    matrix.rows = SparseRows(indptr, array('q', rows['indices']), array('d', rows['data']))
+    matrix.signs = signs
+    matrix.rhs = array('d', data['rhs'])
+    return matrix
+
+
+def matrix_to_dict(matrix: MatrixProblem) -> Dict:
+    return {
+        'variables': [
+            {'name': name, 'inverted': inverted, 'type': vtype.value}
+            for name, vtype, inverted in zip(matrix.variable_names, matrix.variable_types, matrix.inverted)
+        ],
+        'objectives': [_matrix_objective_dict(objective) for objective in matrix.objectives],
+        'rows': {
+            'indptr': list(matrix.rows.indptr), 'indices': list(matrix.rows.indices), 'data': list(matrix.rows.data)
+        },
+        'signs': [sign.value for sign in matrix.signs],
+        'rhs': list(matrix.rhs)
+    }
+
+
+def _matrix_objective_dict(objective: MatrixObjective) -> Dict:
+    data = {
+        'goal': objective.goal.value, 'indices': list(objective.indices), 'coefs': list(objective.coefs),
+        'constant': objective.constant
+    }
+    if objective.is_quadratic:
+        data['quadratic'] = [list(entry) for entry in objective.quadratic]
+    return data
+
+
+def _variable_type(variable: Dict) -> VariableType:
+    vtype = VariableType.from_val(variable.get('type', VariableType.REAL.value))
+    if vtype is None:
+        raise ValueError('Unknown variable type {}'.format(variable['type']))
+    return vtype
+
+
+def _check_indices(indices, count: int, num_variables: int):
+    if len(indices) != count:
+        raise ValueError('Expected one coefficient per index')
+    if any(not 0 <= idx < num_variables for idx in indices):
+        raise ValueError('Variable index out of range')
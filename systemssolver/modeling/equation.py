@@ -61,7 +61,7 @@ class Expression:
         total = 0
         for term in self._terms:
             value = term.evaluate()
-            if not value:
+            if value is None:
                 return None
             total += value
         return total
@@ -0,0 +1,93 @@
+from itertools import repeat
+from operator import add, mul, sub
+from typing import List, Sequence, Dict
+
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem
+
+
+class BatchEvaluation:
+    """
+    Scores of N candidates. Values are stored per objective and per constraint, each a list over the candidates,
+    which is the layout they are computed in.
+    """
+
+    def __init__(self, objective_values: List[List[float]], violations: List[List[float]]):
+        self.objective_values = objective_values
+        self.violations = violations
+
+    @property
+    def num_candidates(self) -> int:
+        if self.objective_values:
+            return len(self.objective_values[0])
+        return len(self.violations[0]) if self.violations else 0
+
+    def max_violation(self) -> List[float]:
+        if not self.violations:
+            return [0.0] * self.num_candidates
+        return list(map(max, *self.violations)) if len(self.violations) > 1 else list(self.violations[0])
+
+    def feasible(self, tolerance=1e-9) -> List[bool]:
+        return [violation <= tolerance for violation in self.max_violation()]
+
+
+class CompiledEvaluator:
+    """
+    Compiles a problem's objectives and constraints into coefficient arrays once, then scores whole batches of
+    candidate points. A candidate is a sequence of values in the order of `variable_names`, read the same way
+    Variable.val is by Expression.evaluate.
+
+    Work is done one coefficient at a time across all candidates, so the inner loops run over whole columns of the
+    batch instead of over Python objects per candidate.
+    """
+
+    def __init__(self, problem):
+        matrix = MatrixProblem.from_problem(problem)
+        self.variable_names = list(matrix.variable_names)
+        self._index = matrix.index
+        self._objectives = [
+            (list(zip(objective.indices, objective.coefs)), objective.constant) for objective in matrix.objectives
+        ]
+        self._rows = [list(zip(*matrix.rows.row(row_idx))) for row_idx in range(matrix.num_constraints)]
+        self._signs = list(matrix.signs)
+        self._rhs = list(matrix.rhs)
+
+    def candidate(self, assignment: Dict[str, float]) -> List[float]:
+        """ Lays out a name to value mapping as a candidate row, missing variables taken as zero. """
+        row = [0.0] * len(self.variable_names)
+        for name, val in assignment.items():
+            row[self._index[name]] = val
+        return row
+
+    def evaluate(self, candidates: Sequence[Sequence[float]]) -> BatchEvaluation:
+        count = len(candidates)
+        columns = list(zip(*candidates)) if count else [()] * len(self.variable_names)
+
+        objective_values = [self._activity(terms, columns, count, constant) for terms, constant in self._objectives]
+        violations = list()
+        for terms, sign, rhs in zip(self._rows, self._signs, self._rhs):
+            activity = self._activity(terms, columns, count, 0.0)
+            violations.append(_violation(activity, sign, rhs))
+        return BatchEvaluation(objective_values, violations)
+
+    def objective_values(self, candidates: Sequence[Sequence[float]], objective_idx=0) -> List[float]:
+        terms, constant = self._objectives[objective_idx]
+        return self._activity(terms, list(zip(*candidates)), len(candidates), constant)
+
+    @staticmethod
+    def _activity(terms, columns, count: int, constant) -> List[float]:
+        total = [constant] * count
+        for col, coef in terms:
+            values = columns[col] if coef == 1 else map(mul, columns[col], repeat(coef))
+            total = list(map(add, total, values))
+        return total
+
+
+def _violation(activity: List[float], sign: EqualitySigns, rhs) -> List[float]:
+    if sign in (EqualitySigns.LE, EqualitySigns.LT):
+        return [diff if diff > 0 else 0.0 for diff in map(sub, activity, repeat(rhs))]
+    if sign in (EqualitySigns.GE, EqualitySigns.GT):
+        return [diff if diff > 0 else 0.0 for diff in map(sub, repeat(rhs), activity)]
+    if sign == EqualitySigns.EQUAL:
+        return [abs(diff) for diff in map(sub, activity, repeat(rhs))]
+    return [1.0 if val == rhs else 0.0 for val in activity]
@@ -0,0 +1,187 @@
+from array import array
+from typing import List, Dict, Sequence, Tuple
+
+from systemssolver.modeling.equation import Expression, Constraint, EqualitySigns
+from systemssolver.modeling.objective import Objective, ObjectiveGoal, QuadraticTerm
+from systemssolver.modeling.variables import Variable, VariableType, Term
+from systemssolver.problem import Problem
+
+
+class SparseRows:
+    """
+    Compressed sparse rows: the entries of row i are indices[indptr[i]:indptr[i + 1]] with matching data.
+    The three buffers may be arrays, lists or memoryviews over a mapped file.
+    """
+
+    def __init__(self, indptr: Sequence[int] = None, indices: Sequence[int] = None, data: Sequence[float] = None):
+        self.indptr = indptr if indptr is not None else array('q', [0])
+        self.indices = indices if indices is not None else array('q')
+        self.data = data if data is not None else array('d')
+
+    @property
+    def num_rows(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def nnz(self) -> int:
+        return self.indptr[-1]
+
+    def row(self, idx: int) -> Tuple[Sequence[int], Sequence[float]]:
+        start, end = self.indptr[idx], self.indptr[idx + 1]
+        return self.indices[start:end], self.data[start:end]
+
+    def append_row(self, indices: Sequence[int], data: Sequence[float]):
+        self.indices.extend(indices)
+        self.data.extend(data)
+        self.indptr.append(len(self.indices))
+
+    def transpose(self, num_cols: int) -> 'SparseRows':
+        counts = [0] * (num_cols + 1)
+        for col in self.indices:
+            counts[col + 1] += 1
+        for col in range(num_cols):
+            counts[col + 1] += counts[col]
+        indptr = array('q', counts)
+        indices = array('q', bytes(8 * self.nnz))
+        data = array('d', bytes(8 * self.nnz))
+        cursor = list(counts[:-1])
+        for row_idx in range(self.num_rows):
+            for col, val in zip(*self.row(row_idx)):
+                indices[cursor[col]] = row_idx
+                data[cursor[col]] = val
+                cursor[col] += 1
+        return SparseRows(indptr, indices, data)
+
+
+class MatrixObjective:
+    """ Sparse linear coefficients and, for quadratic objectives, the (row, column, coef) entries of Q in x'Qx. """
+
+    def __init__(self, goal: ObjectiveGoal, indices: Sequence[int], coefs: Sequence[float], constant=0.0,
+                 quadratic: List[Tuple[int, int, float]] = None):
+        self.goal, self.indices, self.coefs, self.constant = goal, indices, coefs, constant
+        self.quadratic = quadratic if quadratic is not None else list()
+
+    @property
+    def is_quadratic(self) -> bool:
+        return len(self.quadratic) > 0
+
+    def dense(self, num_variables: int) -> List[float]:
+        coefs = [0.0] * num_variables
+        for idx, coef in zip(self.indices, self.coefs):
+            coefs[idx] += coef
+        return coefs
+
+
+class MatrixProblem:
+    """
+    Columnar form of a Problem: a variable table, one sparse coefficient vector per objective and the constraints
+    as CSR rows with a sign and right hand side each. Every constraint is normalized to `row (sign) rhs` with all
+    variables on the left and the constant on the right.
+    """
+
+    def __init__(self, variable_names: List[str], variable_types: List[VariableType] = None,
+                 inverted: List[bool] = None):
+        self.variable_names = variable_names
+        self.variable_types = variable_types if variable_types is not None \
+            else [VariableType.REAL] * len(variable_names)
+        self.inverted = inverted if inverted is not None else [False] * len(variable_names)
+        self.objectives: List[MatrixObjective] = list()
+        self.rows = SparseRows()
+        self.signs: List[EqualitySigns] = list()
+        self.rhs: Sequence[float] = array('d')
+        self._index = None
+        self._columns = None
+
+    @property
+    def num_variables(self) -> int:
+        return len(self.variable_names)
+
+    @property
+    def num_constraints(self) -> int:
+        return self.rows.num_rows
+
+    @property
+    def index(self) -> Dict[str, int]:
+        if self._index is None:
+            self._index = {name: idx for idx, name in enumerate(self.variable_names)}
+        return self._index
+
+    @property
+    def columns(self) -> SparseRows:
+        if self._columns is None:
+            self._columns = self.rows.transpose(self.num_variables)
+        return self._columns
+
+    def add_objective(self, goal: ObjectiveGoal, indices: Sequence[int], coefs: Sequence[float], constant=0.0,
+                      quadratic: List[Tuple[int, int, float]] = None):
+        self.objectives.append(MatrixObjective(goal, array('q', indices), array('d', coefs), constant,
+                                               [tuple(entry) for entry in quadratic] if quadratic else None))
+
+    @property
+    def is_linear(self) -> bool:
+        return not any(objective.is_quadratic for objective in self.objectives)
+
+    def add_row(self, indices: Sequence[int], coefs: Sequence[float], sign: EqualitySigns, rhs: float):
+        self.rows.append_row(indices, coefs)
+        self.signs.append(sign)
+        self.rhs.append(rhs)
+        self._columns = None
+
+    @staticmethod
+    def from_problem(problem: Problem) -> 'MatrixProblem':
+        if isinstance(problem, MatrixProblem):
+            return problem
+        if hasattr(problem, 'to_matrix'):
+            return problem.to_matrix()
+
+        variables = sorted(problem.variables, key=lambda var: var.name)
+        matrix = MatrixProblem(
+            [var.name for var in variables], [var.var_type for var in variables],
+            [var.is_inverted for var in variables])
+        index = matrix.index
+
+        for objective in problem.objectives:
+            coefs, constant = expression_coefficients(index, objective.expression, 1)
+            quadratic = [(index[term.first.name], index[term.second.name], term.coef) for term in objective.quadratic]
+            matrix.add_objective(objective.goal, list(coefs.keys()), list(coefs.values()), constant, quadratic)
+
+        for constraint in problem.constraints:
+            coefs, left_constant = expression_coefficients(index, constraint.left, 1)
+            coefs, right_constant = expression_coefficients(index, constraint.right, -1, coefs)
+            matrix.add_row(list(coefs.keys()), list(coefs.values()), constraint.sign, -right_constant - left_constant)
+        return matrix
+
+    def to_problem(self) -> Problem:
+        variables = [
+            Variable(name=name, vtype=vtype, inverted=inverted)
+            for name, vtype, inverted in zip(self.variable_names, self.variable_types, self.inverted)
+        ]
+        problem = Problem()
+        for objective in self.objectives:
+            terms = [Term(var=variables[idx], coef=coef) for idx, coef in zip(objective.indices, objective.coefs)]
+            if objective.constant:
+                terms.append(Term(coef=objective.constant))
+            quadratic = [QuadraticTerm(variables[first], variables[second], coef)
+                         for first, second, coef in objective.quadratic]
+            problem.add_objective(Objective(expression=Expression(terms), goal=objective.goal, quadratic=quadratic))
+
+        for row_idx in range(self.num_constraints):
+            indices, coefs = self.rows.row(row_idx)
+            problem.add_constraint(Constraint(
+                left=Expression([Term(var=variables[idx], coef=coef) for idx, coef in zip(indices, coefs)]),
+                right=Expression([Term(coef=self.rhs[row_idx])]),
+                sign=self.signs[row_idx]))
+        return problem
+
+
+def expression_coefficients(index: Dict[str, int], expression: Expression, scale, coefs: Dict[int, float] = None):
+    """ Adds scale times the expression's variable terms into coefs, keyed by column, and returns its constant. """
+    coefs = coefs if coefs is not None else dict()
+    constant = 0
+    for term in expression.terms:
+        if term.var is None:
+            constant += scale * term.coef
+        else:
+            idx = index[term.var.name]
+            coefs[idx] = coefs.get(idx, 0) + scale * term.coef
+    return coefs, constant
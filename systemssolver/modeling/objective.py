@@ -1,6 +1,8 @@
 from enum import Enum
+from typing import List
 
 from systemssolver.modeling.equation import Expression
+from systemssolver.modeling.variables import Variable
 
 
 class ObjectiveGoal(Enum):
@@ -15,10 +17,34 @@ class ObjectiveGoal(Enum):
         return None
 
 
+class QuadraticTerm:
+    """ coef * first * second; a square when both are the same variable. """
+
+    def __init__(self, first: Variable, second: Variable, coef=1):
+        self.first, self.second, self.coef = first, second, coef
+
+    def __neg__(self):
+        return QuadraticTerm(self.first, self.second, -self.coef)
+
+    def __eq__(self, other):
+        return isinstance(other, QuadraticTerm) and self.coef == other.coef and \
+            {self.first, self.second} == {other.first, other.second}
+
+    def __str__(self):
+        if self.first == self.second:
+            return '{}*{}^2'.format(self.coef, self.first)
+        return '{}*{}*{}'.format(self.coef, self.first, self.second)
+
+
 class Objective:
+    """
+    A linear expression plus, optionally, quadratic terms: the sparse entries of Q in expression + x'Qx. Only the
+    quadratic programming solver accepts objectives with quadratic terms.
+    """
 
-    def __init__(self, expression: Expression, goal: ObjectiveGoal):
+    def __init__(self, expression: Expression, goal: ObjectiveGoal, quadratic: List[QuadraticTerm] = None):
         self._expression, self._goal = expression, goal
+        self._quadratic = quadratic if quadratic is not None else list()
 
     @property
     def expression(self) -> Expression:
@@ -28,11 +54,20 @@ class Objective:
     def goal(self) -> ObjectiveGoal:
         return self._goal
 
+    @property
+    def quadratic(self) -> List[QuadraticTerm]:
+        return self._quadratic
+
+    @property
+    def is_quadratic(self) -> bool:
+        return len(self._quadratic) > 0
+
     def __eq__(self, other):
-        return isinstance(other, Objective) and self.expression == other.expression and other.goal == self.goal
+        return isinstance(other, Objective) and self.expression == other.expression and other.goal == self.goal \
+            and self.quadratic == other.quadratic
 
 
 def convert_objective_to_goal(obj: Objective, goal: ObjectiveGoal) -> Objective:
     if obj.goal == goal:
         return obj
-    return Objective(expression=-obj.expression, goal=goal)
+    return Objective(expression=-obj.expression, goal=goal, quadratic=[-term for term in obj.quadratic])
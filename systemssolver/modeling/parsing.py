@@ -15,10 +15,13 @@ class ConstraintParser:
             if not check_next and char in {'=', '<', '>', '!'}:
                 sign = char
                 cur_buffer = right_buffer
+                check_next = True
             elif check_next and char == '=':
                 sign = sign + char
+                check_next = False
             else:
                 cur_buffer.append(char)
+                check_next = False
 
         if not right_buffer or not left_buffer:
             raise RuntimeError()
@@ -56,7 +59,12 @@ class ExpressionParser:
             return None
 
         terms = list()
+        in_var = False
         for char in encoded:
+            if in_var and (char.isalnum() or char == '_'):
+                var += char
+                continue
+            in_var = False
             if char == ' ':
                 term = get_var(si, co, var)
                 if term:
@@ -71,6 +79,7 @@ class ExpressionParser:
                 si = char
             elif char.isalpha():
                 var = char
+                in_var = True
             elif char.isalnum() or char == '.' or char == ',':
                 co = char if not co else co + char
         else:
@@ -0,0 +1,307 @@
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+from array import array
+from typing import List, Dict, Sequence, Set, Optional
+
+from systemssolver.modeling.equation import Constraint, Expression, EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem, MatrixObjective, SparseRows, expression_coefficients
+from systemssolver.modeling.objective import Objective, QuadraticTerm
+from systemssolver.modeling.variables import Variable, Term, VariableType
+
+_SIGNS = list(EqualitySigns)
+
+
+class _MappedArray:
+    """ An append-only typed array in a file, read back through a memory map. """
+
+    def __init__(self, path: str, typecode: str):
+        self._path, self._typecode = path, typecode
+        self._itemsize = array(typecode).itemsize
+        self._file = open(path, 'wb')
+        self._map = None
+        self._view = None
+
+    def __len__(self):
+        return self._file.tell() // self._itemsize
+
+    def append(self, values: array):
+        if sys.byteorder != 'little':
+            values = array(self._typecode, values)
+            values.byteswap()
+        self._file.write(values.tobytes())
+        self._view = None
+
+    def view(self) -> Sequence:
+        if self._view is None:
+            self._file.flush()
+            size = self._file.tell()
+            if size == 0:
+                return array(self._typecode)
+            _close_map(self._map)
+            with open(self._path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+            view = memoryview(self._map).cast(self._typecode)
+            if sys.byteorder != 'little':
+                view = array(self._typecode, view.tobytes())
+                view.byteswap()
+            self._view = view
+        return self._view
+
+    def close(self):
+        self._view = None
+        _close_map(self._map)
+        self._map = None
+        self._file.close()
+
+
+def _close_map(mapped: Optional[mmap.mmap]):
+    """ Unmaps mapped, unless a view handed out still reads it: the map is then closed once the last one goes. """
+    if mapped is not None:
+        try:
+            mapped.close()
+        except BufferError:
+            pass
+
+
+def _build_columns(directory: str, rows: SparseRows, num_cols: int, maps: List[mmap.mmap]) -> SparseRows:
+    """ Transposes rows into a CSC layout on disk, adding its maps to maps; only the column counts live in memory. """
+    counts = array('q', bytes(8 * (num_cols + 1)))
+    for col in rows.indices:
+        counts[col + 1] += 1
+    for col in range(num_cols):
+        counts[col + 1] += counts[col]
+
+    nnz = rows.nnz
+    columns = list()
+    for name, typecode in (('columns.indices', 'q'), ('columns.data', 'd')):
+        path = os.path.join(directory, name)
+        with open(path, 'wb') as f:
+            f.truncate(8 * nnz)
+        if nnz == 0:
+            columns.append(array(typecode))
+            continue
+        with open(path, 'r+b') as f:
+            maps.append(mmap.mmap(f.fileno(), 8 * nnz))
+        columns.append(memoryview(maps[-1]).cast(typecode))
+    indices, data = columns
+
+    cursor = array('q', counts[:-1])
+    for row_idx in range(rows.num_rows):
+        row_indices, row_data = rows.row(row_idx)
+        for col, val in zip(row_indices, row_data):
+            indices[cursor[col]] = row_idx
+            data[cursor[col]] = val
+            cursor[col] += 1
+    return SparseRows(counts, indices, data)
+
+
+class ConstraintView:
+    """ Read-only sequence of a DiskProblem's constraints, built one at a time on access. """
+
+    def __init__(self, problem: 'DiskProblem'):
+        self._problem = problem
+
+    def __len__(self):
+        return self._problem.num_constraints
+
+    def __getitem__(self, idx: int) -> Constraint:
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+        return self._problem.constraint(idx)
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self._problem.constraint(idx)
+
+
+class DiskProblem:
+    """
+    A Problem whose constraint coefficients live in memory-mapped files. Rows are buffered in memory and appended
+    to disk in chunks of chunk_nnz non-zeros, so building a model only holds one chunk plus the variable table.
+    Rows, columns and Constraint objects are produced lazily from the mapped arrays.
+    """
+
+    def __init__(self, directory: str = None, chunk_nnz=1 << 16):
+        self._owns_directory = directory is None
+        self._directory = directory if directory is not None else tempfile.mkdtemp(prefix='systemssolver-')
+        os.makedirs(self._directory, exist_ok=True)
+        self._chunk_nnz = chunk_nnz
+
+        self._indptr = _MappedArray(os.path.join(self._directory, 'rows.indptr'), 'q')
+        self._indices = _MappedArray(os.path.join(self._directory, 'rows.indices'), 'q')
+        self._data = _MappedArray(os.path.join(self._directory, 'rows.data'), 'd')
+        self._signs = _MappedArray(os.path.join(self._directory, 'rows.signs'), 'B')
+        self._rhs = _MappedArray(os.path.join(self._directory, 'rows.rhs'), 'd')
+        self._indptr.append(array('q', [0]))
+
+        self._variable_names: List[str] = list()
+        self._variable_types: List[VariableType] = list()
+        self._inverted: List[bool] = list()
+        self._index: Dict[str, int] = dict()
+        self._objective_functions: List[MatrixObjective] = list()
+
+        self._flushed_nnz = 0
+        self._pending_indptr = array('q')
+        self._pending_indices = array('q')
+        self._pending_data = array('d')
+        self._pending_signs = array('B')
+        self._pending_rhs = array('d')
+        self._columns: Optional[SparseRows] = None
+        self._column_maps: List[mmap.mmap] = list()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def add_variable(self, variable: Variable) -> int:
+        idx = self._index.get(variable.name)
+        if idx is None:
+            idx = len(self._variable_names)
+            self._index[variable.name] = idx
+            self._variable_names.append(variable.name)
+            self._variable_types.append(variable.var_type)
+            self._inverted.append(variable.is_inverted)
+        return idx
+
+    def add_objective(self, obj: Objective):
+        self._register(obj.expression)
+        coefs, constant = expression_coefficients(self._index, obj.expression, 1)
+        quadratic = [(self.add_variable(term.first), self.add_variable(term.second), term.coef)
+                     for term in obj.quadratic]
+        self._objective_functions.append(
+            MatrixObjective(obj.goal, array('q', coefs.keys()), array('d', coefs.values()), constant, quadratic))
+
+    def add_constraint(self, obj: Constraint):
+        self._register(obj.left)
+        self._register(obj.right)
+        coefs, left_constant = expression_coefficients(self._index, obj.left, 1)
+        coefs, right_constant = expression_coefficients(self._index, obj.right, -1, coefs)
+        self.add_row(list(coefs.keys()), list(coefs.values()), obj.sign, -right_constant - left_constant)
+
+    def add_row(self, indices: Sequence[int], coefs: Sequence[float], sign: EqualitySigns, rhs: float):
+        """ Appends an already indexed row, the bulk path for generated models. """
+        self._pending_indices.extend(indices)
+        self._pending_data.extend(coefs)
+        self._pending_indptr.append(self._flushed_nnz + len(self._pending_indices))
+        self._pending_signs.append(_SIGNS.index(sign))
+        self._pending_rhs.append(rhs)
+        if len(self._pending_indices) >= self._chunk_nnz:
+            self.flush()
+
+    def flush(self):
+        if not self._pending_indptr:
+            return
+        self._indptr.append(self._pending_indptr)
+        self._indices.append(self._pending_indices)
+        self._data.append(self._pending_data)
+        self._signs.append(self._pending_signs)
+        self._rhs.append(self._pending_rhs)
+        self._flushed_nnz += len(self._pending_indices)
+        self._pending_indptr = array('q')
+        self._pending_indices = array('q')
+        self._pending_data = array('d')
+        self._pending_signs = array('B')
+        self._pending_rhs = array('d')
+        self._drop_columns()
+
+    def _register(self, expression: Expression):
+        for term in expression.terms:
+            if term.var is not None:
+                self.add_variable(term.var)
+
+    @property
+    def num_constraints(self) -> int:
+        return len(self._signs) + len(self._pending_signs)
+
+    @property
+    def nnz(self) -> int:
+        return self._flushed_nnz + len(self._pending_indices)
+
+    @property
+    def rows(self) -> SparseRows:
+        self.flush()
+        return SparseRows(self._indptr.view(), self._indices.view(), self._data.view())
+
+    @property
+    def columns(self) -> SparseRows:
+        self.flush()
+        if self._columns is None:
+            self._columns = _build_columns(self._directory, self.rows, len(self._variable_names), self._column_maps)
+        return self._columns
+
+    def row(self, idx: int):
+        return self.rows.row(idx)
+
+    def column(self, idx: int):
+        return self.columns.row(idx)
+
+    def constraint(self, idx: int) -> Constraint:
+        indices, coefs = self.row(idx)
+        variables = self._variable_objects(indices)
+        return Constraint(
+            left=Expression([Term(var=var, coef=coef) for var, coef in zip(variables, coefs)]),
+            right=Expression([Term(coef=self._rhs.view()[idx])]),
+            sign=_SIGNS[self._signs.view()[idx]])
+
+    def _variable_objects(self, indices: Sequence[int]) -> List[Variable]:
+        return [
+            Variable(name=self._variable_names[idx], vtype=self._variable_types[idx], inverted=self._inverted[idx])
+            for idx in indices
+        ]
+
+    @property
+    def objectives(self) -> List[Objective]:
+        objectives = list()
+        for objective in self._objective_functions:
+            terms = [
+                Term(var=var, coef=coef)
+                for var, coef in zip(self._variable_objects(objective.indices), objective.coefs)
+            ]
+            if objective.constant:
+                terms.append(Term(coef=objective.constant))
+            firsts = self._variable_objects([first for first, _, _ in objective.quadratic])
+            seconds = self._variable_objects([second for _, second, _ in objective.quadratic])
+            quadratic = [QuadraticTerm(first, second, coef)
+                         for first, second, (_, _, coef) in zip(firsts, seconds, objective.quadratic)]
+            objectives.append(Objective(expression=Expression(terms), goal=objective.goal, quadratic=quadratic))
+        return objectives
+
+    @property
+    def constraints(self) -> ConstraintView:
+        self.flush()
+        return ConstraintView(self)
+
+    @property
+    def variables(self) -> Set[Variable]:
+        return set(self._variable_objects(range(len(self._variable_names))))
+
+    def to_matrix(self) -> MatrixProblem:
+        """ A MatrixProblem whose rows, signs and right hand sides are views over the mapped files. """
+        matrix = MatrixProblem(list(self._variable_names), list(self._variable_types), list(self._inverted))
+        matrix.objectives = list(self._objective_functions)
+        matrix.rows = self.rows
+        matrix.signs = [_SIGNS[sign] for sign in self._signs.view()]
+        matrix.rhs = self._rhs.view()
+        return matrix
+
+    def _drop_columns(self):
+        self._columns = None
+        for mapped in self._column_maps:
+            _close_map(mapped)
+        self._column_maps = list()
+
+    def close(self):
+        self.flush()
+        self._drop_columns()
+        for mapped in (self._indptr, self._indices, self._data, self._signs, self._rhs):
+            mapped.close()
+        if self._owns_directory:
+            shutil.rmtree(self._directory, ignore_errors=True)
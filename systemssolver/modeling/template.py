@@ -0,0 +1,191 @@
+"""
+Model templates: a model whose numbers are named parameters, parsed and laid out once, then instantiated as a
+MatrixProblem for each set of parameter values without parsing or building any modeling objects.
+
+    template = ModelTemplate(parameters=['a', 'b', 'cap'])
+    template.add_objective(ObjectiveGoal.MAXIMIZE, '3x + 2y')
+    template.add_constraint('a*x + b*y <= cap')
+    compiled = template.compile()
+    matrix = compiled.instantiate({'a': 1, 'b': 2, 'cap': 10})
+
+A term is a product of numbers, at most one parameter and at most one variable, with or without `*` between them.
+"""
+import re
+from array import array
+from typing import List, Dict, Sequence, Tuple, Optional, Iterable, Iterator, Union
+
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem, SparseRows
+from systemssolver.modeling.objective import ObjectiveGoal
+
+_TOKEN = re.compile(r'\s*(?:(\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?)|([A-Za-z_]\w*)|(\S))')
+_SIGN = re.compile(r'<=|>=|!=|=|<|>')
+
+# A parsed term: (variable name or None for a constant, numeric factor, parameter name or None).
+TemplateTerm = Tuple[Optional[str], float, Optional[str]]
+
+ParameterValues = Union[Dict[str, float], Sequence[float]]
+
+
+class ModelTemplate:
+
+    def __init__(self, parameters: Iterable[str]):
+        self.parameters = list(parameters)
+        self._parameter_set = set(self.parameters)
+        self._objectives: List[Tuple[ObjectiveGoal, List[TemplateTerm]]] = list()
+        self._constraints: List[Tuple[List[TemplateTerm], EqualitySigns, List[TemplateTerm]]] = list()
+
+    def add_objective(self, goal: ObjectiveGoal, encoded: str):
+        self._objectives.append((goal, self.parse_expression(encoded)))
+
+    def add_constraint(self, encoded: str):
+        match = _SIGN.search(encoded)
+        if match is None:
+            raise ValueError('No sign in constraint {}'.format(encoded))
+        left, right = encoded[:match.start()], encoded[match.end():]
+        self._constraints.append(
+            (self.parse_expression(left), EqualitySigns.from_val(match.group()), self.parse_expression(right)))
+
+    def parse_expression(self, encoded: str) -> List[TemplateTerm]:
+        terms = list()
+        sign, signed, factor, parameter, variable = 1, False, None, None, None
+        for number, name, symbol in _tokens(encoded) + [(None, None, '')]:
+            if symbol in ('+', '-', ''):
+                if factor is not None or parameter is not None or variable is not None:
+                    terms.append((variable, sign * (factor if factor is not None else 1), parameter))
+                elif signed:
+                    raise ValueError('Sign without a term in {}'.format(encoded))
+                sign, signed = -1 if symbol == '-' else 1, symbol != ''
+                factor, parameter, variable = None, None, None
+            elif symbol == '*':
+                continue
+            elif symbol is not None:
+                raise ValueError('Unexpected {} in {}'.format(symbol, encoded))
+            elif number is not None:
+                factor = float(number) * (factor if factor is not None else 1)
+            elif name in self._parameter_set:
+                if parameter is not None:
+                    raise ValueError('Term with two parameters in {}'.format(encoded))
+                parameter = name
+            else:
+                if variable is not None:
+                    raise ValueError('Term with two variables in {}'.format(encoded))
+                variable = name
+        return terms
+
+    def compile(self) -> 'CompiledTemplate':
+        names = sorted({
+            var for _, terms in self._objectives for var, _, _ in terms if var is not None
+        } | {
+            var for left, _, right in self._constraints for var, _, _ in left + right if var is not None
+        })
+        index = {name: idx for idx, name in enumerate(names)}
+        parameter_index = {name: idx for idx, name in enumerate(self.parameters)}
+
+        objectives = list()
+        for goal, terms in self._objectives:
+            layout, constant = _Layout(), _Layout()
+            for var, coef, parameter in terms:
+                target = layout if var is not None else constant
+                target.add(index.get(var, -1), coef, parameter_index.get(parameter, -1))
+            objectives.append((goal, layout, constant))
+
+        rows, rhs, signs = _Layout(), _Layout(), list()
+        indptr = array('q', [0])
+        for row_idx, (left, sign, right) in enumerate(self._constraints):
+            # Every row as `variables (sign) constants`: variables move left and constants right, flipping sign.
+            for side, scale in ((left, 1), (right, -1)):
+                for var, coef, parameter in side:
+                    if var is not None:
+                        rows.add(index[var], scale * coef, parameter_index.get(parameter, -1))
+                    else:
+                        rhs.add(row_idx, -scale * coef, parameter_index.get(parameter, -1))
+            indptr.append(len(rows.targets))
+            signs.append(sign)
+        return CompiledTemplate(names, self.parameters, objectives, indptr, rows, signs, rhs)
+
+
+class _Layout:
+    """ Entries target[k] += coefs[k] * (values[parameters[k]] if parameters[k] >= 0 else 1). """
+
+    def __init__(self):
+        self.targets, self.coefs, self.parameters = array('q'), array('d'), array('q')
+        self._parameterized = None
+
+    def add(self, target: int, coef: float, parameter: int):
+        self.targets.append(target)
+        self.coefs.append(coef)
+        self.parameters.append(parameter)
+        self._parameterized = None
+
+    def bound(self, values: Sequence[float]) -> array:
+        if self._parameterized is None:
+            self._parameterized = [(pos, param) for pos, param in enumerate(self.parameters) if param >= 0]
+        data = array('d', self.coefs)
+        for pos, parameter in self._parameterized:
+            data[pos] *= values[parameter]
+        return data
+
+    def totals(self, size: int, values: Sequence[float]) -> array:
+        totals = array('d', bytes(8 * size))
+        for target, val in zip(self.targets, self.bound(values)):
+            totals[target] += val
+        return totals
+
+
+class CompiledTemplate:
+    """
+    The index layout of a template, shared by every instance. Only the coefficients that involve a parameter are
+    recomputed when a new set of values is bound.
+    """
+
+    def __init__(self, variable_names: List[str], parameters: List[str],
+                 objectives: List[Tuple[ObjectiveGoal, _Layout, _Layout]], indptr: array, rows: _Layout,
+                 signs: List[EqualitySigns], rhs: _Layout):
+        self.variable_names = variable_names
+        self.parameters = parameters
+        self._objectives = objectives
+        self._indptr = indptr
+        self._rows = rows
+        self._signs = signs
+        self._rhs = rhs
+
+    @property
+    def num_constraints(self) -> int:
+        return len(self._signs)
+
+    def instantiate(self, values: ParameterValues) -> MatrixProblem:
+        values = self._values(values)
+        matrix = MatrixProblem(list(self.variable_names))
+        for goal, layout, constant in self._objectives:
+            matrix.add_objective(goal, layout.targets, layout.bound(values), sum(constant.bound(values)))
+        # Copies of the shared index arrays, so an instance that gets rows appended can't alter the template.
+        matrix.rows = SparseRows(array('q', self._indptr), array('q', self._rows.targets), self._rows.bound(values))
+        matrix.signs = list(self._signs)
+        matrix.rhs = self._rhs.totals(self.num_constraints, values)
+        return matrix
+
+    def instantiate_many(self, value_sets: Iterable[ParameterValues]) -> Iterator[MatrixProblem]:
+        for values in value_sets:
+            yield self.instantiate(values)
+
+    def _values(self, values: ParameterValues) -> Sequence[float]:
+        if isinstance(values, dict):
+            missing = [name for name in self.parameters if name not in values]
+            if missing:
+                raise ValueError('No value for parameters {}'.format(', '.join(missing)))
+            return [values[name] for name in self.parameters]
+        if len(values) != len(self.parameters):
+            raise ValueError('Expected {} parameter values, got {}'.format(len(self.parameters), len(values)))
+        return values
+
+
+def _tokens(encoded: str) -> List[Tuple[Optional[str], Optional[str], Optional[str]]]:
+    tokens = list()
+    pos = 0
+    encoded = encoded.rstrip()
+    while pos < len(encoded):
+        match = _TOKEN.match(encoded, pos)
+        tokens.append(match.groups())
+        pos = match.end()
+    return tokens
@@ -5,6 +5,13 @@ class VariableType(Enum):
     INTEGER = 'integer'
     REAL = 'real'
 
+    @staticmethod
+    def from_val(val):
+        for vtype in VariableType:
+            if vtype.value == val.lower():
+                return vtype
+        return None
+
 
 class Variable:
 
@@ -63,7 +70,7 @@ class Term:
     def evaluate(self):
         if self.var is None:
             return self.coef
-        if not self.var.val:
+        if self.var.val is None:
             return None
         return self.var.val * self.coef
 
@@ -2,24 +2,95 @@ from typing import List, Set, Dict
 
 from systemssolver.modeling.equation import Constraint, Expression
 from systemssolver.modeling.objective import Objective
-from systemssolver.modeling.variables import Variable
+from systemssolver.modeling.variables import Variable, Term
 
 
 class Problem:
 
     def __init__(self):
-        self._objective_functions: List[Objective] = list()
-        self._constraints: List[Constraint] = list()
+        # Rows and objectives are keyed by a stable id so removals are O(1) and dirty ids stay valid.
+        self._objective_functions: Dict[int, Objective] = dict()
+        self._constraints: Dict[int, Constraint] = dict()
         self._variables: Dict[Variable, Variable] = dict()
+        self._ids: Dict[int, int] = dict()
+        self._next_id = 0
+
+        # Inverted index from a variable to the rows and objectives whose expressions reference it.
+        self._variable_rows: Dict[Variable, Set[int]] = dict()
+        self._variable_objectives: Dict[Variable, Set[int]] = dict()
+
+        self._dirty_rows: Set[int] = set()
+        self._removed_rows: Set[int] = set()
+        self._dirty_objectives: Set[int] = set()
+        self._version = 0
 
     def add_objective(self, obj: Objective):
+        obj_id = self._new_id(obj)
         self._update_variable(obj.expression)
-        self._objective_functions.append(obj)
+        self._update_quadratic(obj)
+        self._index(obj_id, self._variable_objectives, obj.expression, _quadratic_variables(obj))
+        self._objective_functions[obj_id] = obj
+        self._dirty_objectives.add(obj_id)
+        self._version += 1
 
     def add_constraint(self, obj: Constraint):
+        row_id = self._new_id(obj)
         self._update_variable(obj.right)
         self._update_variable(obj.left)
-        self._constraints.append(obj)
+        self._index(row_id, self._variable_rows, obj.left, obj.right)
+        self._constraints[row_id] = obj
+        self._dirty_rows.add(row_id)
+        self._version += 1
+
+    def remove_objective(self, obj: Objective) -> bool:
+        # Objectives and rows share one id space, only an objective's id may go here.
+        obj_id = self._ids.get(id(obj))
+        if obj_id not in self._objective_functions:
+            return False
+        del self._ids[id(obj)]
+        self._objective_functions.pop(obj_id)
+        self._unindex(obj_id, self._variable_objectives, obj.expression, _quadratic_variables(obj))
+        self._dirty_objectives.discard(obj_id)
+        self._version += 1
+        return True
+
+    def remove_constraint(self, obj: Constraint) -> bool:
+        row_id = self._ids.get(id(obj))
+        if row_id not in self._constraints:
+            return False
+        del self._ids[id(obj)]
+        self._constraints.pop(row_id)
+        self._unindex(row_id, self._variable_rows, obj.left, obj.right)
+        self._dirty_rows.discard(row_id)
+        self._removed_rows.add(row_id)
+        self._version += 1
+        return True
+
+    def _new_id(self, obj) -> int:
+        # A second id for the same object would orphan the first one, its row could never be removed.
+        if id(obj) in self._ids:
+            raise ValueError('Already in the problem: {}'.format(obj))
+        obj_id = self._next_id
+        self._next_id += 1
+        self._ids[id(obj)] = obj_id
+        return obj_id
+
+    def _index(self, obj_id: int, index: Dict[Variable, Set[int]], *expressions: Expression):
+        for expression in expressions:
+            for term in expression.terms:
+                if term.var is not None:
+                    index.setdefault(term.var, set()).add(obj_id)
+
+    def _unindex(self, obj_id: int, index: Dict[Variable, Set[int]], *expressions: Expression):
+        for expression in expressions:
+            for term in expression.terms:
+                if term.var is None or term.var not in index:
+                    continue
+                index[term.var].discard(obj_id)
+                if not index[term.var]:
+                    index.pop(term.var)
+                if term.var not in self._variable_rows and term.var not in self._variable_objectives:
+                    self._variables.pop(term.var, None)
 
     def _update_variable(self, expression: Expression):
         for term in expression.terms:
@@ -28,6 +99,13 @@ class Problem:
             elif term.var in self._variables:
                 term.var = self._variables[term.var]
 
+    def _update_quadratic(self, obj: Objective):
+        for term in obj.quadratic:
+            for var in (term.first, term.second):
+                if var not in self._variables:
+                    self._variables[var] = var
+            term.first, term.second = self._variables[term.first], self._variables[term.second]
+
     def set_variable(self, variable: Variable):
         must_update = variable in self._variables
         must_switch = False
@@ -36,34 +114,84 @@ class Problem:
             must_switch = old_var.is_inverted != variable.is_inverted
 
         self._variables[variable] = variable
-        if must_update:
-            for objective in self.objectives:
-                self._update_variable(objective.expression)
-            for constraint in self._constraints:
-                self._update_variable(constraint.left)
-                self._update_variable(constraint.right)
-
-        if must_switch:
-            for objective in self.objectives:
-                self._flip_terms(objective.expression, variable)
+        if not must_update:
+            return
 
-            for constraint in self._constraints:
+        # Only the rows and objectives that reference the variable need to be touched.
+        row_ids = self._variable_rows.get(variable, set())
+        objective_ids = self._variable_objectives.get(variable, set())
+        for obj_id in objective_ids:
+            objective = self._objective_functions[obj_id]
+            self._update_variable(objective.expression)
+            self._update_quadratic(objective)
+            if must_switch:
+                self._flip_terms(objective.expression, variable)
+                # A product changes sign with one of its factors, a square doesn't.
+                for term in objective.quadratic:
+                    if (term.first == variable) != (term.second == variable):
+                        term.coef *= -1
+        for row_id in row_ids:
+            constraint = self._constraints[row_id]
+            self._update_variable(constraint.left)
+            self._update_variable(constraint.right)
+            if must_switch:
                 self._flip_terms(constraint.left, variable)
                 self._flip_terms(constraint.right, variable)
 
+        self._dirty_rows.update(row_ids)
+        self._dirty_objectives.update(objective_ids)
+        self._version += 1
+
     def _flip_terms(self, expression: Expression, variable: Variable):
         for term in expression.terms:
             if term.var == variable:
                 term.coef *= -1
 
+    def rows_with(self, variable: Variable) -> List[Constraint]:
+        return [self._constraints[row_id] for row_id in sorted(self._variable_rows.get(variable, ()))]
+
+    def row_id(self, obj: Constraint) -> int:
+        row_id = self._ids[id(obj)]
+        if row_id not in self._constraints:
+            raise KeyError(row_id)
+        return row_id
+
+    @property
+    def version(self) -> int:
+        """ Incremented on every mutation, a cheap key for caches built from this problem. """
+        return self._version
+
+    @property
+    def dirty_rows(self) -> Set[int]:
+        """ Ids of rows added or edited since the last clear_dirty(). """
+        return set(self._dirty_rows)
+
+    @property
+    def removed_rows(self) -> Set[int]:
+        return set(self._removed_rows)
+
+    @property
+    def dirty_objectives(self) -> Set[int]:
+        return set(self._dirty_objectives)
+
+    def clear_dirty(self):
+        self._dirty_rows.clear()
+        self._removed_rows.clear()
+        self._dirty_objectives.clear()
+
     @property
     def objectives(self) -> List[Objective]:
-        return self._objective_functions
+        return list(self._objective_functions.values())
 
     @property
     def constraints(self) -> List[Constraint]:
-        return self._constraints
+        return list(self._constraints.values())
 
     @property
     def variables(self) -> Set[Variable]:
         return set(self._variables.keys())
+
+
+def _quadratic_variables(obj: Objective) -> Expression:
+    """ The variables of the objective's quadratic terms, as an expression the indexes can walk. """
+    return Expression([Term(var=var) for term in obj.quadratic for var in (term.first, term.second)])
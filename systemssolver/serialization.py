@@ -0,0 +1,260 @@
+"""
+Compact columnar binary format for problems and solutions.
+
+A problem file is a fixed header followed by 8-byte aligned little-endian sections: the variable table (name
+offsets, utf-8 names, type/inversion flags), the objectives as CSR vectors, then the constraint rows as CSR arrays,
+one sign byte per row and the right hand sides. Loading from a path maps the file and views the numeric sections in
+place, so no per-term Python objects are created.
+
+A solution file holds the names and values, then the objective values and the bound, all as doubles with NaN for
+None, and one byte each for the status and the flags. Fraction values, objective values or bound, from exact solves,
+are also written as "p/q" strings keyed by their position in that sequence of doubles. Version 1 solution files, which
+held the names and values only, still load.
+"""
+import mmap
+import struct
+import sys
+from array import array
+from fractions import Fraction
+from typing import List, Sequence, Tuple, Union
+
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem, SparseRows, MatrixObjective
+from systemssolver.modeling.objective import ObjectiveGoal
+from systemssolver.modeling.variables import VariableType
+from systemssolver.problem import Problem
+from systemssolver.solution import Solution, SolveStatus
+
+PROBLEM_MAGIC = b'SSLP'
+SOLUTION_MAGIC = b'SSSL'
+VERSION = 1
+SOLUTION_VERSION = 2
+
+_PROBLEM_HEADER = struct.Struct('<4sI6Q')
+_SOLUTION_HEADER_V1 = struct.Struct('<4sI2Q')
+_SOLUTION_HEADER = struct.Struct('<4sI5Q2B')
+
+_SIGNS = list(EqualitySigns)
+_GOALS = list(ObjectiveGoal)
+_INTEGER_FLAG = 1
+_INVERTED_FLAG = 2
+_STATUSES = list(SolveStatus)
+_FEASIBLE_FLAG = 1
+_OBJECTIVES_FLAG = 2
+
+
+class FormatError(RuntimeError):
+    pass
+
+
+class _Writer:
+
+    def __init__(self):
+        self.chunks: List[bytes] = list()
+        self.size = 0
+
+    def write(self, data: bytes):
+        self.chunks.append(data)
+        self.size += len(data)
+        padding = -self.size % 8
+        if padding:
+            self.chunks.append(bytes(padding))
+            self.size += padding
+
+    def getvalue(self) -> bytes:
+        return b''.join(self.chunks)
+
+
+class _Reader:
+
+    def __init__(self, buffer, offset: int):
+        self.view = memoryview(buffer)
+        self.offset = offset
+
+    def take(self, typecode: str, count: int) -> Sequence:
+        size = count * array(typecode).itemsize
+        chunk = self.view[self.offset:self.offset + size]
+        self.offset += size + (-size % 8)
+        if sys.byteorder == 'little':
+            return chunk.cast(typecode)
+        values = array(typecode, chunk.tobytes())
+        values.byteswap()
+        return values
+
+    def take_bytes(self, count: int) -> bytes:
+        chunk = self.view[self.offset:self.offset + count].tobytes()
+        self.offset += count + (-count % 8)
+        return chunk
+
+
+def _packed(typecode: str, values) -> bytes:
+    packed = values if isinstance(values, array) and values.typecode == typecode else array(typecode, values)
+    if sys.byteorder != 'little':
+        packed = array(typecode, packed)
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _write_names(writer: _Writer, names: Sequence[str]):
+    encoded = [name.encode('utf-8') for name in names]
+    offsets = [0]
+    for name in encoded:
+        offsets.append(offsets[-1] + len(name))
+    writer.write(_packed('q', offsets))
+    writer.write(b''.join(encoded))
+    return offsets[-1]
+
+
+def _read_names(reader: _Reader, count: int, names_size: int) -> List[str]:
+    offsets = reader.take('q', count + 1)
+    blob = reader.take_bytes(names_size)
+    return [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(count)]
+
+
+def dumps_problem(problem: Union[Problem, MatrixProblem]) -> bytes:
+    matrix = MatrixProblem.from_problem(problem)
+    if not matrix.is_linear:
+        raise ValueError('The binary problem format has no quadratic objectives')
+    objective_nnz = sum(len(objective.indices) for objective in matrix.objectives)
+    names_size = sum(len(name.encode('utf-8')) for name in matrix.variable_names)
+
+    writer = _Writer()
+    writer.write(_PROBLEM_HEADER.pack(
+        PROBLEM_MAGIC, VERSION, matrix.num_variables, matrix.num_constraints, matrix.rows.nnz,
+        len(matrix.objectives), objective_nnz, names_size))
+
+    _write_names(writer, matrix.variable_names)
+    writer.write(bytes(
+        (_INTEGER_FLAG if vtype == VariableType.INTEGER else 0) | (_INVERTED_FLAG if inverted else 0)
+        for vtype, inverted in zip(matrix.variable_types, matrix.inverted)))
+
+    objective_indptr = [0]
+    for objective in matrix.objectives:
+        objective_indptr.append(objective_indptr[-1] + len(objective.indices))
+    writer.write(bytes(_GOALS.index(objective.goal) for objective in matrix.objectives))
+    writer.write(_packed('d', [objective.constant for objective in matrix.objectives]))
+    writer.write(_packed('q', objective_indptr))
+    writer.write(b''.join(_packed('q', objective.indices) for objective in matrix.objectives))
+    writer.write(b''.join(_packed('d', objective.coefs) for objective in matrix.objectives))
+
+    writer.write(_packed('q', matrix.rows.indptr))
+    writer.write(_packed('q', matrix.rows.indices))
+    writer.write(_packed('d', matrix.rows.data))
+    writer.write(bytes(_SIGNS.index(sign) for sign in matrix.signs))
+    writer.write(_packed('d', matrix.rhs))
+    return writer.getvalue()
+
+
+def loads_problem(buffer) -> MatrixProblem:
+    """ Reads a problem from bytes, a bytearray, an mmap or any other buffer. Numeric sections stay views into it. """
+    if len(buffer) < _PROBLEM_HEADER.size:
+        raise FormatError('Truncated problem header')
+    magic, version, num_vars, num_rows, nnz, num_objectives, objective_nnz, names_size = \
+        _PROBLEM_HEADER.unpack_from(buffer, 0)
+    _check_header(magic, version, PROBLEM_MAGIC)
+
+    reader = _Reader(buffer, _PROBLEM_HEADER.size + (-_PROBLEM_HEADER.size % 8))
+    names = _read_names(reader, num_vars, names_size)
+    flags = reader.take_bytes(num_vars)
+    matrix = MatrixProblem(
+        names,
+        [VariableType.INTEGER if flag & _INTEGER_FLAG else VariableType.REAL for flag in flags],
+        [bool(flag & _INVERTED_FLAG) for flag in flags])
+
+    goals = reader.take_bytes(num_objectives)
+    constants = reader.take('d', num_objectives)
+    objective_indptr = reader.take('q', num_objectives + 1)
+    objective_indices = reader.take('q', objective_nnz)
+    objective_coefs = reader.take('d', objective_nnz)
+    for idx in range(num_objectives):
+        start, end = objective_indptr[idx], objective_indptr[idx + 1]
+        matrix.objectives.append(MatrixObjective(
+            _GOALS[goals[idx]], objective_indices[start:end], objective_coefs[start:end], constants[idx]))
+
+    matrix.rows = SparseRows(reader.take('q', num_rows + 1), reader.take('q', nnz), reader.take('d', nnz))
+    matrix.signs = [_SIGNS[sign] for sign in reader.take_bytes(num_rows)]
+    matrix.rhs = reader.take('d', num_rows)
+    return matrix
+
+
+def dump_problem(problem: Union[Problem, MatrixProblem], path: str):
+    with open(path, 'wb') as f:
+        f.write(dumps_problem(problem))
+
+
+def load_problem(path: str, use_mmap=True) -> MatrixProblem:
+    with open(path, 'rb') as f:
+        if not use_mmap:
+            return loads_problem(f.read())
+        # The views handed out by loads_problem keep the mapping alive after the file is closed.
+        return loads_problem(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def dumps_solution(solution: Solution) -> bytes:
+    names, values = _solution_columns(solution)
+    names_size = sum(len(name.encode('utf-8')) for name in names)
+    objective_values = list(solution.objective_values) if solution.objective_values is not None else list()
+    scalars = list(values) + objective_values + [solution.bound]
+    exact = [(idx, val) for idx, val in enumerate(scalars) if isinstance(val, Fraction)]
+    exact_strings = ['{}/{}'.format(val.numerator, val.denominator) for _, val in exact]
+    flags = (_FEASIBLE_FLAG if solution.feasible else 0) | \
+        (_OBJECTIVES_FLAG if solution.objective_values is not None else 0)
+
+    writer = _Writer()
+    writer.write(_SOLUTION_HEADER.pack(
+        SOLUTION_MAGIC, SOLUTION_VERSION, len(names), names_size, len(objective_values), len(exact),
+        sum(len(string) for string in exact_strings), _STATUSES.index(solution.status), flags))
+    _write_names(writer, names)
+    writer.write(_packed('d', [float('nan') if val is None else val for val in scalars]))
+    writer.write(_packed('q', [idx for idx, _ in exact]))
+    _write_names(writer, exact_strings)
+    return writer.getvalue()
+
+
+def loads_solution(buffer) -> Solution:
+    if len(buffer) < _SOLUTION_HEADER_V1.size:
+        raise FormatError('Truncated solution header')
+    magic, version = struct.unpack_from('<4sI', buffer, 0)
+    _check_header(magic, version, SOLUTION_MAGIC, SOLUTION_VERSION)
+    if version == 1:
+        _, _, count, names_size = _SOLUTION_HEADER_V1.unpack_from(buffer, 0)
+        reader = _Reader(buffer, _SOLUTION_HEADER_V1.size + (-_SOLUTION_HEADER_V1.size % 8))
+        names = _read_names(reader, count, names_size)
+        values = reader.take('d', count)
+        return Solution(names, [None if val != val else val for val in values])
+
+    if len(buffer) < _SOLUTION_HEADER.size:
+        raise FormatError('Truncated solution header')
+    _, _, count, names_size, num_objectives, num_exact, exact_size, status, flags = \
+        _SOLUTION_HEADER.unpack_from(buffer, 0)
+    reader = _Reader(buffer, _SOLUTION_HEADER.size + (-_SOLUTION_HEADER.size % 8))
+    names = _read_names(reader, count, names_size)
+    scalars = [None if val != val else val for val in reader.take('d', count + num_objectives + 1)]
+    exact_indices = reader.take('q', num_exact)
+    for idx, string in zip(exact_indices, _read_names(reader, num_exact, exact_size)):
+        scalars[idx] = Fraction(string)
+    objective_values = scalars[count:count + num_objectives] if flags & _OBJECTIVES_FLAG else None
+    return Solution(names, scalars[:count], objective_values=objective_values, status=_STATUSES[status],
+                    feasible=bool(flags & _FEASIBLE_FLAG), bound=scalars[-1])
+
+
+def dump_solution(solution: Solution, path: str):
+    with open(path, 'wb') as f:
+        f.write(dumps_solution(solution))
+
+
+def load_solution(path: str) -> Solution:
+    with open(path, 'rb') as f:
+        return loads_solution(f.read())
+
+
+def _solution_columns(solution: Solution) -> Tuple[List[str], List]:
+    items = sorted(solution.items())
+    return [name for name, _ in items], [val for _, val in items]
+
+
+def _check_header(magic: bytes, version: int, expected_magic: bytes, latest=VERSION):
+    if magic != expected_magic:
+        raise FormatError('Not a {} file'.format(expected_magic.decode('ascii')))
+    if version > latest:
+        raise FormatError('Unsupported format version {}'.format(version))
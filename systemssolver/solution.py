@@ -1,24 +1,107 @@
-from typing import Set
+from array import array
+from enum import Enum
+from typing import Set, Sequence, Dict, Iterable
 
 from systemssolver.modeling.variables import Variable
 
 
+class SolveStatus(Enum):
+    OPTIMAL = 'optimal'
+    ITERATION_LIMIT = 'iteration_limit'
+    TIME_LIMIT = 'time_limit'
+    MEMORY_LIMIT = 'memory_limit'
+    CANCELLED = 'cancelled'
+
+    @staticmethod
+    def from_val(val):
+        for status in SolveStatus:
+            if status.value == val.lower():
+                return status
+        return None
+
+
 class Solution:
-    def __init__(self, variables: Set[Variable]):
-        self.variables = variables
+    """
+    Values of a solve, held by the solution itself rather than written into the model's Variable objects, so any
+    number of solves can share one read-only Problem. Values are looked up by variable name.
+
+    A solve stopped by a limit reports why in status. Its values are then the best feasible point found, or the point
+    it stopped at with feasible False if it never reached one, and bound is the best known bound on the optimum, if any.
+    """
+
+    def __init__(self, names: Sequence[str], values: Sequence, stats=None, objective_values=None,
+                 status: SolveStatus = SolveStatus.OPTIMAL, feasible=True, bound=None):
+        if len(names) != len(values):
+            raise ValueError('Expected {} values, got {}'.format(len(names), len(values)))
+        self._names = tuple(names)
+        self._values = _compact(values)
+        self._index = {name: idx for idx, name in enumerate(self._names)}
+        self.stats = stats
+        self.objective_values = objective_values
+        self.status = status
+        self.feasible = feasible
+        self.bound = bound
+
+    @staticmethod
+    def from_variables(variables: Iterable[Variable], **kwargs) -> 'Solution':
+        variables = list(variables)
+        return Solution([var.name for var in variables], [var.val for var in variables], **kwargs)
+
+    @property
+    def is_optimal(self) -> bool:
+        return self.status == SolveStatus.OPTIMAL
+
+    @property
+    def names(self) -> Sequence[str]:
+        return self._names
+
+    @property
+    def values(self) -> Sequence:
+        return self._values
+
+    @property
+    def index(self) -> Dict[str, int]:
+        return dict(self._index)
+
+    @property
+    def variables(self) -> Set[Variable]:
+        """ Fresh Variable objects carrying the values, safe for the caller to modify. """
+        return {Variable(name=name, val=val) for name, val in zip(self._names, self._values)}
+
+    def get(self, name: str, default=None):
+        idx = self._index.get(name)
+        return default if idx is None else self._values[idx]
+
+    def items(self):
+        return zip(self._names, self._values)
+
+    def as_dict(self) -> Dict[str, object]:
+        return dict(self.items())
+
+    def __getitem__(self, name: str):
+        return self._values[self._index[name]]
+
+    def __contains__(self, name: str):
+        return name in self._index
+
+    def __len__(self):
+        return len(self._names)
 
     def __str__(self):
-        return ', '.join('{}={}'.format(var.name, var.val) for var in self.variables)
+        return ', '.join('{}={}'.format(name, val) for name, val in self.items())
 
     def __neg__(self):
-        for var in self.variables:
-            var.val = -var.val
-        return self
+        return Solution(self._names, [-val for val in self._values], self.stats, self.objective_values, self.status,
+                        self.feasible, None if self.bound is None else -self.bound)
 
     def __eq__(self, other):
         if not isinstance(other, Solution):
             return False
+        return self.as_dict() == other.as_dict()
+
 
-        name_vals = {var.name: var.val for var in self.variables}
-        other_name_vals = {var.name: var.val for var in other.variables}
-        return name_vals == other_name_vals
+def _compact(values: Sequence):
+    # Plain floats pack into a double array, anything else (None, Fraction) keeps its type in a tuple.
+    if all(isinstance(val, (int, float)) for val in values):
+        return array('d', values)
+    return tuple(values)
@@ -1,14 +1,73 @@
+from typing import Callable, Iterable, List
+
+from systemssolver.modeling.equation import Constraint
 from systemssolver.solution import Solution
+from systemssolver.tracing.stats import SolveStats
 
 
 class TracingHook:
+    # Solvers only build intermediate solutions and stats for hooks that ask for them, and only ask for lazy
+    # constraints from hooks that separate rows.
+    traces_solutions = True
+    collects_stats = False
+    separates_rows = False
 
     def step(self, solution: Solution):
         pass
 
+    def report(self, stats: SolveStats):
+        pass
+
+    def separate(self, solution: Solution) -> List[Constraint]:
+        """
+        Called at every optimum the solver reaches with the point it found. Constraints returned that the point
+        violates are added to the live tableau, which is re-optimized from its current basis; the solve ends once
+        none are returned.
+        """
+        return list()
+
 
 class PrintSolutionHook(TracingHook):
 
     def step(self, solution: Solution):
         print(str(solution))
         return True
+
+
+class StatsHook(TracingHook):
+    traces_solutions = False
+    collects_stats = True
+
+    def __init__(self):
+        self.reports = list()
+
+    def step(self, solution: Solution):
+        return True
+
+    def report(self, stats: SolveStats):
+        self.reports.append(stats)
+
+    @property
+    def last_report(self) -> SolveStats:
+        return self.reports[-1] if self.reports else None
+
+    def aggregate(self) -> SolveStats:
+        total = SolveStats()
+        for stats in self.reports:
+            total.merge(stats)
+        return total
+
+
+class LazyConstraintHook(StatsHook):
+    """
+    Separates rows with a plain function from the current solution to the constraints it violates, keeping the
+    stats of every solve like StatsHook.
+    """
+    separates_rows = True
+
+    def __init__(self, separator: Callable[[Solution], Iterable[Constraint]]):
+        super().__init__()
+        self.separator = separator
+
+    def separate(self, solution: Solution) -> List[Constraint]:
+        return list(self.separator(solution))
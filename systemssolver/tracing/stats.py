@@ -0,0 +1,129 @@
+import json
+import time
+from enum import Enum
+from typing import Dict
+
+
+class Phase(Enum):
+    STANDARDIZATION = 'standardization'
+    SLACK_INSERTION = 'slack_insertion'
+    TABLEAU_BUILD = 'tableau_build'
+    PRICING = 'pricing'
+    RATIO_TEST = 'ratio_test'
+    PIVOT = 'pivot'
+    EXTRACTION = 'extraction'
+
+
+class PhaseTimer:
+
+    def __init__(self, stats, phase: Phase):
+        self._stats, self._phase = stats, phase
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stats.add_time(self._phase, time.perf_counter() - self._start)
+        return False
+
+
+class SolveStats:
+
+    def __init__(self):
+        self._counters: Dict[str, int] = dict()
+        self._timings: Dict[Phase, float] = dict()
+        self._calls: Dict[Phase, int] = dict()
+
+    @property
+    def enabled(self) -> bool:
+        return True
+
+    def increment(self, counter: str, amount=1):
+        self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def timer(self, phase: Phase) -> PhaseTimer:
+        return PhaseTimer(self, phase)
+
+    def add_time(self, phase: Phase, seconds: float):
+        self._timings[phase] = self._timings.get(phase, 0.0) + seconds
+        self._calls[phase] = self._calls.get(phase, 0) + 1
+
+    def counter(self, counter: str) -> int:
+        return self._counters.get(counter, 0)
+
+    def timing(self, phase: Phase) -> float:
+        return self._timings.get(phase, 0.0)
+
+    @property
+    def total_time(self) -> float:
+        return sum(self._timings.values())
+
+    def merge(self, other: 'SolveStats'):
+        for counter, val in other._counters.items():
+            self.increment(counter, val)
+        for phase, seconds in other._timings.items():
+            self._timings[phase] = self._timings.get(phase, 0.0) + seconds
+            self._calls[phase] = self._calls.get(phase, 0) + other._calls[phase]
+        return self
+
+    def to_dict(self) -> Dict:
+        return {
+            'counters': dict(self._counters),
+            'timings': {
+                phase.value: {'seconds': seconds, 'calls': self._calls[phase]}
+                for phase, seconds in self._timings.items()
+            },
+            'total_seconds': self.total_time
+        }
+
+    @staticmethod
+    def from_dict(data: Dict) -> 'SolveStats':
+        """ The stats of a to_dict result, e.g. sent over the wire by a worker. """
+        stats = SolveStats()
+        stats._counters.update(data['counters'])
+        for phase, timing in data['timings'].items():
+            stats._timings[Phase(phase)] = timing['seconds']
+            stats._calls[Phase(phase)] = timing['calls']
+        return stats
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), sort_keys=True)
+
+    def __str__(self):
+        lines = ['{}: {}'.format(counter, val) for counter, val in sorted(self._counters.items())]
+        for phase in Phase:
+            if phase in self._timings:
+                lines.append('{}: {:.6f}s ({} calls)'.format(phase.value, self._timings[phase], self._calls[phase]))
+        return '\n'.join(lines)
+
+
+class _NullTimer:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class NullStats(SolveStats):
+
+    _TIMER = _NullTimer()
+
+    @property
+    def enabled(self) -> bool:
+        return False
+
+    def increment(self, counter: str, amount=1):
+        pass
+
+    def timer(self, phase: Phase):
+        return self._TIMER
+
+    def add_time(self, phase: Phase, seconds: float):
+        pass
+
+
+NULL_STATS = NullStats()
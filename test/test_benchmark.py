@@ -0,0 +1,55 @@
+import unittest
+
+from systemssolver.benchmark import generators
+from systemssolver.benchmark.harness import BenchmarkRunner, BenchmarkCase, Baseline
+from systemssolver.methods.factory import SolverMethods
+
+
+class GeneratorsTest(unittest.TestCase):
+
+    def test_reproducible(self):
+        first = generators.random_sparse(5, 8, density=0.3, seed=7)
+        second = generators.random_sparse(5, 8, density=0.3, seed=7)
+        self.assertEqual([str(c) for c in first.constraints], [str(c) for c in second.constraints])
+
+    def test_sizes(self):
+        self.assertEqual(5, len(generators.transportation(2, 3).constraints))
+        self.assertEqual(6, len(generators.assignment(3).constraints))
+        self.assertEqual(4, len(generators.klee_minty(4).constraints))
+        self.assertEqual(9, len(generators.knapsack(8).constraints))
+
+    def test_klee_minty_optimum(self):
+        solution = SolverMethods.SIMPLEX.get_solver().solve(generators.klee_minty(3))
+        vals = {var.name: var.val for var in solution.variables}
+        self.assertEqual(125, vals['z'])
+
+
+class HarnessTest(unittest.TestCase):
+
+    def test_run_and_compare(self):
+        runner = BenchmarkRunner([BenchmarkCase('km', lambda: generators.klee_minty(3))], repeat=1)
+        results = runner.run()
+        # Methods that can't take the case, like the linear system solver, are skipped.
+        self.assertEqual([SolverMethods.SIMPLEX.value, SolverMethods.MULTI_OBJECTIVE.value],
+                         [result.method for result in results])
+        self.assertIsNone(results[0].error)
+        self.assertEqual(7, results[0].iterations)
+
+        baseline = Baseline.from_results(results)
+        self.assertEqual([], baseline.compare(results))
+
+        results[0].iterations += 1
+        self.assertEqual(['km/simplex: iterations 7 -> 8'], baseline.compare(results))
+
+    def test_objective_and_feasibility(self):
+        runner = BenchmarkRunner([BenchmarkCase('km', lambda: generators.klee_minty(3))],
+                                 methods=[SolverMethods.MULTI_OBJECTIVE], repeat=1)
+        results = runner.run()
+        self.assertEqual(125, results[0].objective)
+        self.assertTrue(results[0].feasible)
+        baseline = Baseline.from_results(results)
+
+        results[0].objective = 100
+        self.assertEqual(['km/multiobjective: objective 125 -> 100'], baseline.compare(results))
+        results[0].objective, results[0].feasible = 125, False
+        self.assertEqual(['km/multiobjective: no longer feasible'], baseline.compare(results))
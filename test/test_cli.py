@@ -0,0 +1,90 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+
+from systemssolver import cli
+from systemssolver.benchmark import generators
+from systemssolver.methods.simplex import SimplexSolver
+from systemssolver.modeling.document import problem_to_dict, problem_from_dict
+from systemssolver.modeling.equation import Constraint, EqualitySigns, Expression
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.modeling.objective import Objective, ObjectiveGoal
+from systemssolver.modeling.variables import Term, Variable
+from systemssolver.problem import Problem
+from systemssolver.serialization import dump_problem
+
+
+class CliTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(problem_to_dict(generators.klee_minty(3)), f)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def _run(self, *argv):
+        out = io.StringIO()
+        with redirect_stdout(out), self.assertRaises(SystemExit) as context:
+            cli.main(list(argv))
+        return context.exception.code, out.getvalue()
+
+    def test_document_round_trip(self):
+        expected = SimplexSolver().solve(generators.klee_minty(3))
+        with open(self.path) as f:
+            self.assertEqual(expected, SimplexSolver().solve(problem_from_dict(json.load(f))))
+
+    def test_document_keeps_tiny_and_huge_coefficients(self):
+        x, y = Variable(name='x0'), Variable(name='y')
+        problem = Problem()
+        problem.add_objective(Objective(expression=Expression([Term(coef=1e-5, var=x), Term(coef=-1e20, var=y)]),
+                                        goal=ObjectiveGoal.MAXIMIZE))
+        problem.add_constraint(Constraint(left=Expression([Term(coef=1e20, var=x), Term(coef=2.5e-7, var=y)]),
+                                          right=Expression([Term(coef=1e-5)]), sign=EqualitySigns.LE))
+
+        loaded = MatrixProblem.from_problem(problem_from_dict(json.loads(json.dumps(problem_to_dict(problem)))))
+        self.assertEqual(['x0', 'y'], loaded.variable_names)
+        self.assertEqual([1e-5, -1e20], list(loaded.objectives[0].coefs))
+        self.assertEqual([1e20, 2.5e-7], list(loaded.rows.row(0)[1]))
+        self.assertEqual([1e-5], list(loaded.rhs))
+
+    def test_solve(self):
+        code, output = self._run('solve', self.path, '--json')
+        self.assertEqual(0, code)
+        self.assertEqual(125, json.loads(output)['vars']['z'])
+
+    def test_solve_binary(self):
+        fd, path = tempfile.mkstemp(suffix='.sslp')
+        os.close(fd)
+        try:
+            dump_problem(generators.klee_minty(3), path)
+            code, output = self._run('solve', path, '--json', '--max-iterations', '1')
+        finally:
+            os.remove(path)
+        self.assertEqual(0, code)
+        self.assertEqual('iteration_limit', json.loads(output)['status'])
+
+    def test_rejects_unsupported_options(self):
+        err = io.StringIO()
+        with redirect_stderr(err):
+            code, output = self._run('solve', self.path, '--method', 'linear', '--time-limit', '1')
+        self.assertEqual(2, code)
+        self.assertIn('limits', err.getvalue())
+        with redirect_stderr(io.StringIO()):
+            self.assertEqual(2, self._run('solve', self.path, '--method', 'integer', '--crash', 'triangular')[0])
+
+    def test_solve_does_not_import_web_stack(self):
+        script = 'import sys; from systemssolver.cli import load_model; print("flask" in sys.modules)'
+        output = subprocess.run([sys.executable, '-c', script], stdout=subprocess.PIPE, universal_newlines=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+        self.assertEqual('False', output.strip())
+
+
+if __name__ == '__main__':
+    unittest.main()
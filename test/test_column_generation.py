@@ -0,0 +1,122 @@
+import math
+import unittest
+from itertools import product
+
+from systemssolver.methods.column_generation import ColumnGenerationSolver, Column, MasterDuals
+from systemssolver.methods.multiobjective import MultiObjectiveSolver
+from systemssolver.methods.limits import SolveLimits
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.modeling.objective import ObjectiveGoal
+from systemssolver.modeling.variables import VariableType
+from systemssolver.solution import SolveStatus
+from systemssolver.tracing.hook import StatsHook
+from systemssolver.tracing.stats import Phase
+
+ROLL = 20
+WIDTHS = [3, 5, 7, 9]
+DEMANDS = [25, 20, 18, 10]
+
+
+def _cutting_stock(patterns, vtype=VariableType.REAL):
+    """ min rolls cut s.t. every width is cut at least its demand, over the given patterns. """
+    matrix = MatrixProblem(['p{}'.format(idx) for idx in range(len(patterns))], [vtype] * len(patterns))
+    matrix.add_objective(ObjectiveGoal.MINIMIZE, range(len(patterns)), [1] * len(patterns))
+    for item, demand in enumerate(DEMANDS):
+        cols = [idx for idx, pattern in enumerate(patterns) if pattern[item]]
+        matrix.add_row(cols, [patterns[idx][item] for idx in cols], EqualitySigns.GE, demand)
+    return matrix
+
+
+def _best_pattern(values):
+    """ Unbounded knapsack over the roll: the pattern of greatest total dual value. """
+    best = [(0.0, [0] * len(WIDTHS)) for _ in range(ROLL + 1)]
+    for width in range(1, ROLL + 1):
+        best[width] = best[width - 1]
+        for item, item_width in enumerate(WIDTHS):
+            if item_width <= width:
+                val, pattern = best[width - item_width]
+                if val + values[item] > best[width][0]:
+                    best[width] = (val + values[item], [count + (idx == item) for idx, count in enumerate(pattern)])
+    return best[ROLL][1]
+
+
+class ColumnGenerationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.initial = [[ROLL // width if idx == item else 0 for idx in range(len(WIDTHS))]
+                        for item, width in enumerate(WIDTHS)]
+
+    def price(self, duals: MasterDuals):
+        pattern = _best_pattern(duals.values)
+        return [Column('g{}'.format(duals.round), 1, {item: count for item, count in enumerate(pattern) if count})]
+
+    def test_cutting_stock(self):
+        hook = StatsHook()
+        solution = ColumnGenerationSolver(self.price).solve(_cutting_stock(self.initial), hook)
+
+        every_pattern = [list(counts) for counts in product(*[range(ROLL // width + 1) for width in WIDTHS])
+                         if 0 < sum(count * width for count, width in zip(counts, WIDTHS)) <= ROLL]
+        expected = MultiObjectiveSolver().solve(_cutting_stock(every_pattern))
+        self.assertAlmostEqual(expected.objective_values[0], solution.objective_values[0])
+
+        # One report per round, the last finding no improving column.
+        self.assertGreater(len(hook.reports), 1)
+        self.assertEqual(0, hook.last_report.counter('columns_generated'))
+        total = solution.stats
+        self.assertEqual(len(hook.reports), total.counter('pricing_rounds'))
+        self.assertEqual(len(hook.reports) - 1, total.counter('columns_generated'))
+        self.assertEqual(hook.aggregate().counter('pivots'), total.counter('pivots'))
+        self.assertGreater(total.timing(Phase.PRICING), 0)
+
+    def test_integer_master(self):
+        # Priced at the root, then branched on over every column found: a whole number of rolls cuts every demand.
+        relaxation = ColumnGenerationSolver(self.price).solve(_cutting_stock(self.initial))
+        patterns = {'p{}'.format(idx): dict(enumerate(pattern)) for idx, pattern in enumerate(self.initial)}
+
+        def price(duals: MasterDuals):
+            columns = [Column(column.name, column.cost, column.coefs, VariableType.INTEGER)
+                       for column in self.price(duals)]
+            patterns.update((column.name, column.coefs) for column in columns)
+            return columns
+        hook = StatsHook()
+        solution = ColumnGenerationSolver(price).solve(_cutting_stock(self.initial, VariableType.INTEGER), hook)
+
+        self.assertEqual(SolveStatus.OPTIMAL, solution.status)
+        self.assertTrue(solution.feasible)
+        rolls = {name: solution[name] for name in patterns if name in solution}
+        for val in rolls.values():
+            self.assertAlmostEqual(round(val), val)
+        self.assertAlmostEqual(sum(rolls.values()), solution.objective_values[0])
+        self.assertGreaterEqual(solution.objective_values[0], math.ceil(relaxation.objective_values[0] - 1e-6))
+        for item, demand in enumerate(DEMANDS):
+            cut = sum(val * patterns[name].get(item, 0) for name, val in rolls.items())
+            self.assertGreaterEqual(cut + 1e-6, demand)
+        # The branch and bound reports once more, after the pricing rounds.
+        self.assertEqual(len(hook.reports) - 1, solution.stats.counter('pricing_rounds'))
+
+    def test_duals(self):
+        # min x + y s.t. x + 2y >= 4, x <= 3: only the first row binds, at a price of 1/2 per unit of demand.
+        matrix = MatrixProblem(['x', 'y'])
+        matrix.add_objective(ObjectiveGoal.MINIMIZE, [0, 1], [1, 1])
+        matrix.add_row([0, 1], [1, 2], EqualitySigns.GE, 4)
+        matrix.add_row([0], [1], EqualitySigns.LE, 3)
+        seen = list()
+        ColumnGenerationSolver(lambda duals: seen.append(duals.values) or []).solve(matrix)
+        self.assertEqual([[0.5, 0]], seen)
+
+    def test_rejects_non_improving_and_duplicate_columns(self):
+        master = _cutting_stock(self.initial)
+        solution = ColumnGenerationSolver(lambda duals: [Column('waste', 1, {0: 1})]).solve(master)
+        self.assertNotIn('waste', solution)
+        with self.assertRaises(ValueError):
+            ColumnGenerationSolver(lambda duals: [Column('p0', 1, {0: 10, 1: 10})]).solve(master)
+
+    def test_limits(self):
+        limits = SolveLimits(max_iterations=2)
+        solution = ColumnGenerationSolver(self.price, limits=limits).solve(_cutting_stock(self.initial))
+        self.assertEqual(SolveStatus.ITERATION_LIMIT, solution.status)
+
+
+if __name__ == '__main__':
+    unittest.main()
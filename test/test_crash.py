@@ -0,0 +1,77 @@
+import unittest
+
+from systemssolver.benchmark import generators
+from systemssolver.methods.crash import CrashMode, crash_basis
+from systemssolver.methods.limits import SolveLimits
+from systemssolver.methods.multiobjective import MultiObjectiveSolver
+from systemssolver.methods.simplex import SimplexSolver
+from systemssolver.methods.standard import build_tableau, maximization_costs
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.modeling.objective import ObjectiveGoal
+from systemssolver.solution import SolveStatus
+from systemssolver.tracing.hook import StatsHook
+
+
+def _staircase() -> MatrixProblem:
+    # max x + y + w s.t. x <= 1, x + y <= 3, x + y + w <= 6.
+    matrix = MatrixProblem(['x', 'y', 'w'])
+    matrix.add_objective(ObjectiveGoal.MAXIMIZE, [0, 1, 2], [1, 1, 1])
+    matrix.add_row([0], [1], EqualitySigns.LE, 1)
+    matrix.add_row([0, 1], [1, 1], EqualitySigns.LE, 3)
+    matrix.add_row([0, 1, 2], [1, 1, 1], EqualitySigns.LE, 6)
+    return matrix
+
+
+class CrashTest(unittest.TestCase):
+
+    def test_triangular_basis(self):
+        matrix = _staircase()
+        costs, constant = maximization_costs(matrix.objectives[0])
+        tableau = build_tableau(matrix, costs, constant)
+        # Each column in turn is the only one left in a row: w takes the last, then y and x the others.
+        self.assertEqual(3, crash_basis(tableau, CrashMode.TRIANGULAR))
+        self.assertEqual([0, 1, 2], tableau.basic_variables)
+        self.assertEqual([1, 2, 3], tableau.rhs)
+
+        tableau = build_tableau(matrix, costs, constant)
+        self.assertEqual(0, crash_basis(tableau, CrashMode.SLACK))
+        self.assertEqual(tableau.row_slacks, tableau.basic_variables)
+
+    def test_crash_cuts_iterations(self):
+        problem = generators.klee_minty(6)
+        slack = StatsHook()
+        expected = SimplexSolver().solve(problem, slack)['z']
+        for mode in (CrashMode.TRIANGULAR, CrashMode.FEASIBLE):
+            with self.subTest(mode=mode):
+                crashed = StatsHook()
+                self.assertAlmostEqual(expected, SimplexSolver(crash=mode).solve(problem, crashed)['z'])
+                stats = crashed.last_report
+                self.assertGreater(stats.counter('crash_pivots'), 0)
+                self.assertLess(stats.counter('crash_pivots') + stats.counter('crash_repair_pivots') +
+                                stats.counter('iterations'), slack.last_report.counter('iterations'))
+
+    def test_crashed_solves_reach_the_optimum(self):
+        for problem in (generators.random_sparse(20, 40, density=0.2, seed=1),
+                        generators.block_diagonal(3, 4, 5, 2), generators.transportation(4, 5)):
+            expected = MultiObjectiveSolver().solve(problem)['z']
+            for mode in (CrashMode.TRIANGULAR, CrashMode.FEASIBLE):
+                with self.subTest(mode=mode):
+                    hook = StatsHook()
+                    solution = SimplexSolver(crash=mode).solve(problem, hook)
+                    self.assertAlmostEqual(expected, solution['z'])
+                    if mode == CrashMode.FEASIBLE and all(c.sign == EqualitySigns.LE for c in problem.constraints):
+                        self.assertEqual(0, hook.last_report.counter('crash_repair_pivots'))
+
+    def test_limits(self):
+        solution = SimplexSolver(crash=CrashMode.FEASIBLE, limits=SolveLimits(max_iterations=1)).solve(
+            generators.klee_minty(6))
+        self.assertEqual(SolveStatus.ITERATION_LIMIT, solution.status)
+
+    def test_from_val(self):
+        self.assertEqual(CrashMode.TRIANGULAR, CrashMode.from_val('Triangular'))
+        self.assertIsNone(CrashMode.from_val('bixby'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+
+from systemssolver.benchmark import generators
+from systemssolver.methods.decomposition import DecompositionSolver, detect_blocks, blocks_from_labels
+from systemssolver.methods.factory import SolverMethods
+from systemssolver.methods.multiobjective import MultiObjectiveSolver
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.modeling.objective import ObjectiveGoal
+from systemssolver.tracing.hook import StatsHook
+
+
+class DetectionTest(unittest.TestCase):
+
+    def test_linking_rows(self):
+        structure = detect_blocks(generators.block_diagonal(4, 3, 5, 2, seed=6))
+        self.assertEqual(4, structure.num_blocks)
+        self.assertEqual([12, 13], structure.linking_rows)
+        self.assertEqual([], structure.free_columns)
+
+    def test_no_blocks(self):
+        self.assertIsNone(detect_blocks(generators.klee_minty(4)))
+        self.assertFalse(DecompositionSolver(processes=1).can_solve(generators.klee_minty(4)))
+
+    def test_labels(self):
+        problem = generators.block_diagonal(2, 2, 3, 1, seed=1)
+        structure = blocks_from_labels(problem, ['a', 'a', 'b', 'b', None])
+        self.assertEqual(2, structure.num_blocks)
+        self.assertEqual([4], structure.linking_rows)
+        with self.assertRaises(ValueError):
+            blocks_from_labels(problem, ['a', 'b', 'b', 'b', None])
+        with self.assertRaises(ValueError):
+            blocks_from_labels(problem, ['a', 'b'])
+
+
+class DecompositionSolverTest(unittest.TestCase):
+
+    def assertSameOptimum(self, problem, solver):
+        hook = StatsHook()
+        solution = solver.solve(problem, hook)
+        expected = MultiObjectiveSolver().solve(problem)
+        self.assertAlmostEqual(expected.objective_values[0], solution.objective_values[0], 6)
+        self.assertAlmostEqual(expected['z'], solution['z'], 6)
+        self.assertGreater(hook.last_report.counter('master_rounds'), 0)
+        return solution
+
+    def test_detected_blocks(self):
+        for seed in range(3):
+            self.assertSameOptimum(generators.block_diagonal(4, 3, 5, 2, seed=seed), DecompositionSolver(processes=1))
+
+    def test_worker_processes(self):
+        self.assertSameOptimum(generators.block_diagonal(3, 3, 4, 2, seed=4), DecompositionSolver(processes=2))
+
+    def test_labelled_blocks_and_free_columns(self):
+        # Two blocks that must meet a joint demand, which the master only reaches by mixing their vertices, and a
+        # column that only appears in the linking row.
+        matrix = MatrixProblem(['a', 'b', 'c', 'd', 'e'])
+        matrix.add_objective(ObjectiveGoal.MINIMIZE, [0, 1, 2, 3, 4], [2, 3, 1, 4, 10])
+        matrix.add_row([0, 1], [1, 1], EqualitySigns.LE, 4)
+        matrix.add_row([0], [1], EqualitySigns.LE, 3)
+        matrix.add_row([2, 3], [1, 2], EqualitySigns.LE, 6)
+        matrix.add_row([0, 1, 2, 3, 4], [1, 1, 1, 1, 1], EqualitySigns.GE, 9)
+        solver = DecompositionSolver(block_labels=[0, 0, 1, None], processes=1)
+        solution = self.assertSameOptimum(matrix, solver)
+        self.assertAlmostEqual(9, sum(solution[name] for name in 'abcde'))
+
+    def test_infeasible(self):
+        matrix = MatrixProblem(['a', 'b'])
+        matrix.add_objective(ObjectiveGoal.MAXIMIZE, [0, 1], [1, 1])
+        matrix.add_row([0], [1], EqualitySigns.LE, 1)
+        matrix.add_row([1], [1], EqualitySigns.LE, 1)
+        matrix.add_row([0, 1], [1, 1], EqualitySigns.GE, 3)
+        with self.assertRaises(RuntimeError):
+            DecompositionSolver(block_labels=[0, 1, None], processes=1).solve(matrix)
+
+    def test_unbounded_block_falls_back(self):
+        matrix = MatrixProblem(['a', 'b'])
+        matrix.add_objective(ObjectiveGoal.MAXIMIZE, [0, 1], [1, -1])
+        matrix.add_row([0], [1], EqualitySigns.GE, 1)
+        matrix.add_row([1], [1], EqualitySigns.LE, 1)
+        matrix.add_row([0, 1], [1, -1], EqualitySigns.LE, 5)
+        hook = StatsHook()
+        solution = DecompositionSolver(block_labels=[0, 1, None], processes=1).solve(matrix, hook)
+        self.assertEqual(1, hook.last_report.counter('decomposition_fallbacks'))
+        self.assertAlmostEqual(5, solution.objective_values[0])
+
+    def test_factory(self):
+        solver = SolverMethods.DECOMPOSITION.get_solver(processes=1)
+        self.assertIsInstance(solver, DecompositionSolver)
+
+
+if __name__ == '__main__':
+    unittest.main()
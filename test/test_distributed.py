@@ -0,0 +1,158 @@
+import socket
+import threading
+import unittest
+
+from systemssolver.benchmark import generators
+from systemssolver.distributed import Dispatcher, DistributedSolver, start_worker_process, recv_frame, TASK
+from systemssolver.methods.factory import SolverMethods
+from systemssolver.methods.multiobjective import MultiObjectiveSolver
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.modeling.objective import ObjectiveGoal
+from systemssolver.solution import SolveStatus
+from systemssolver.tracing.hook import StatsHook
+
+
+class _FaultyNode:
+    """ Accepts connections and reads tasks, then either hangs up or goes silent. """
+
+    def __init__(self, hang_up: bool):
+        self.hang_up = hang_up
+        self.tasks = 0
+        self._sock = socket.create_server(('127.0.0.1', 0))
+        self.address = self._sock.getsockname()
+        self._connections = list()
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                connection, _ = self._sock.accept()
+            except OSError:
+                return
+            self._connections.append(connection)
+            kind, _, _ = recv_frame(connection)
+            if kind == TASK:
+                self.tasks += 1
+            if self.hang_up:
+                connection.close()
+
+    def close(self):
+        self._sock.close()
+        for connection in self._connections:
+            connection.close()
+
+
+class DistributedTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.workers = [start_worker_process(heartbeat_interval=0.1) for _ in range(3)]
+        cls.addresses = [address for _, address in cls.workers]
+
+    @classmethod
+    def tearDownClass(cls):
+        for process, _ in cls.workers:
+            process.terminate()
+            process.join()
+
+    def setUp(self):
+        self.problems = [generators.transportation(3, 4, seed=seed) for seed in range(7)]
+        self.expected = [MultiObjectiveSolver().solve(problem).objective_values for problem in self.problems]
+
+    def assertSolved(self, solutions):
+        self.assertEqual(len(self.problems), len(solutions))
+        for solution, expected in zip(solutions, self.expected):
+            self.assertEqual(SolveStatus.OPTIMAL, solution.status)
+            self.assertAlmostEqual(expected[0], solution.objective_values[0])
+
+    def test_batch(self):
+        dispatcher = Dispatcher(self.addresses, SolverMethods.MULTI_OBJECTIVE)
+        self.assertSolved(dispatcher.solve_many(self.problems))
+        self.assertEqual(0, dispatcher.retries)
+
+    def test_options_and_distributed_solver(self):
+        solver = DistributedSolver(self.addresses[:1], SolverMethods.SIMPLEX, limits={'max_iterations': 1})
+        solution = solver.solve(generators.klee_minty(3))
+        self.assertEqual(SolveStatus.ITERATION_LIMIT, solution.status)
+        self.assertTrue(solver.can_solve(generators.klee_minty(3)))
+
+    def test_stats_and_what_the_wire_carries(self):
+        solver = DistributedSolver(self.addresses[:1], SolverMethods.SIMPLEX)
+        hook = StatsHook()
+        solution = solver.solve(generators.klee_minty(3), hook)
+        self.assertEqual(1, len(hook.reports))
+        self.assertGreater(hook.last_report.counter('pivots'), 0)
+        self.assertEqual(hook.last_report.to_dict(), solution.stats.to_dict())
+        self.assertIsNone(solver.solve(generators.klee_minty(3)).stats)
+
+        quadratic = MatrixProblem(['x'])
+        quadratic.add_objective(ObjectiveGoal.MINIMIZE, [0], [-1], quadratic=[(0, 0, 1)])
+        quadratic.add_row([0], [1], EqualitySigns.LE, 4)
+        self.assertFalse(DistributedSolver(self.addresses[:1], SolverMethods.QUADRATIC).can_solve(quadratic))
+
+    def test_remote_errors(self):
+        dispatcher = Dispatcher(self.addresses[:1], SolverMethods.LINEAR_SYSTEM, {'no_such_option': 1})
+        with self.assertRaises(RuntimeError):
+            dispatcher.solve(self.problems[0])
+
+    def test_failed_task_keeps_the_batch(self):
+        infeasible = MatrixProblem(['x'])
+        infeasible.add_objective(ObjectiveGoal.MAXIMIZE, [0], [1])
+        infeasible.add_row([0], [1], EqualitySigns.LE, 1)
+        infeasible.add_row([0], [1], EqualitySigns.GE, 2)
+
+        dispatcher = Dispatcher(self.addresses, SolverMethods.MULTI_OBJECTIVE)
+        solutions = dispatcher.solve_many([self.problems[0], infeasible.to_problem(), self.problems[1]])
+        self.assertIsNone(solutions[1])
+        self.assertEqual([1], list(dispatcher.errors))
+        for solution, expected in zip(solutions[::2], self.expected):
+            self.assertAlmostEqual(expected[0], solution.objective_values[0])
+
+    def test_lost_node_is_retried(self):
+        node = _FaultyNode(hang_up=True)
+        try:
+            dispatcher = Dispatcher([node.address] + self.addresses[:1], SolverMethods.MULTI_OBJECTIVE)
+            self.assertSolved(dispatcher.solve_many(self.problems))
+            self.assertEqual(1, node.tasks)
+            self.assertEqual(1, dispatcher.retries)
+        finally:
+            node.close()
+
+    def test_silent_node_times_out(self):
+        node = _FaultyNode(hang_up=False)
+        try:
+            dispatcher = Dispatcher([node.address] + self.addresses[1:2], SolverMethods.MULTI_OBJECTIVE,
+                                    heartbeat_timeout=0.5)
+            self.assertSolved(dispatcher.solve_many(self.problems))
+            self.assertEqual(1, dispatcher.retries)
+        finally:
+            node.close()
+
+    def test_unreachable_worker(self):
+        unreachable = socket.create_server(('127.0.0.1', 0))
+        address = unreachable.getsockname()
+        unreachable.close()
+        dispatcher = Dispatcher([address] + self.addresses[:1], SolverMethods.MULTI_OBJECTIVE, connect_timeout=1)
+        self.assertSolved(dispatcher.solve_many(self.problems))
+
+    def test_work_stealing(self):
+        # Tasks are dealt out alternately, so the first worker gets every large model and the second, done with its
+        # small ones long before, takes the rest of the first one's queue.
+        problems = [generators.transportation(12, 14, seed=seed) if seed % 2 == 0 else generators.klee_minty(2)
+                    for seed in range(8)]
+        dispatcher = Dispatcher(self.addresses[:2], SolverMethods.MULTI_OBJECTIVE)
+        solutions = dispatcher.solve_many(problems)
+        self.assertTrue(all(solution.is_optimal for solution in solutions))
+        self.assertGreater(dispatcher.steals, 0)
+
+    def test_no_workers(self):
+        unreachable = socket.create_server(('127.0.0.1', 0))
+        address = unreachable.getsockname()
+        unreachable.close()
+        with self.assertRaises(RuntimeError):
+            Dispatcher([address], connect_timeout=1).solve(self.problems[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
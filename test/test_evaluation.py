@@ -0,0 +1,59 @@
+import unittest
+
+from systemssolver.modeling.equation import Expression, Constraint, EqualitySigns
+from systemssolver.modeling.evaluation import CompiledEvaluator
+from systemssolver.modeling.objective import Objective, ObjectiveGoal
+from systemssolver.modeling.variables import Term, Variable
+from systemssolver.problem import Problem
+
+
+class CompiledEvaluatorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.problem = Problem()
+        self.problem.add_objective(Objective(
+            expression=Expression(terms=[Term(coef=3, var=Variable('x')), Term(coef=2, var=Variable('y')),
+                                         Term(coef=1)]),
+            goal=ObjectiveGoal.MAXIMIZE))
+        self.problem.add_constraint(Constraint(
+            left=Expression(terms=[Term(coef=1, var=Variable('x')), Term(coef=1, var=Variable('y'))]),
+            right=Expression(terms=[Term(coef=4)]), sign=EqualitySigns.LE))
+        self.problem.add_constraint(Constraint(
+            left=Expression(terms=[Term(coef=1, var=Variable('x'))]),
+            right=Expression(terms=[Term(coef=1)]), sign=EqualitySigns.GE))
+        self.problem.add_constraint(Constraint(
+            left=Expression(terms=[Term(coef=2, var=Variable('y'))]),
+            right=Expression(terms=[Term(coef=2)]), sign=EqualitySigns.EQUAL))
+        self.evaluator = CompiledEvaluator(self.problem)
+
+    def test_evaluate(self):
+        candidates = [
+            self.evaluator.candidate({'x': 2, 'y': 1}),
+            self.evaluator.candidate({'x': 0, 'y': 1}),
+            self.evaluator.candidate({'x': 5, 'y': 0}),
+        ]
+        result = self.evaluator.evaluate(candidates)
+
+        self.assertEqual([[9, 3, 16]], result.objective_values)
+        self.assertEqual([[0, 0, 1], [0, 1, 0], [0, 0, 2]], result.violations)
+        self.assertEqual([True, False, False], result.feasible())
+        self.assertEqual(3, result.num_candidates)
+
+    def test_matches_constraint_scoring(self):
+        candidate = {'x': 3, 'y': 0}
+        for var in self.problem.variables:
+            var.val = candidate[var.name]
+        feasible = all(constraint.is_satisfied() for constraint in self.problem.constraints)
+
+        result = self.evaluator.evaluate([self.evaluator.candidate(candidate)])
+        self.assertEqual([feasible], result.feasible())
+        self.assertEqual(self.problem.objectives[0].expression.evaluate(), result.objective_values[0][0])
+
+    def test_empty_batch(self):
+        result = self.evaluator.evaluate([])
+        self.assertEqual([[]], result.objective_values)
+        self.assertEqual([], result.feasible())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import itertools
+import unittest
+
+from systemssolver.benchmark import generators
+from systemssolver.methods.factory import SolverMethods
+from systemssolver.methods.integer import IntegerSolver, IntegerRelaxation, CutAndHeuristicStage, GomoryCuts, \
+    KnapsackCoverCuts, RoundingHeuristic, DivingHeuristic, FeasibilityPump
+from systemssolver.methods.limits import SolveLimits
+from systemssolver.methods.standard import build_tableau, maximization_costs
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.modeling.objective import ObjectiveGoal
+from systemssolver.modeling.variables import VariableType
+from systemssolver.solution import SolveStatus
+from systemssolver.tracing.hook import StatsHook
+
+
+def _knapsack_optimum(problem) -> float:
+    matrix = MatrixProblem.from_problem(problem)
+    objective = matrix.objectives[0]
+    weights = dict(zip(*matrix.rows.row(0)))
+    best = 0
+    for picks in itertools.product((0, 1), repeat=matrix.num_variables):
+        if sum(weights[col] * pick for col, pick in enumerate(picks)) <= matrix.rhs[0]:
+            best = max(best, sum(coef * picks[col] for col, coef in zip(objective.indices, objective.coefs)))
+    return best
+
+
+def _relaxation(matrix: MatrixProblem) -> IntegerRelaxation:
+    costs, constant = maximization_costs(matrix.objectives[0])
+    tableau = build_tableau(matrix, costs, constant)
+    tableau.optimize()
+    return IntegerRelaxation(matrix, tableau)
+
+
+def _general_integer() -> MatrixProblem:
+    # max 5a + 4b + 3c s.t. 2a + 3b + c <= 5.5, 4a + b + 2c <= 11.3, 3a + 4b + 2c <= 8.7, a, b integer, c real.
+    matrix = MatrixProblem(['a', 'b', 'c'], [VariableType.INTEGER, VariableType.INTEGER, VariableType.REAL])
+    matrix.add_objective(ObjectiveGoal.MAXIMIZE, [0, 1, 2], [5, 4, 3])
+    matrix.add_row([0, 1, 2], [2, 3, 1], EqualitySigns.LE, 5.5)
+    matrix.add_row([0, 1, 2], [4, 1, 2], EqualitySigns.LE, 11.3)
+    matrix.add_row([0, 1, 2], [3, 4, 2], EqualitySigns.LE, 8.7)
+    return matrix
+
+
+class CutsTest(unittest.TestCase):
+
+    def test_gomory_cuts_keep_integer_points(self):
+        matrix = _general_integer()
+        relaxation = _relaxation(matrix)
+        self.assertTrue(relaxation.fractional(relaxation.point()))
+        cuts = GomoryCuts().generate(relaxation)
+        self.assertTrue(cuts)
+
+        tableau = relaxation.tableau
+        for coefs, rhs in cuts:
+            tableau.add_row(coefs, rhs, name='cut')
+        tableau.optimize()
+        # Valid cuts keep the integer optimum inside the relaxation.
+        self.assertGreaterEqual(tableau.objective_value, IntegerSolver().solve(matrix).objective_values[0] - 1e-9)
+
+    def test_cover_cuts(self):
+        relaxation = _relaxation(MatrixProblem.from_problem(generators.knapsack(8, seed=0)))
+        point = relaxation.point()
+        self.assertEqual(1, len(relaxation.fractional(point)))
+        cuts = KnapsackCoverCuts().generate(relaxation)
+        self.assertEqual(1, len(cuts))
+        coefs, rhs = cuts[0]
+        self.assertGreater(sum(point[col] for col in coefs), rhs)
+        self.assertTrue(all(coef == 1 for coef in coefs.values()))
+
+
+class HeuristicsTest(unittest.TestCase):
+
+    def test_heuristics_find_feasible_points(self):
+        relaxation = _relaxation(MatrixProblem.from_problem(generators.knapsack(10, seed=4)))
+        for heuristic in (RoundingHeuristic(), DivingHeuristic(), FeasibilityPump()):
+            with self.subTest(heuristic=heuristic.name):
+                self.assertTrue(relaxation.is_feasible(heuristic.find(relaxation)))
+
+    def test_pump_on_general_integers(self):
+        relaxation = _relaxation(_general_integer())
+        point = FeasibilityPump().find(relaxation)
+        self.assertTrue(relaxation.is_feasible(point))
+
+
+class IntegerSolverTest(unittest.TestCase):
+
+    def test_knapsack(self):
+        for seed in range(3):
+            problem = generators.knapsack(12, seed=seed)
+            hook = StatsHook()
+            solution = IntegerSolver().solve(problem, hook)
+            self.assertTrue(solution.is_optimal)
+            self.assertAlmostEqual(_knapsack_optimum(problem), solution.objective_values[0])
+            self.assertTrue(all(solution['x{}'.format(i)] in (0, 1) for i in range(12)))
+
+            stats = hook.last_report
+            self.assertGreater(stats.counter('cuts_added'), 0)
+            self.assertGreaterEqual(stats.counter('bound_improvement'), 0)
+            self.assertGreaterEqual(stats.counter('cut_seconds'), 0)
+
+    def test_stage_is_pluggable(self):
+        problem = generators.knapsack(12, seed=1)
+        bare = StatsHook()
+        IntegerSolver(CutAndHeuristicStage(cuts=[], heuristics=[])).solve(problem, bare)
+        covered = StatsHook()
+        stage = CutAndHeuristicStage(cuts=[KnapsackCoverCuts()], heuristics=[RoundingHeuristic()])
+        solution = IntegerSolver(stage).solve(problem, covered)
+
+        self.assertAlmostEqual(_knapsack_optimum(problem), solution.objective_values[0])
+        self.assertEqual(0, bare.last_report.counter('cuts_added'))
+        self.assertEqual(covered.last_report.counter('cuts_cover'), covered.last_report.counter('cuts_added'))
+        self.assertEqual(0, covered.last_report.counter('cuts_gomory'))
+        self.assertGreater(covered.last_report.counter('bound_improvement'), 0)
+        self.assertEqual(1, covered.last_report.counter('rounding_solutions'))
+
+    def test_mixed_integer(self):
+        solution = SolverMethods.INTEGER.get_solver().solve(_general_integer())
+        # Enumerating the integer parts: c takes what the rows leave.
+        best = max(
+            5 * a + 4 * b + 3 * c
+            for a in range(4) for b in range(3)
+            for c in [min((5.5 - 2 * a - 3 * b), (11.3 - 4 * a - b) / 2, (8.7 - 3 * a - 4 * b) / 2)] if c >= 0
+        )
+        self.assertAlmostEqual(best, solution.objective_values[0])
+        self.assertEqual(round(solution['a']), solution['a'])
+
+    def test_node_limit(self):
+        problem = generators.knapsack(14, seed=3)
+        solver = IntegerSolver(CutAndHeuristicStage(cuts=[], heuristics=[RoundingHeuristic()]), max_nodes=1)
+        solution = solver.solve(problem)
+        self.assertEqual(SolveStatus.ITERATION_LIMIT, solution.status)
+        self.assertTrue(solution.feasible)
+        self.assertGreaterEqual(solution.bound, solution.objective_values[0])
+
+        limited = IntegerSolver(limits=SolveLimits(max_iterations=1)).solve(problem)
+        self.assertEqual(SolveStatus.ITERATION_LIMIT, limited.status)
+
+    def test_infeasible_and_continuous(self):
+        matrix = MatrixProblem(['x'], [VariableType.INTEGER])
+        matrix.add_objective(ObjectiveGoal.MAXIMIZE, [0], [1])
+        matrix.add_row([0], [1], EqualitySigns.LE, 0.8)
+        matrix.add_row([0], [1], EqualitySigns.GE, 0.2)
+        # Both branches are infeasible, which the search expects: only the solver's own verdict is logged.
+        with self.assertRaises(RuntimeError), self.assertLogs(level='ERROR') as logs:
+            IntegerSolver().solve(matrix)
+        self.assertEqual(['ERROR:root:No integer point satisfies the constraints'], logs.output)
+        self.assertIsNone(IntegerSolver().solve(generators.klee_minty(3)))
+
+
+if __name__ == '__main__':
+    unittest.main()
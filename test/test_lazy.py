@@ -0,0 +1,72 @@
+import unittest
+from itertools import combinations
+
+from systemssolver.methods.multiobjective import MultiObjectiveSolver
+from systemssolver.methods.simplex import SimplexSolver
+from systemssolver.modeling.equation import Expression, Constraint, EqualitySigns
+from systemssolver.modeling.objective import Objective, ObjectiveGoal
+from systemssolver.modeling.variables import Term, Variable
+from systemssolver.problem import Problem
+from systemssolver.tracing.hook import LazyConstraintHook
+
+
+def _pair_row(first: Variable, second: Variable) -> Constraint:
+    return Constraint(left=Expression([Term(var=first, coef=1), Term(var=second, coef=1)]),
+                      right=Expression([Term(coef=1)]), sign=EqualitySigns.LE)
+
+
+class LazyConstraintTest(unittest.TestCase):
+    """ max sum x s.t. x <= 10 each, with every pair x_i + x_j <= 1 only known to the separator. """
+
+    def setUp(self):
+        self.variables = [Variable(name='x{}'.format(idx)) for idx in range(5)]
+        self.problem = Problem()
+        self.problem.add_objective(Objective(
+            expression=Expression([Term(var=var, coef=1) for var in self.variables]), goal=ObjectiveGoal.MAXIMIZE))
+        for var in self.variables:
+            self.problem.add_constraint(Constraint(
+                left=Expression([Term(var=var, coef=1)]), right=Expression([Term(coef=10)]), sign=EqualitySigns.LE))
+        self.separated = list()
+
+    def separator(self, solution):
+        self.separated.append(solution.as_dict())
+        return [_pair_row(first, second) for first, second in combinations(self.variables, 2)
+                if solution[first.name] + solution[second.name] > 1 + 1e-9]
+
+    def assertLazyOptimum(self, solver):
+        hook = LazyConstraintHook(self.separator)
+        solution = solver.solve(self.problem, hook)
+        self.assertAlmostEqual(2.5, sum(solution[var.name] for var in self.variables))
+        for first, second in combinations(self.variables, 2):
+            self.assertLessEqual(solution[first.name] + solution[second.name], 1 + 1e-9)
+
+        stats = hook.last_report
+        self.assertGreater(stats.counter('lazy_rows'), 0)
+        self.assertEqual(len(self.separated) - 1, stats.counter('separation_rounds'))
+        # Only the problem's own rows were there up front.
+        self.assertEqual(5, len(self.problem.constraints))
+
+    def test_simplex(self):
+        self.assertLazyOptimum(SimplexSolver())
+
+    def test_multiobjective(self):
+        self.assertLazyOptimum(MultiObjectiveSolver())
+
+    def test_unknown_variable(self):
+        other = Variable(name='y')
+        hook = LazyConstraintHook(lambda solution: [_pair_row(self.variables[0], other)])
+        with self.assertRaises(ValueError):
+            MultiObjectiveSolver().solve(self.problem, hook)
+
+    def test_satisfied_rows_end_the_solve(self):
+        # Looser than x0 <= 10, so it is never violated and no row is added.
+        loose = Constraint(left=Expression([Term(var=self.variables[0], coef=1)]), right=Expression([Term(coef=20)]),
+                           sign=EqualitySigns.LE)
+        hook = LazyConstraintHook(lambda solution: [loose])
+        solution = MultiObjectiveSolver().solve(self.problem, hook)
+        self.assertEqual([50], solution.objective_values)
+        self.assertEqual(0, hook.last_report.counter('lazy_rows'))
+
+
+if __name__ == '__main__':
+    unittest.main()
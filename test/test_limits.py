@@ -0,0 +1,66 @@
+import unittest
+
+from systemssolver.benchmark import generators
+from systemssolver.methods.limits import SolveLimits, CancellationToken, LimitReached
+from systemssolver.methods.multiobjective import MultiObjectiveSolver
+from systemssolver.methods.simplex import SimplexSolver
+from systemssolver.methods.standard import build_tableau, maximization_costs
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.solution import SolveStatus
+from systemssolver.tracing.hook import TracingHook
+
+
+class CancellingHook(TracingHook):
+
+    def __init__(self, token: CancellationToken):
+        self.token = token
+
+    def step(self, solution):
+        self.token.cancel()
+        return True
+
+
+class SolveLimitsTest(unittest.TestCase):
+
+    def test_unlimited_solve_is_optimal(self):
+        solution = SimplexSolver(limits=SolveLimits(max_iterations=100)).solve(generators.klee_minty(4))
+        self.assertEqual(SolveStatus.OPTIMAL, solution.status)
+        self.assertEqual(625, solution['z'])
+
+    def test_iteration_limit_returns_best_feasible_point(self):
+        solution = SimplexSolver(limits=SolveLimits(max_iterations=2)).solve(generators.klee_minty(4))
+        self.assertEqual(SolveStatus.ITERATION_LIMIT, solution.status)
+        self.assertTrue(solution.feasible)
+        self.assertGreater(solution['z'], 0)
+        self.assertLess(solution['z'], 625)
+
+    def test_cancellation(self):
+        token = CancellationToken()
+        solution = SimplexSolver(limits=SolveLimits(cancel_token=token)).solve(
+            generators.klee_minty(4), tracing_hook=CancellingHook(token))
+        self.assertEqual(SolveStatus.CANCELLED, solution.status)
+        self.assertTrue(solution.feasible)
+
+    def test_memory_and_time_limits(self):
+        solution = SimplexSolver(limits=SolveLimits(max_memory=1)).solve(generators.klee_minty(3))
+        self.assertEqual(SolveStatus.MEMORY_LIMIT, solution.status)
+        self.assertEqual(0, solution['z'])
+        solution = SimplexSolver(limits=SolveLimits(time_limit=0)).solve(generators.klee_minty(3))
+        self.assertEqual(SolveStatus.TIME_LIMIT, solution.status)
+
+    def test_optimize_raises_on_limit(self):
+        matrix = MatrixProblem.from_problem(generators.klee_minty(4))
+        costs, constant = maximization_costs(matrix.objectives[0])
+        tableau = build_tableau(matrix, costs, constant)
+        with self.assertRaises(LimitReached) as context:
+            tableau.optimize(clock=SolveLimits(max_iterations=1).start())
+        self.assertEqual(SolveStatus.ITERATION_LIMIT, context.exception.status)
+
+    def test_multi_objective_limit(self):
+        solution = MultiObjectiveSolver(limits=SolveLimits(max_iterations=1)).solve(generators.klee_minty(4))
+        self.assertEqual(SolveStatus.ITERATION_LIMIT, solution.status)
+        self.assertFalse(solution.feasible)
+
+
+if __name__ == '__main__':
+    unittest.main()
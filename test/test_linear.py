@@ -0,0 +1,77 @@
+import random
+import unittest
+
+from systemssolver.methods.factory import SolverMethods
+from systemssolver.methods.linear import LinearSystemSolver, DenseLU, SparseLU, QRFactorization
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.tracing.hook import StatsHook
+
+
+def _system(rows, rhs):
+    matrix = MatrixProblem(['x{}'.format(idx) for idx in range(len(rows[0]))])
+    for row, val in zip(rows, rhs):
+        indices = [col for col, coef in enumerate(row) if coef != 0]
+        matrix.add_row(indices, [row[col] for col in indices], EqualitySigns.EQUAL, val)
+    return matrix.to_problem()
+
+
+class FactorizationTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.size = 12
+        self.rows = [[rng.uniform(-5, 5) if rng.random() < 0.3 or i == j else 0 for j in range(self.size)]
+                     for i in range(self.size)]
+        self.expected = [rng.uniform(-1, 1) for _ in range(self.size)]
+        self.rhs = [sum(coef * val for coef, val in zip(row, self.expected)) for row in self.rows]
+
+    def test_factorizations_agree(self):
+        sparse_rows = [{col: coef for col, coef in enumerate(row) if coef != 0} for row in self.rows]
+        for factorization in (DenseLU(self.rows), SparseLU(sparse_rows, self.size),
+                              QRFactorization(self.rows, self.size)):
+            for val, expected in zip(factorization.solve(self.rhs), self.expected):
+                self.assertAlmostEqual(expected, val, 8)
+
+    def test_least_squares(self):
+        # x = 1, y = 2 and x + y = 4 are inconsistent; the least-squares fit is x = 4/3, y = 7/3.
+        factorization = QRFactorization([[1, 0], [0, 1], [1, 1]], 2)
+        x, y = factorization.solve([1, 2, 4])
+        self.assertAlmostEqual(4 / 3, x)
+        self.assertAlmostEqual(7 / 3, y)
+
+    def test_minimum_norm(self):
+        x, y = QRFactorization([[1, 1]], 2).solve([2])
+        self.assertAlmostEqual(1, x)
+        self.assertAlmostEqual(1, y)
+
+
+class LinearSystemSolverTest(unittest.TestCase):
+
+    def test_solve(self):
+        problem = _system([[2, 1], [1, 3]], [3, 5])
+        solver = SolverMethods.LINEAR_SYSTEM.get_solver()
+        solution = solver.solve(problem)
+        self.assertAlmostEqual(0.8, solution['x0'])
+        self.assertAlmostEqual(1.4, solution['x1'])
+        self.assertTrue(solution.feasible)
+        self.assertFalse(SolverMethods.SIMPLEX.get_solver().can_solve(problem))
+
+    def test_inconsistent_system_is_infeasible(self):
+        solution = LinearSystemSolver().solve(_system([[1, 0], [0, 1], [1, 1]], [1, 2, 4]))
+        self.assertFalse(solution.feasible)
+        self.assertAlmostEqual(4 / 3, solution['x0'])
+
+    def test_factorization_cache(self):
+        problem = _system([[2, 1], [1, 3]], [3, 5])
+        solver, hook = LinearSystemSolver(), StatsHook()
+        solutions = solver.solve_many(problem, [[3, 5], [2, 1]], hook)
+        self.assertAlmostEqual(1, solutions[1]['x0'])
+        self.assertAlmostEqual(0, solutions[1]['x1'])
+        solver.solve(problem, hook)
+        self.assertEqual(1, hook.aggregate().counter('factorizations'))
+        self.assertEqual(1, hook.aggregate().counter('factorization_cache_hits'))
+
+
+if __name__ == '__main__':
+    unittest.main()
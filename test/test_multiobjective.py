@@ -0,0 +1,64 @@
+import unittest
+
+from systemssolver.methods.factory import SolverMethods
+from systemssolver.methods.multiobjective import MultiObjectiveSolver, MultiObjectiveMode
+from systemssolver.modeling.equation import Expression, Constraint, EqualitySigns
+from systemssolver.modeling.objective import Objective, ObjectiveGoal
+from systemssolver.modeling.variables import Term, Variable
+from systemssolver.problem import Problem
+from systemssolver.tracing.hook import StatsHook
+
+
+class MultiObjectiveTest(unittest.TestCase):
+
+    def _problem(self, first_goal=ObjectiveGoal.MAXIMIZE):
+        x = Variable(name="x")
+        y = Variable(name="y")
+        problem = Problem()
+        problem.add_objective(Objective(expression=Expression(terms=[Term(coef=1, var=x)]), goal=first_goal))
+        problem.add_objective(Objective(expression=Expression(terms=[Term(coef=1, var=y)]),
+                                        goal=ObjectiveGoal.MAXIMIZE))
+        problem.add_constraint(Constraint(
+            left=Expression(terms=[Term(coef=1, var=x), Term(coef=1, var=y)]),
+            right=Expression(terms=[Term(coef=4)]), sign=EqualitySigns.LE))
+        problem.add_constraint(Constraint(
+            left=Expression(terms=[Term(coef=1, var=x)]),
+            right=Expression(terms=[Term(coef=3)]), sign=EqualitySigns.LE))
+        return problem
+
+    def _vals(self, solution):
+        return {var.name: var.val for var in solution.variables}
+
+    def test_lexicographic(self):
+        hook = StatsHook()
+        solution = SolverMethods.MULTI_OBJECTIVE.get_solver().solve(self._problem(), hook)
+        self.assertAlmostEqual(3, self._vals(solution)['x'])
+        self.assertAlmostEqual(1, self._vals(solution)['y'])
+        self.assertEqual(2, len(solution.objective_values))
+        self.assertAlmostEqual(1, solution.objective_values[1])
+        self.assertEqual(1, hook.last_report.counter('pivots_stage_0'))
+        self.assertGreater(hook.last_report.counter('pivots_stage_1'), 0)
+
+    def test_lexicographic_minimize_first(self):
+        solution = MultiObjectiveSolver().solve(self._problem(ObjectiveGoal.MINIMIZE))
+        self.assertAlmostEqual(0, self._vals(solution)['x'])
+        self.assertAlmostEqual(4, self._vals(solution)['y'])
+
+    def test_weighted(self):
+        solution = MultiObjectiveSolver(mode=MultiObjectiveMode.WEIGHTED, weights=[1, 3]).solve(self._problem())
+        self.assertAlmostEqual(0, self._vals(solution)['x'])
+        self.assertAlmostEqual(4, self._vals(solution)['y'])
+
+    def test_pareto_front(self):
+        front = MultiObjectiveSolver().pareto_front(self._problem(), steps=4)
+        points = sorted(tuple(round(val, 6) for val in solution.objective_values) for solution in front)
+        self.assertEqual([(0, 4), (3, 1)], points)
+
+    def test_equality_rows(self):
+        problem = self._problem()
+        problem.add_constraint(Constraint(
+            left=Expression(terms=[Term(coef=1, var=Variable('y'))]),
+            right=Expression(terms=[Term(coef=2)]), sign=EqualitySigns.EQUAL))
+        solution = MultiObjectiveSolver().solve(problem)
+        self.assertAlmostEqual(2, self._vals(solution)['x'])
+        self.assertAlmostEqual(2, self._vals(solution)['y'])
@@ -0,0 +1,100 @@
+import unittest
+
+from systemssolver.benchmark import generators
+from systemssolver.methods.factory import SolverMethods
+from systemssolver.methods.multiobjective import MultiObjectiveSolver
+from systemssolver.methods.network import NetworkSimplexSolver, detect_network
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.modeling.objective import ObjectiveGoal
+from systemssolver.tracing.hook import StatsHook
+
+
+class DetectionTest(unittest.TestCase):
+
+    def test_transportation_rows_are_oriented(self):
+        # Supply and demand rows both have +1 entries, so one side has to be flipped to make arcs of the columns.
+        structure = detect_network(generators.transportation(2, 3))
+        self.assertTrue(structure.is_pure)
+        self.assertEqual(1, len(set(structure.orientation[:2])))
+        self.assertNotEqual(structure.orientation[0], structure.orientation[2])
+        self.assertTrue(all(tail is not None and head is not None for tail, head in structure.arcs))
+
+    def test_side_rows(self):
+        matrix = MatrixProblem.from_problem(generators.transportation(2, 3))
+        matrix.add_row([0, 4], [1, 1], EqualitySigns.LE, 5)
+        matrix.add_row([0, 1], [2, 1], EqualitySigns.LE, 5)
+        structure = detect_network(matrix)
+        self.assertFalse(structure.is_pure)
+        self.assertEqual([5, 6], structure.side_rows)
+
+    def test_not_a_network(self):
+        solver = NetworkSimplexSolver()
+        self.assertFalse(solver.can_solve(generators.klee_minty(3)))
+        self.assertFalse(solver.can_solve(generators.random_sparse(10, 10, seed=1)))
+
+
+class NetworkSimplexSolverTest(unittest.TestCase):
+
+    def assertSameOptimum(self, problem):
+        solution = NetworkSimplexSolver().solve(problem)
+        expected = MultiObjectiveSolver().solve(problem)
+        self.assertAlmostEqual(expected.objective_values[0], solution.objective_values[0])
+        self.assertAlmostEqual(expected['z'], solution['z'])
+        return solution
+
+    def test_transportation(self):
+        for seed in range(3):
+            self.assertSameOptimum(generators.transportation(4, 5, seed=seed))
+
+    def test_assignment(self):
+        solution = self.assertSameOptimum(generators.assignment(5, seed=1))
+        for i in range(5):
+            self.assertAlmostEqual(1, sum(solution['x{}_{}'.format(i, j)] for j in range(5)))
+
+    def test_maximize(self):
+        matrix = MatrixProblem(['a', 'b'])
+        matrix.add_objective(ObjectiveGoal.MAXIMIZE, [0, 1], [3, 2], 1)
+        matrix.add_row([0, 1], [1, 1], EqualitySigns.LE, 4)
+        matrix.add_row([0], [1], EqualitySigns.LE, 3)
+        solution = NetworkSimplexSolver().solve(matrix)
+        self.assertEqual([12], solution.objective_values)
+        self.assertEqual((3, 1), (solution['a'], solution['b']))
+
+    def test_side_constraint_fallback(self):
+        problem = MatrixProblem.from_problem(generators.transportation(3, 4, seed=2))
+        relaxed = NetworkSimplexSolver().solve(problem)
+        # Caps a route the relaxation uses, so the side row is violated and the general simplex takes over.
+        used = max(range(problem.num_variables), key=lambda col: relaxed.values[col])
+        problem.add_row([used], [1], EqualitySigns.LE, relaxed.values[used] - 1)
+        problem.add_row([used, (used + 1) % problem.num_variables], [1, 1], EqualitySigns.LE, 1000)
+
+        hook = StatsHook()
+        solution = NetworkSimplexSolver(max_side_fraction=0.5).solve(problem, hook)
+        self.assertEqual(1, hook.last_report.counter('network_fallbacks'))
+        self.assertAlmostEqual(MultiObjectiveSolver().solve(problem).objective_values[0],
+                               solution.objective_values[0])
+        self.assertLessEqual(solution.values[used], relaxed.values[used] - 1 + 1e-9)
+
+    def test_infeasible(self):
+        matrix = MatrixProblem(['a'])
+        matrix.add_objective(ObjectiveGoal.MINIMIZE, [0], [1])
+        matrix.add_row([0], [1], EqualitySigns.LE, 2)
+        matrix.add_row([0], [1], EqualitySigns.GE, 3)
+        with self.assertRaises(RuntimeError):
+            NetworkSimplexSolver().solve(matrix)
+
+    def test_unbounded(self):
+        matrix = MatrixProblem(['a'])
+        matrix.add_objective(ObjectiveGoal.MAXIMIZE, [0], [1])
+        matrix.add_row([0], [1], EqualitySigns.GE, 1)
+        with self.assertRaises(RuntimeError):
+            NetworkSimplexSolver().solve(matrix)
+
+    def test_factory(self):
+        solver = SolverMethods.NETWORK.get_solver()
+        self.assertIsInstance(solver, NetworkSimplexSolver)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 
-from systemssolver.modeling.parsing import ExpressionParser
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.parsing import ExpressionParser, ConstraintParser
 from systemssolver.modeling.variables import Term, Variable
 
 
@@ -54,3 +55,25 @@ class ExpressionParserTest(unittest.TestCase):
         self.assertEqual(Term(coef=3, var=Variable(name='x')), expression.terms[0])
         self.assertEqual(Term(coef=-1, var=Variable(name='y')), expression.terms[1])
         self.assertEqual(Term(coef=5), expression.terms[2])
+
+    def test_multi_char_variables(self):
+        parser = ExpressionParser()
+        expression = parser.parse("2.5x12 - y_b + 3")
+        self.assertEqual(3, len(expression.terms))
+        self.assertEqual(Term(coef=2.5, var=Variable(name='x12')), expression.terms[0])
+        self.assertEqual(Term(coef=-1, var=Variable(name='y_b')), expression.terms[1])
+        self.assertEqual(Term(coef=3), expression.terms[2])
+
+
+class ConstraintParserTest(unittest.TestCase):
+
+    def test_two_char_sign(self):
+        constraint = ConstraintParser().parse("3x1 + x2 <= 10")
+        self.assertEqual(EqualitySigns.LE, constraint.sign)
+        self.assertEqual(2, len(constraint.left.terms))
+        self.assertEqual(Term(coef=10), constraint.right.terms[0])
+
+    def test_single_char_sign(self):
+        constraint = ConstraintParser().parse("x > 2")
+        self.assertEqual(EqualitySigns.GT, constraint.sign)
+        self.assertEqual(Term(coef=2), constraint.right.terms[0])
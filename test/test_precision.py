@@ -0,0 +1,88 @@
+import unittest
+from unittest import mock
+
+from systemssolver.benchmark import generators
+from systemssolver.methods import simplex
+from systemssolver.methods.multiobjective import MultiObjectiveSolver
+from systemssolver.methods.precision import Precision
+from systemssolver.methods.simplex import SimplexSolver
+from systemssolver.methods.standard import build_tableau, maximization_costs
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.modeling.objective import ObjectiveGoal
+from systemssolver.tracing.hook import StatsHook
+
+
+def _tableau(matrix: MatrixProblem):
+    costs, constant = maximization_costs(matrix.objectives[0])
+    return build_tableau(matrix, costs, constant)
+
+
+class MixedPrecisionTest(unittest.TestCase):
+
+    def _assert_same_point(self, expected, solution):
+        for name, val in expected.items():
+            self.assertAlmostEqual(val, solution[name], delta=1e-9 * max(1, abs(val)))
+
+    def test_same_optimum_as_full_precision(self):
+        for problem in (generators.random_sparse(30, 80, density=0.1, seed=2), generators.transportation(6, 8),
+                        generators.klee_minty(8)):
+            expected = MultiObjectiveSolver().solve(problem)
+            for solver in (MultiObjectiveSolver(precision=Precision.MIXED), SimplexSolver(precision=Precision.MIXED)):
+                with self.subTest(solver=type(solver).__name__):
+                    hook = StatsHook()
+                    solution = solver.solve(problem, hook)
+                    self._assert_same_point(expected, solution)
+                    self.assertGreater(hook.last_report.counter('refinements'), 0)
+                    self.assertEqual(0, hook.last_report.counter('precision_fallbacks'))
+
+    def test_periodic_refinement(self):
+        hook = StatsHook()
+        MultiObjectiveSolver(precision=Precision.MIXED).solve(generators.klee_minty(8), hook)
+        stats = hook.last_report
+        self.assertGreaterEqual(stats.counter('refinements'), stats.counter('pivots') // simplex.REFINE_INTERVAL)
+
+    def test_half_the_memory(self):
+        tableau = _tableau(MatrixProblem.from_problem(generators.random_sparse(50, 200, seed=1)))
+        entries = len(tableau.variables) + 1
+        tableau.precision = Precision.MIXED
+        # Four bytes an entry, against eight for float64 storage.
+        self.assertLess(tableau.memory_size(), 51 * entries * 8 / 2 * 1.1)
+        self.assertEqual(Precision.MIXED, tableau.copy().precision)
+        self.assertEqual(Precision.DOUBLE, tableau.to_exact().precision)
+        with self.assertRaises(ValueError):
+            tableau.to_exact().precision = Precision.MIXED
+
+    def test_full_precision_settles_near_ties(self):
+        # The rows only differ past float32's digits; the second one is binding.
+        matrix = MatrixProblem(['x', 'y'])
+        matrix.add_objective(ObjectiveGoal.MAXIMIZE, [0, 1], [1, 1.5])
+        matrix.add_row([0, 1], [1, 1], EqualitySigns.LE, 1)
+        matrix.add_row([0, 1], [1, 1 + 3e-7], EqualitySigns.LE, 1 + 1e-7)
+        hook = StatsHook()
+        solution = MultiObjectiveSolver(precision=Precision.MIXED).solve(matrix, hook)
+        self._assert_same_point(MultiObjectiveSolver().solve(matrix), solution)
+        self.assertEqual(1, hook.last_report.counter('precision_fallbacks'))
+
+    def test_fallback_when_refinement_fails(self):
+        matrix = MatrixProblem.from_problem(generators.random_sparse(20, 40, density=0.2, seed=1))
+        tableau = _tableau(matrix)
+        tableau.precision = Precision.MIXED
+        tableau.optimize()
+        with mock.patch.object(simplex, 'REFINE_TOLERANCE', -1):
+            self.assertIsNotNone(tableau.refine())
+        self.assertEqual(Precision.DOUBLE, tableau.precision)
+        self.assertIsNone(tableau.refine())
+
+        expected = _tableau(matrix)
+        expected.optimize()
+        self.assertEqual(sorted(expected.basis()), sorted(tableau.basis()))
+        self.assertAlmostEqual(expected.objective_value, tableau.objective_value)
+
+    def test_from_val(self):
+        self.assertEqual(Precision.MIXED, Precision.from_val('Mixed'))
+        self.assertIsNone(Precision.from_val('half'))
+
+
+if __name__ == '__main__':
+    unittest.main()
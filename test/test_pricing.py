@@ -0,0 +1,73 @@
+import unittest
+
+from systemssolver.benchmark import generators
+from systemssolver.methods.multiobjective import MultiObjectiveSolver
+from systemssolver.methods.pricing import PricingMode, PartialPricer, MultiplePricer
+from systemssolver.methods.simplex import SimplexSolver
+from systemssolver.methods.standard import build_tableau, maximization_costs
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.tracing.hook import StatsHook
+
+
+class PricingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.wide = generators.random_sparse(6, 400, density=0.05, seed=3)
+        self.expected = MultiObjectiveSolver().solve(self.wide).objective_values[0]
+
+    def test_modes_reach_the_same_optimum(self):
+        for mode in PricingMode:
+            with self.subTest(mode=mode):
+                hook = StatsHook()
+                solution = MultiObjectiveSolver(pricing=mode).solve(self.wide, hook)
+                self.assertTrue(solution.is_optimal)
+                self.assertAlmostEqual(self.expected, solution.objective_values[0])
+                self.assertGreater(hook.last_report.counter('pivots'), 0)
+
+    def test_legacy_simplex(self):
+        # The cheaper rules take the primal simplex's ratio test, not step()'s, and reach the true optimum.
+        problem = generators.random_sparse(4, 60, density=0.1, seed=1)
+        expected = MultiObjectiveSolver().solve(problem)['z']
+        for mode in (PricingMode.PARTIAL, PricingMode.MULTIPLE):
+            with self.subTest(mode=mode):
+                self.assertAlmostEqual(expected, SimplexSolver(pricing=mode).solve(problem)['z'])
+                self.assertAlmostEqual(self.expected, SimplexSolver(pricing=mode).solve(self.wide)['z'])
+
+    def test_partial_pricing_scans_segments(self):
+        pricer = PartialPricer(segment_size=3)
+        row = [0, -1, 0, -5, 0, -2, -9, 0]
+        # The first segment with an improving column wins, and the next scan starts after it.
+        self.assertEqual(1, pricer.entering_col(row, 1e-9))
+        self.assertEqual(3, pricer.entering_col(row, 1e-9))
+        self.assertEqual(6, pricer.entering_col(row, 1e-9))
+        self.assertEqual(1, pricer.entering_col(row, 1e-9))
+        self.assertIsNone(pricer.entering_col([0, 0, 0, 0, 0, 1, 7], 1e-9))
+
+    def test_multiple_pricing_keeps_candidates(self):
+        pricer = MultiplePricer(candidates=2)
+        row = [-1, -4, 0, -3, 5]
+        self.assertEqual(1, pricer.entering_col(row, 1e-9))
+        # Column 0 is more attractive now, but only the listed candidate 3 is priced until the list runs out.
+        row = [-8, 0, 0, -3, 5]
+        self.assertEqual(3, pricer.entering_col(row, 1e-9))
+        self.assertEqual(0, pricer.entering_col(row, 1e-9))
+        self.assertIsNone(pricer.entering_col([0, 0, 1, 0, 5], 1e-9))
+
+    def test_added_columns_reset_candidates(self):
+        matrix = MatrixProblem.from_problem(self.wide)
+        costs, constant = maximization_costs(matrix.objectives[0])
+        tableau = build_tableau(matrix, costs, constant)
+        tableau.pricing = PricingMode.MULTIPLE
+        tableau.primal_step()
+        tableau.add_variable('y', {0: 1}, cost=1000)
+        tableau.optimize()
+        self.assertAlmostEqual(0, min(tableau.reduced_costs))
+        self.assertEqual(PricingMode.MULTIPLE, tableau.to_exact().pricing)
+
+    def test_from_val(self):
+        self.assertEqual(PricingMode.PARTIAL, PricingMode.from_val('Partial'))
+        self.assertIsNone(PricingMode.from_val('steepest'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+
+from systemssolver.modeling.equation import Expression, Constraint, EqualitySigns
+from systemssolver.modeling.objective import Objective, ObjectiveGoal
+from systemssolver.modeling.variables import Term, Variable
+from systemssolver.problem import Problem
+
+
+class ProblemTest(unittest.TestCase):
+
+    def setUp(self):
+        self.problem = Problem()
+        self.objective = Objective(
+            expression=Expression(terms=[Term(coef=1, var=Variable('x')), Term(coef=2, var=Variable('y'))]),
+            goal=ObjectiveGoal.MAXIMIZE)
+        self.first = Constraint(
+            left=Expression(terms=[Term(coef=3, var=Variable('x'))]), right=Expression(terms=[Term(coef=4)]),
+            sign=EqualitySigns.LE)
+        self.second = Constraint(
+            left=Expression(terms=[Term(coef=5, var=Variable('y')), Term(coef=1, var=Variable('z'))]),
+            right=Expression(terms=[Term(coef=6)]), sign=EqualitySigns.LE)
+        self.problem.add_objective(self.objective)
+        self.problem.add_constraint(self.first)
+        self.problem.add_constraint(self.second)
+
+    def test_index(self):
+        self.assertEqual([self.first], self.problem.rows_with(Variable('x')))
+        self.assertEqual([self.second], self.problem.rows_with(Variable('z')))
+        self.assertEqual([], self.problem.rows_with(Variable('w')))
+
+    def test_set_variable_touches_referencing_rows(self):
+        self.problem.clear_dirty()
+        self.problem.set_variable(Variable('y', inverted=True))
+
+        self.assertEqual({self.problem.row_id(self.second)}, self.problem.dirty_rows)
+        self.assertEqual(-2, self.objective.expression.terms[1].coef)
+        self.assertEqual(-5, self.second.left.terms[0].coef)
+        self.assertEqual(3, self.first.left.terms[0].coef)
+        self.assertTrue(self.second.left.terms[0].var.is_inverted)
+
+    def test_remove_constraint(self):
+        version = self.problem.version
+        row_id = self.problem.row_id(self.second)
+        self.assertTrue(self.problem.remove_constraint(self.second))
+        self.assertFalse(self.problem.remove_constraint(self.second))
+
+        self.assertEqual([self.first], self.problem.constraints)
+        self.assertEqual({'x', 'y'}, {var.name for var in self.problem.variables})
+        self.assertEqual({row_id}, self.problem.removed_rows)
+        self.assertGreater(self.problem.version, version)
+
+    def test_duplicate_add(self):
+        with self.assertRaises(ValueError):
+            self.problem.add_constraint(self.first)
+        with self.assertRaises(ValueError):
+            self.problem.add_objective(self.objective)
+        self.assertTrue(self.problem.remove_constraint(self.first))
+        self.assertEqual([self.second], self.problem.constraints)
+
+    def test_remove_checks_kind(self):
+        self.assertFalse(self.problem.remove_constraint(self.objective))
+        self.assertFalse(self.problem.remove_objective(self.first))
+        self.assertEqual([self.objective], self.problem.objectives)
+        self.assertEqual([self.first, self.second], self.problem.constraints)
+        with self.assertRaises(KeyError):
+            self.problem.row_id(self.objective)
+        self.assertTrue(self.problem.remove_objective(self.objective))
+
+    def test_remove_objective(self):
+        self.assertTrue(self.problem.remove_objective(self.objective))
+        self.assertEqual([], self.problem.objectives)
+        self.assertEqual({'x', 'y', 'z'}, {var.name for var in self.problem.variables})
+        self.problem.remove_constraint(self.first)
+        self.assertEqual({'y', 'z'}, {var.name for var in self.problem.variables})
@@ -0,0 +1,143 @@
+import unittest
+
+from systemssolver.methods.factory import SolverMethods
+from systemssolver.methods.multiobjective import MultiObjectiveSolver
+from systemssolver.methods.quadratic import ActiveSetQPSolver
+from systemssolver.methods.simplex import SimplexSolver
+from systemssolver.modeling.document import problem_to_dict, problem_from_dict, matrix_to_dict, matrix_from_dict
+from systemssolver.modeling.equation import Expression, Constraint, EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.modeling.objective import Objective, ObjectiveGoal, QuadraticTerm
+from systemssolver.modeling.variables import Variable, Term
+from systemssolver.problem import Problem
+from systemssolver.serialization import dumps_problem
+from systemssolver.solution import SolveStatus
+from systemssolver.methods.limits import SolveLimits
+from systemssolver.tracing.hook import StatsHook
+
+
+def _projection(target_x=1, target_y=2) -> Problem:
+    # min (x - tx)^2 + (y - ty)^2 s.t. x + y <= 2.
+    x, y = Variable(name='x'), Variable(name='y')
+    problem = Problem()
+    problem.add_objective(Objective(
+        expression=Expression([Term(var=x, coef=-2 * target_x), Term(var=y, coef=-2 * target_y),
+                               Term(coef=target_x ** 2 + target_y ** 2)]),
+        goal=ObjectiveGoal.MINIMIZE, quadratic=[QuadraticTerm(x, x), QuadraticTerm(y, y)]))
+    problem.add_constraint(Constraint(left=Expression([Term(var=x), Term(var=y)]), right=Expression([Term(coef=2)]),
+                                      sign=EqualitySigns.LE))
+    return problem
+
+
+class ActiveSetQPSolverTest(unittest.TestCase):
+
+    def test_projection(self):
+        solution = ActiveSetQPSolver().solve(_projection())
+        self.assertTrue(solution.is_optimal)
+        self.assertAlmostEqual(0.5, solution['x'])
+        self.assertAlmostEqual(1.5, solution['y'])
+        self.assertAlmostEqual(0.5, solution.objective_values[0])
+        self.assertAlmostEqual(-0.5, solution['z'])
+
+    def test_maximize_concave(self):
+        matrix = MatrixProblem(['x'])
+        matrix.add_objective(ObjectiveGoal.MAXIMIZE, [0], [4], quadratic=[(0, 0, -1)])
+        matrix.add_row([0], [1], EqualitySigns.LE, 1)
+        solution = SolverMethods.QUADRATIC.get_solver().solve(matrix)
+        self.assertAlmostEqual(1, solution['x'])
+        self.assertAlmostEqual(3, solution.objective_values[0])
+
+    def test_portfolio(self):
+        # min x'Dx over the simplex: each weight is inversely proportional to its variance.
+        matrix = MatrixProblem(['a', 'b', 'c'])
+        matrix.add_objective(ObjectiveGoal.MINIMIZE, [], [], quadratic=[(0, 0, 1), (1, 1, 2), (2, 2, 3)])
+        matrix.add_row([0, 1, 2], [1, 1, 1], EqualitySigns.EQUAL, 1)
+        solution = ActiveSetQPSolver().solve(matrix)
+        for name, expected in zip('abc', (6 / 11, 3 / 11, 2 / 11)):
+            self.assertAlmostEqual(expected, solution[name])
+        self.assertAlmostEqual(6 / 11, solution.objective_values[0])
+
+    def test_linear_variables(self):
+        # min x^2 - y s.t. y <= 3, x + y >= 4: y has no curvature, so the first steps follow a ray.
+        matrix = MatrixProblem(['x', 'y'])
+        matrix.add_objective(ObjectiveGoal.MINIMIZE, [1], [-1], quadratic=[(0, 0, 1)])
+        matrix.add_row([1], [1], EqualitySigns.LE, 3)
+        matrix.add_row([0, 1], [1, 1], EqualitySigns.GE, 4)
+        solution = ActiveSetQPSolver().solve(matrix)
+        self.assertAlmostEqual(1, solution['x'])
+        self.assertAlmostEqual(3, solution['y'])
+
+        unbounded = MatrixProblem(['x', 'y'])
+        unbounded.add_objective(ObjectiveGoal.MINIMIZE, [1], [-1], quadratic=[(0, 0, 1)])
+        unbounded.add_row([0], [1], EqualitySigns.LE, 5)
+        with self.assertRaises(RuntimeError):
+            ActiveSetQPSolver().solve(unbounded)
+
+    def test_warm_start(self):
+        cold = ActiveSetQPSolver()
+        cold_hook = StatsHook()
+        cold.solve(_projection(), cold_hook)
+        self.assertEqual([0], cold.active_set)
+
+        warm_hook = StatsHook()
+        solution = ActiveSetQPSolver(warm_start=cold.active_set).solve(_projection(2, 1), warm_hook)
+        self.assertAlmostEqual(1.5, solution['x'])
+        self.assertAlmostEqual(0.5, solution['y'])
+        self.assertEqual(1, warm_hook.last_report.counter('warm_starts'))
+        self.assertEqual(0, warm_hook.last_report.counter('qp_iterations'))
+        self.assertGreater(cold_hook.last_report.counter('qp_iterations'), 0)
+
+        # A working set whose minimizer is infeasible falls back to a cold start.
+        rejected = StatsHook()
+        solution = ActiveSetQPSolver(warm_start=[]).solve(_projection(), rejected)
+        self.assertAlmostEqual(0.5, solution['x'])
+        self.assertEqual(1, rejected.last_report.counter('warm_starts_rejected'))
+
+    def test_limits(self):
+        solution = ActiveSetQPSolver(limits=SolveLimits(max_iterations=1)).solve(_projection())
+        self.assertEqual(SolveStatus.ITERATION_LIMIT, solution.status)
+        self.assertLessEqual(solution['x'] + solution['y'], 2 + 1e-9)
+
+    def test_only_convex_quadratic_objectives(self):
+        concave = MatrixProblem(['x'])
+        concave.add_objective(ObjectiveGoal.MINIMIZE, [], [], quadratic=[(0, 0, -1)])
+        concave.add_row([0], [1], EqualitySigns.LE, 1)
+        self.assertFalse(ActiveSetQPSolver().can_solve(concave))
+
+        indefinite = MatrixProblem(['x', 'y'])
+        indefinite.add_objective(ObjectiveGoal.MINIMIZE, [], [], quadratic=[(0, 0, 1), (0, 1, 3), (1, 1, 1)])
+        indefinite.add_row([0], [1], EqualitySigns.LE, 1)
+        self.assertFalse(ActiveSetQPSolver().can_solve(indefinite))
+
+        problem = _projection()
+        self.assertFalse(SimplexSolver().can_solve(problem))
+        self.assertFalse(MultiObjectiveSolver().can_solve(problem))
+
+
+class QuadraticModelingTest(unittest.TestCase):
+
+    def test_documents_and_matrix(self):
+        problem = _projection()
+        self.assertEqual(problem.objectives[0], problem_from_dict(problem_to_dict(problem)).objectives[0])
+
+        matrix = MatrixProblem.from_problem(problem)
+        self.assertEqual([(0, 0, 1), (1, 1, 1)], matrix.objectives[0].quadratic)
+        self.assertEqual(matrix.objectives[0].quadratic,
+                         matrix_from_dict(matrix_to_dict(matrix)).objectives[0].quadratic)
+        self.assertEqual(problem.objectives[0], matrix.to_problem().objectives[0])
+        with self.assertRaises(ValueError):
+            dumps_problem(problem)
+
+    def test_quadratic_only_variable(self):
+        x, y = Variable(name='x'), Variable(name='y')
+        problem = Problem()
+        objective = Objective(expression=Expression([Term(var=x)]), goal=ObjectiveGoal.MINIMIZE,
+                              quadratic=[QuadraticTerm(y, y)])
+        problem.add_objective(objective)
+        self.assertEqual({'x', 'y'}, {var.name for var in problem.variables})
+        problem.remove_objective(objective)
+        self.assertEqual(set(), problem.variables)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import struct
+import tempfile
+import unittest
+from fractions import Fraction
+
+from systemssolver.benchmark import generators
+from systemssolver.methods.simplex import SimplexSolver
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.modeling.variables import VariableType
+from systemssolver.serialization import dumps_problem, loads_problem, dump_problem, load_problem, \
+    dumps_solution, loads_solution, FormatError
+from systemssolver.solution import Solution, SolveStatus
+
+
+class ProblemFormatTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        problem = generators.transportation(2, 3, seed=3)
+        matrix = loads_problem(dumps_problem(problem))
+        original = MatrixProblem.from_problem(problem)
+
+        self.assertEqual(original.variable_names, matrix.variable_names)
+        self.assertEqual(list(original.rows.indptr), list(matrix.rows.indptr))
+        self.assertEqual(list(original.rows.indices), list(matrix.rows.indices))
+        self.assertEqual(list(original.rows.data), list(matrix.rows.data))
+        self.assertEqual(list(original.rhs), list(matrix.rhs))
+        self.assertEqual([EqualitySigns.LE] * 2 + [EqualitySigns.GE] * 3, matrix.signs)
+        self.assertEqual(original.objectives[0].goal, matrix.objectives[0].goal)
+        self.assertEqual(list(original.objectives[0].coefs), list(matrix.objectives[0].coefs))
+
+    def test_solves_like_original(self):
+        expected = SimplexSolver().solve(generators.klee_minty(4))
+        matrix = loads_problem(dumps_problem(generators.klee_minty(4)))
+        self.assertEqual(expected, SimplexSolver().solve(matrix.to_problem()))
+
+    def test_mapped_file(self):
+        fd, path = tempfile.mkstemp(suffix='.sslp')
+        os.close(fd)
+        try:
+            dump_problem(generators.knapsack(6, seed=1), path)
+            matrix = load_problem(path)
+            self.assertIsInstance(matrix.rows.data, memoryview)
+            self.assertEqual(7, matrix.num_constraints)
+            self.assertEqual([VariableType.INTEGER] * 6, matrix.variable_types)
+        finally:
+            os.remove(path)
+
+    def test_rejects_other_data(self):
+        with self.assertRaises(FormatError):
+            loads_problem(b'x' * 64)
+
+
+class SolutionFormatTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        solution = SimplexSolver().solve(generators.klee_minty(3))
+        self.assertEqual(solution, loads_solution(dumps_solution(solution)))
+
+    def test_round_trip_keeps_status_and_exact_values(self):
+        solution = Solution(['x', 'y', 'z'], [Fraction(1, 3), None, 2.5], objective_values=[Fraction(7, 3)],
+                            status=SolveStatus.TIME_LIMIT, feasible=False, bound=Fraction(5, 2))
+        loaded = loads_solution(dumps_solution(solution))
+        self.assertEqual(solution, loaded)
+        self.assertIsInstance(loaded['x'], Fraction)
+        self.assertEqual([Fraction(7, 3)], loaded.objective_values)
+        self.assertIsInstance(loaded.objective_values[0], Fraction)
+        self.assertEqual(Fraction(5, 2), loaded.bound)
+        self.assertEqual(SolveStatus.TIME_LIMIT, loaded.status)
+        self.assertFalse(loaded.feasible)
+        self.assertIsNone(loads_solution(dumps_solution(Solution(['x'], [1.0]))).objective_values)
+
+    def test_loads_version_1(self):
+        names = b'xy'
+        buffer = struct.pack('<4sI2Q', b'SSSL', 1, 2, len(names)) + struct.pack('<3q', 0, 1, 2) + names + \
+            bytes(6) + struct.pack('<2d', 1.5, float('nan'))
+        loaded = loads_solution(buffer)
+        self.assertEqual({'x': 1.5, 'y': None}, loaded.as_dict())
+        self.assertEqual(SolveStatus.OPTIMAL, loaded.status)
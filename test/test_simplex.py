@@ -1,6 +1,7 @@
 import unittest
+from fractions import Fraction
 
-from systemssolver.methods.simplex import SimplexSolver
+from systemssolver.methods.simplex import SimplexSolver, Tableau
 from systemssolver.modeling.equation import Expression, Constraint, EqualitySigns
 from systemssolver.modeling.objective import Objective, ObjectiveGoal
 from systemssolver.modeling.variables import Term, Variable
@@ -154,3 +155,74 @@ class SimplexTest(unittest.TestCase):
         print(solution)
         for var in solution.variables:
             self.assertAlmostEqual(expected_vals.get(var.name), var.val, 5)
+
+    def test_exact(self):
+        a = Variable(name="a")
+        b = Variable(name="b")
+
+        problem = Problem()
+        problem.add_objective(Objective(
+            expression=Expression(terms=[Term(coef=5, var=a), Term(coef=8, var=b)]),
+            goal=ObjectiveGoal.MAXIMIZE
+        ))
+
+        problem.add_constraint(Constraint(
+            left=Expression(terms=[Term(coef=1.0, var=a), Term(coef=0.7, var=b)]),
+            right=Expression(terms=[Term(coef=5.7)]),
+            sign=EqualitySigns.LE
+        ))
+
+        problem.add_constraint(Constraint(
+            left=Expression(terms=[Term(coef=5, var=a), Term(coef=9, var=b)]),
+            right=Expression(terms=[Term(coef=46)]),
+            sign=EqualitySigns.LE
+        ))
+        solver = SimplexSolver(exact=True)
+        solution = solver.solve(problem)
+        expected_vals = {a.name: Fraction(191, 55), b.name: Fraction(35, 11), 's0': 0, 's1': 0, 'z': Fraction(471, 11)}
+        for var in solution.variables:
+            self.assertEqual(expected_vals.get(var.name), var.val)
+            if var.val != 0:
+                self.assertIsInstance(var.val, Fraction)
+
+    def test_exact_with_ge_row(self):
+        # The >= row starts infeasible at the slack basis, so the exact tableau goes through phase one.
+        xs = [Variable(name="x{}".format(i)) for i in range(3)]
+
+        def expression(coefs):
+            return Expression(terms=[Term(coef=coef, var=x) for coef, x in zip(coefs, xs)])
+
+        problem = Problem()
+        problem.add_objective(Objective(expression=expression([1, 5, 8]), goal=ObjectiveGoal.MAXIMIZE))
+        for coefs, sign, rhs in (([6, 3, 2], EqualitySigns.LE, 14), ([5, 1, 5], EqualitySigns.GE, 4),
+                                 ([0, 4, 4], EqualitySigns.LE, 7), ([1, 3, 4], EqualitySigns.LE, 5)):
+            problem.add_constraint(Constraint(left=expression(coefs), right=Expression(terms=[Term(coef=rhs)]),
+                                              sign=sign))
+
+        solution = SimplexSolver(exact=True).solve(problem)
+        self.assertEqual(Fraction(10), solution['z'])
+        self.assertIsInstance(solution['z'], Fraction)
+        for var in solution.variables:
+            self.assertIsInstance(var.val, (int, Fraction))
+
+
+class TableauTest(unittest.TestCase):
+
+    def test_duals_and_add_column(self):
+        # max 3x s.t. x + y <= 4, x <= 3, then y is added with cost 2 in the second row only, where x's bound
+        # prices it at 3, so it must not enter.
+        tableau = Tableau.from_rows([Variable(name='x')], {0: 3}, 0, [{0: 1}, {0: 1}], [4, 3])
+        tableau.optimize()
+        self.assertEqual(9, tableau.objective_value)
+        self.assertEqual([0, 3], tableau.duals)
+
+        col = tableau.add_column('y', {1: 1}, cost=2)
+        self.assertEqual(1, tableau.reduced_costs[col])
+        tableau.optimize()
+        self.assertEqual(9, tableau.objective_value)
+
+        # With w in the first row, y and w both at 2 per unit beat x at 3 per unit of both rows.
+        col = tableau.add_column('w', {0: 1}, cost=2)
+        tableau.optimize()
+        self.assertEqual(14, tableau.objective_value)
+        self.assertEqual(4, tableau.values()[col])
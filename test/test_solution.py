@@ -0,0 +1,40 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from systemssolver.benchmark import generators
+from systemssolver.methods.simplex import SimplexSolver
+from systemssolver.solution import Solution
+
+
+class SolutionTest(unittest.TestCase):
+
+    def test_lookup(self):
+        solution = Solution(['x', 'y'], [1, 2.5])
+        self.assertEqual(2.5, solution['y'])
+        self.assertIsNone(solution.get('z'))
+        self.assertEqual({'x': 1, 'y': 2.5}, {var.name: var.val for var in solution.variables})
+
+    def test_negation_returns_new_solution(self):
+        solution = Solution(['x'], [3])
+        self.assertEqual(-3, (-solution)['x'])
+        self.assertEqual(3, solution['x'])
+
+    def test_solve_leaves_problem_untouched(self):
+        problem = generators.transportation(2, 3, seed=5)
+        before = [str(constraint) for constraint in problem.constraints]
+        SimplexSolver().solve(problem)
+
+        self.assertEqual(before, [str(constraint) for constraint in problem.constraints])
+        self.assertTrue(all(var.val is None for var in problem.variables))
+
+    def test_concurrent_solves_of_shared_problem(self):
+        problem = generators.klee_minty(4)
+        expected = SimplexSolver().solve(generators.klee_minty(4))
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            solutions = list(pool.map(lambda _: SimplexSolver().solve(problem), range(8)))
+        for solution in solutions:
+            self.assertEqual(expected, solution)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import gzip
+import json
+import unittest
+from fractions import Fraction
+from unittest import mock
+
+from systemssolver.benchmark import generators
+from systemssolver.interface.solver_gui import FlaskApp
+from systemssolver.methods.simplex import SimplexSolver
+from systemssolver.modeling.document import problem_to_dict, matrix_to_dict
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.serialization import dumps_problem
+from systemssolver.solution import Solution
+
+
+class ProblemEndpointTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = FlaskApp()
+        self.client = self.app.app.test_client()
+
+    def _solve(self, **headers):
+        response = self.client.post('/api/solve', json={'method': 'simplex', 'debug': False}, headers=headers)
+        self.assertEqual(200, response.status_code)
+        return response
+
+    def test_put_document(self):
+        response = self.client.put('/api/problem', json=problem_to_dict(generators.klee_minty(3)))
+        self.assertEqual({'objectives': 1, 'constraints': 3, 'variables': 3}, response.get_json())
+        self.assertEqual(125, json.loads(self._solve().data)['vars']['z'])
+
+    def test_put_matrix_arrays(self):
+        document = matrix_to_dict(MatrixProblem.from_problem(generators.klee_minty(3)))
+        self.assertEqual(200, self.client.put('/api/problem', json=document).status_code)
+        self.assertEqual(125, json.loads(self._solve().data)['vars']['z'])
+
+    def test_put_binary_gzip(self):
+        body = gzip.compress(dumps_problem(generators.klee_minty(3)))
+        response = self.client.put('/api/problem', data=body, content_type='application/octet-stream',
+                                   headers={'Content-Encoding': 'gzip'})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(3, len(self.app.problem.constraints))
+
+    def test_put_invalid(self):
+        document = {'variables': [{'name': 'x'}], 'rows': {'indptr': [0, 1], 'indices': [4], 'data': [1]},
+                    'signs': ['<='], 'rhs': [1]}
+        self.assertEqual(400, self.client.put('/api/problem', json=document).status_code)
+        self.assertEqual(400, self.client.put('/api/problem', data=b'{', content_type='application/json').status_code)
+
+    def test_solve_without_limits(self):
+        # The linear system solver takes no limits, so none are passed unless the request sets one.
+        document = {'variables': [{'name': 'x'}, {'name': 'y'}],
+                    'constraints': [{'left': 'x + y', 'sign': '=', 'right': '3'},
+                                    {'left': 'x - y', 'sign': '=', 'right': '1'}]}
+        self.client.put('/api/problem', json=document)
+        response = self.client.post('/api/solve', json={'method': 'linear', 'debug': False})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({'x': 2, 'y': 1}, json.loads(response.data)['vars'])
+
+    def test_solve_invalid_options(self):
+        for options in ({'method': 'linear', 'debug': False, 'time_limit': 1}, {'method': 'simplex'},
+                        {'method': 'nope', 'debug': False}):
+            response = self.client.post('/api/solve', json=options)
+            self.assertEqual(400, response.status_code)
+            self.assertEqual(b'Invalid options', response.data)
+
+    def test_solution_values_encoded_up_front(self):
+        self.client.put('/api/problem', json=problem_to_dict(generators.klee_minty(3)))
+        solution = Solution(['x', 'y', 'z'], [Fraction(1, 3), None, Fraction(5, 2)])
+        with mock.patch.object(SimplexSolver, 'solve', return_value=solution):
+            result = json.loads(self._solve().data)
+        self.assertEqual({'x': 1 / 3, 'y': None, 'z': 2.5}, result['vars'])
+        self.assertEqual({'x': '1/3'}, result['exact'])
+
+        solution = Solution(['x'], [object()])
+        with mock.patch.object(SimplexSolver, 'solve', return_value=solution):
+            response = self.client.post('/api/solve', json={'method': 'simplex', 'debug': False})
+        self.assertEqual(500, response.status_code)
+
+    def test_compressed_responses(self):
+        self.client.put('/api/problem', json=problem_to_dict(generators.transportation(3, 4, seed=1)))
+        response = self._solve(**{'Accept-Encoding': 'gzip'})
+        self.assertEqual('gzip', response.headers['Content-Encoding'])
+        self.assertEqual(json.loads(self._solve().data), json.loads(gzip.decompress(response.data)))
+
+        response = self.client.get('/api/variables', headers={'Accept-Encoding': 'gzip'})
+        variables = json.loads(gzip.decompress(response.data))['variables']
+        self.assertEqual(12, len(variables))
+        self.assertEqual({'name', 'isInverted', 'type'}, set(variables[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
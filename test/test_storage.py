@@ -0,0 +1,64 @@
+import unittest
+
+from systemssolver.benchmark import generators
+from systemssolver.methods.simplex import SimplexSolver
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.matrix import MatrixProblem
+from systemssolver.modeling.storage import DiskProblem
+from systemssolver.modeling.variables import Variable
+
+
+class DiskProblemTest(unittest.TestCase):
+
+    def _disk_copy(self, problem, chunk_nnz=4):
+        disk = DiskProblem(chunk_nnz=chunk_nnz)
+        for objective in problem.objectives:
+            disk.add_objective(objective)
+        for constraint in problem.constraints:
+            disk.add_constraint(constraint)
+        return disk
+
+    def test_rows_and_columns(self):
+        with DiskProblem(chunk_nnz=3) as disk:
+            for var in generators.klee_minty(3).variables:
+                disk.add_variable(var)
+            disk.add_row([0, 2], [1.0, 2.0], EqualitySigns.LE, 4.0)
+            disk.add_row([1], [3.0], EqualitySigns.GE, 1.0)
+            disk.add_row([0, 1, 2], [4.0, 5.0, 6.0], EqualitySigns.EQUAL, 2.0)
+
+            self.assertEqual(3, disk.num_constraints)
+            self.assertEqual(6, disk.nnz)
+            self.assertEqual(([1], [3.0]), tuple(list(part) for part in disk.row(1)))
+            self.assertEqual(([0, 2], [2.0, 6.0]), tuple(list(part) for part in disk.column(2)))
+            self.assertEqual(EqualitySigns.GE, disk.constraints[1].sign)
+
+            disk.add_row([2], [7.0], EqualitySigns.LE, 9.0)
+            self.assertEqual(([0, 2, 3], [2.0, 6.0, 7.0]), tuple(list(part) for part in disk.column(2)))
+
+    def test_maps_are_closed(self):
+        disk = DiskProblem(chunk_nnz=1)
+        disk.add_variable(Variable(name='x'))
+        disk.add_row([0], [1.0], EqualitySigns.LE, 1.0)
+        self.assertEqual([1.0], list(disk.rows.data))
+        self.assertEqual([1.0], list(disk.column(0)[1]))
+        stale = [disk._data._map] + disk._column_maps
+
+        disk.add_row([0], [2.0], EqualitySigns.LE, 2.0)
+        held = disk.rows.data
+        self.assertEqual([1.0, 2.0], list(held))
+        self.assertTrue(all(mapped.closed for mapped in stale))
+
+        # A view still handed out keeps its map readable past close().
+        mapped = disk._data._map
+        disk.close()
+        self.assertFalse(mapped.closed)
+        self.assertEqual([1.0, 2.0], list(held))
+        self.assertTrue(disk._indptr._file.closed)
+
+    def test_matches_in_memory_problem(self):
+        problem = generators.random_sparse(6, 9, density=0.3, seed=2)
+        with self._disk_copy(problem) as disk:
+            matrix = MatrixProblem.from_problem(disk)
+            self.assertEqual(MatrixProblem.from_problem(problem).rows.nnz, matrix.rows.nnz)
+            self.assertEqual(MatrixProblem.from_problem(problem).rhs.tolist(), list(disk.to_matrix().rhs))
+            self.assertEqual(SimplexSolver().solve(problem), SimplexSolver().solve(disk))
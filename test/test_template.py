@@ -0,0 +1,65 @@
+import unittest
+
+from systemssolver.methods.factory import SolverMethods
+from systemssolver.methods.multiobjective import MultiObjectiveSolver
+from systemssolver.modeling.equation import EqualitySigns
+from systemssolver.modeling.objective import ObjectiveGoal
+from systemssolver.modeling.template import ModelTemplate
+
+
+class ModelTemplateTest(unittest.TestCase):
+
+    def setUp(self):
+        template = ModelTemplate(parameters=['a', 'b', 'cap'])
+        template.add_objective(ObjectiveGoal.MAXIMIZE, '3x + 2*y')
+        template.add_constraint('a*x + b*y <= cap')
+        template.add_constraint('x - 1 <= 2')
+        template.add_constraint('y >= 0.5 b')
+        self.compiled = template.compile()
+
+    def test_layout(self):
+        matrix = self.compiled.instantiate({'a': 1, 'b': 2, 'cap': 10})
+        self.assertEqual(['x', 'y'], matrix.variable_names)
+        self.assertEqual(([0, 1], [1.0, 2.0]), tuple(map(list, matrix.rows.row(0))))
+        self.assertEqual([10, 3, 1], list(matrix.rhs))
+        self.assertEqual([EqualitySigns.LE, EqualitySigns.LE, EqualitySigns.GE], matrix.signs)
+
+    def test_instances_are_independent(self):
+        first, second = self.compiled.instantiate_many([[1, 2, 10], [2, 1, 4]])
+        self.assertEqual([1.0, 2.0], list(first.rows.row(0)[1]))
+        self.assertEqual([2.0, 1.0], list(second.rows.row(0)[1]))
+
+        solver = MultiObjectiveSolver()
+        self.assertEqual(16, solver.solve(first).objective_values[0])
+        self.assertEqual(8, solver.solve(second).objective_values[0])
+
+    def test_default_method_solves_instances(self):
+        solver = SolverMethods.SIMPLEX.get_solver()
+        for values, expected in (([1, 2, 10], {'x': 3, 'y': 3.5, 'z': 16}), ([2, 1, 4], {'x': 0, 'y': 4, 'z': 8})):
+            solution = solver.solve(self.compiled.instantiate(values))
+            for name, val in expected.items():
+                self.assertAlmostEqual(val, solution[name])
+
+    def test_default_method_repairs_ge_rows(self):
+        # The >= row starts the slack basis infeasible, at s1 = -demand.
+        template = ModelTemplate(parameters=['cap', 'demand'])
+        template.add_objective(ObjectiveGoal.MINIMIZE, 'x + y')
+        template.add_constraint('x <= cap')
+        template.add_constraint('x + y >= demand')
+        solution = SolverMethods.SIMPLEX.get_solver().solve(template.compile().instantiate([10, 5]))
+        self.assertAlmostEqual(5, solution['x'] + solution['y'])
+        self.assertTrue(solution.feasible)
+        self.assertGreaterEqual(min(solution['s0'], solution['s1']), 0)
+
+    def test_errors(self):
+        template = ModelTemplate(parameters=['a'])
+        with self.assertRaises(ValueError):
+            template.add_constraint('x * y <= 1')
+        with self.assertRaises(ValueError):
+            template.add_constraint('x + - y')
+        with self.assertRaises(ValueError):
+            self.compiled.instantiate({'a': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import json
+import unittest
+
+from systemssolver.methods.simplex import SimplexSolver
+from systemssolver.modeling.equation import Expression, Constraint, EqualitySigns
+from systemssolver.modeling.objective import Objective, ObjectiveGoal
+from systemssolver.modeling.variables import Term, Variable
+from systemssolver.problem import Problem
+from systemssolver.tracing.hook import StatsHook
+from systemssolver.tracing.stats import Phase, NULL_STATS
+
+
+class StatsHookTest(unittest.TestCase):
+
+    def _problem(self):
+        x1 = Variable(name="x1")
+        x2 = Variable(name="x2")
+        x3 = Variable(name="x3")
+        problem = Problem()
+        problem.add_objective(Objective(
+            expression=Expression(terms=[Term(coef=8, var=x1), Term(coef=10, var=x2), Term(coef=7, var=x3)]),
+            goal=ObjectiveGoal.MAXIMIZE
+        ))
+        problem.add_constraint(Constraint(
+            left=Expression(terms=[Term(coef=1, var=x1), Term(coef=3, var=x2), Term(coef=2, var=x3)]),
+            right=Expression(terms=[Term(coef=10)]),
+            sign=EqualitySigns.LE
+        ))
+        problem.add_constraint(Constraint(
+            left=Expression(terms=[Term(coef=1, var=x1), Term(coef=5, var=x2), Term(coef=1, var=x3)]),
+            right=Expression(terms=[Term(coef=8)]),
+            sign=EqualitySigns.LE
+        ))
+        return problem
+
+    def test_collects_phases(self):
+        hook = StatsHook()
+        solution = SimplexSolver().solve(self._problem(), tracing_hook=hook)
+
+        stats = hook.last_report
+        self.assertIs(stats, solution.stats)
+        self.assertEqual(2, stats.counter('pivots'))
+        self.assertEqual(0, stats.counter('traced_solutions'))
+        for phase in Phase:
+            self.assertGreaterEqual(stats.timing(phase), 0)
+            self.assertIn(phase.value, stats.to_dict()['timings'])
+
+        exported = json.loads(stats.to_json())
+        self.assertEqual(2, exported['counters']['pivots'])
+        self.assertEqual(2, exported['timings']['pivot']['calls'])
+
+    def test_aggregate(self):
+        hook = StatsHook()
+        SimplexSolver().solve(self._problem(), tracing_hook=hook)
+        SimplexSolver().solve(self._problem(), tracing_hook=hook)
+        self.assertEqual(2, len(hook.reports))
+        self.assertEqual(4, hook.aggregate().counter('pivots'))
+
+    def test_disabled(self):
+        solution = SimplexSolver().solve(self._problem())
+        self.assertIsNone(solution.stats)
+        NULL_STATS.increment('pivots')
+        with NULL_STATS.timer(Phase.PIVOT):
+            pass
+        self.assertEqual({'counters': {}, 'timings': {}, 'total_seconds': 0}, NULL_STATS.to_dict())